@@ -1,5 +1,6 @@
 import typing
-from src.model import Input, InstructionMemory, ProgramCounter, Register
+from src.model import DataMemory, Input, InstructionMemory, ProgramCounter, Register, RegisterBlock
+from src.model.LogicComponent import LogicComponent
 from src.constants import MAX_EVAL_CYCLES
 from src.infrastructure.eventBus import getBus
 
@@ -9,71 +10,68 @@ class Algorithms:
     """
 
     @staticmethod
-    def khanFrontierEval(inputs, components, updateFunction = None, waitFunction = None):
+    def khanFrontierEval(inputs, components, updateFunction = None, waitFunction = None, order: "GraphOrder" = None):
         """evaluates all the components in topological order
            if there are no circular dependencies
 
+        Args:
+            order (GraphOrder): Optional cached order of the components. If not delivered, it is computed on the fly.
+
         Returns:
             bool: if evaluation was successful or not
         """
-        tick = 0
-        indeg = {}  # indegree of each component
-        for comp in components:
-            if type(comp) != Input:
-                # create a list of all components which are inputs to this component
-                compo = [tuple[0] for tuple in comp.inputs.values() if tuple is not None and type(tuple[0]) != Register]
-                indeg[comp] = len(set(compo))  # count only unique components
-
-        currentTick = inputs.copy()  # start with inputs
-        updateInTick: typing.Dict = {}
-        while len(currentTick) > 0:  # while there are still components to process
-            updateInTick[tick] = currentTick.copy()  # store current components in tick dictionary
-            nextTick = []  # list of components for next tick
-            for u in currentTick:
-                vs = [tuple[0] for tuple in u.getOutputs()]  # get all components which are outputs of current component
-                for v in vs:
-                    indeg[v] -= 1  # decrease indegree of output component
-                    if indeg[v] == 0:  # if indegree is 0, add to next tick
-                        nextTick.append(v)
-            # move to next tick
-            currentTick = nextTick
-            tick += 1  # increase tick count
-            
+        if order is None or order.isStale():
+            order = GraphOrder(components)
 
-        # if there are still components with indegree > 0, there is a circular dependency
-        if sum(indeg.values()) > 0:
+        # if the order contains a cycle, there is a circular dependency
+        if not order.acyclic:
             return False
-        else:
-            # evaluate components tick by tick
-            for tick in updateInTick:
-                for comp in updateInTick[tick]:
-                    comp.eval()
-                if updateFunction is not None:
-                    updateFunction(components=updateInTick[tick])
-                if waitFunction is not None:
-                    waitFunction()
-            
-            return True
+        # evaluate components tick by tick
+        for tickComponents in order.getTicks():
+            for comp in tickComponents:
+                comp.eval()
+            if updateFunction is not None:
+                updateFunction(components=tickComponents)
+            if waitFunction is not None:
+                waitFunction()
+
+        return True
 
     @staticmethod
-    def eventDrivenEval(inputs, components, updateFunction=None, waitFunction = None, **kw: typing.List["LogicComponent"]):
+    def eventDrivenEval(inputs, components, updateFunction=None, waitFunction = None, order: "GraphOrder" = None, **kw: typing.List["LogicComponent"]):
         """evaluates components eventdriven (starting from one (or multiple) Components in waves)
 
         Args:
             startingComponents (typing.List[&quot;LogicComponent&quot;]): Optional List of components from which to start
             if not deliverd function will use the inputs as this list and evaluates everything. If there are no Inputs, it will start
             from the ProgramCounter(s)
+            order (GraphOrder): Optional cached order of the components, its fanout lists are used instead of scanning the outputs
+            delays (Dict): Optional propagation delays in ticks per component or component type (see TimingWheel)
+            unstable (List): Optional list, the components evaluated in the repeating waves are added to it
+            if an oscillation was detected
+
+        If the circuit has loops and no hidden state (registers, memories, ...), the states after every wave are
+        hashed. A repeated state means that the circuit oscillates, so the evaluation fails right away instead of
+        running into the MAX_EVAL_CYCLES limit.
+        The waves are the ticks of a TimingWheel. A component is scheduled once per tick, no matter how many of its
+        inputs changed. Components reporting their changed outputs in changedPorts (see LogicComponent.setOutput)
+        only schedule the components connected to those.
 
         Returns:
             bool: wether evaluation was successful or not
         """
         
+        if order is not None and order.isStale():
+            order = None
         maxEvaluationCycles = len(components)
         instructionMemory = None
-        for comp in components:
-            if type(comp) == InstructionMemory:
-                instructionMemory = comp
-                break
+        if order is not None:
+            instructionMemory = order.instructionMemory
+        else:
+            for comp in components:
+                if type(comp) == InstructionMemory:
+                    instructionMemory = comp
+                    break
         # if there is a instruction memory, add its length to the maxEvaluationCycles
         # to allow enough cycles for all instructions to be processed
         if instructionMemory is not None:
@@ -86,6 +84,8 @@ class Algorithms:
         startingComponents = kw.get("startingComponents", None)
         # If empty, try to start from ProgramCounter components
         
+        if (startingComponents is None or len(startingComponents) == 0) and order is not None:
+            startingComponents = order.programCounters
         if startingComponents is None or len(startingComponents) == 0:
             startingComponents = [comp for comp in components if type(comp) == ProgramCounter]
         # if still empty, use inputs
@@ -97,24 +97,445 @@ class Algorithms:
 
         if startingComponents is None or len(startingComponents) == 0:
             return False  # nothing to start from
+        # oscillations can only happen in loops, and only repeat for sure if the states are all visible
+        detectOscillation = (order is None or not order.acyclic) and not hasHiddenState(components)
+        wheel = TimingWheel(order, kw.get("delays", None), trackStates=detectOscillation)
+        for comp in startingComponents:  # start with inputs or given components
+            wheel.schedule(comp, 0)
+        seen: typing.Dict[tuple, int] = {} # state key -> number of waves after which it was reached
+        waves: typing.List[typing.List["LogicComponent"]] = []
         tick = 0
-        currentTick = startingComponents  # start with inputs or given components
-        while len(currentTick) > 0:  # while there are still components to process
-            nextTick = []  # list of components for next tick
-            for g in currentTick:
-                if g.eval():  # evaluate component
-                    # if evaluation changed the output, add all connected components to next tick
-                    gOut = [tuple[0] for tuple in g.getOutputs()]
-                    for out in gOut:
-                        nextTick.append(out)
+        while wheel.pending > 0:  # while there are still components to process
+            currentTick = wheel.step()
             if updateFunction is not None:
                 updateFunction(components=currentTick)
             if waitFunction is not None:
                 waitFunction()
-            currentTick = nextTick
             tick += 1
+            if detectOscillation and _repeatsState(wheel, currentTick, seen, waves, kw.get("unstable", None)):
+                return False
             # if too many ticks, there is probably a circular dependency which don't has a stable state
             if tick > MAX_EVAL_CYCLES * maxEvaluationCycles:
                 return False
         
         return True
+
+    @staticmethod
+    def sccEval(components, updateFunction=None, waitFunction=None, order: "GraphOrder" = None,
+                unstable: typing.List["LogicComponent"] = None) -> bool:
+        """Evaluates a circuit with feedback loops by condensing its strongly connected components
+
+        The SCCs are evaluated in topological order, SCCs that don't depend on each other in the same wave.
+        A single component is evaluated once, a loop is evaluated event driven until it is stable.
+        So a latch only costs a few evaluations of its own gates instead of an event driven evaluation of
+        the whole circuit. Components with hidden state (see hasHiddenState) need eventDrivenEval instead.
+
+        Args:
+            components (List[LogicComponent]): All components of the circuit
+            order (GraphOrder): Optional cached order of the components
+            unstable (List): Optional list, the components of an oscillating loop are added to it
+
+        Returns:
+            bool: False if a loop doesn't become stable, True otherwise
+        """
+        if order is None or order.isStale():
+            order = GraphOrder(components)
+        sccs = order.stronglyConnectedComponents()
+        sccOf = {comp: i for i, scc in enumerate(sccs) for comp in scc}
+        # longest path in the condensation, the SCCs are already in topological order
+        levelOf = [0] * len(sccs)
+        for i, scc in enumerate(sccs):
+            for comp in scc:
+                for target in order.successors(comp):
+                    j = sccOf[target]
+                    if j != i and levelOf[j] <= levelOf[i]:
+                        levelOf[j] = levelOf[i] + 1
+        waves: typing.List[typing.List[typing.List["LogicComponent"]]] = [[] for _ in range(max(levelOf, default=-1) + 1)]
+        for scc, level in zip(sccs, levelOf):
+            waves[level].append(scc)
+
+        for wave in waves:
+            evaluated = []
+            for scc in wave:
+                if len(scc) == 1 and scc[0] not in order.successors(scc[0]):
+                    scc[0].changedPorts.clear()
+                    scc[0].eval()
+                elif not Algorithms._settle(scc, order, unstable):
+                    return False
+                evaluated.extend(scc)
+            if updateFunction is not None:
+                updateFunction(components=evaluated)
+            if waitFunction is not None:
+                waitFunction()
+        return True
+
+    @staticmethod
+    def _settle(loop: typing.List["LogicComponent"], order: "GraphOrder", unstable: typing.List["LogicComponent"] = None) -> bool:
+        """Evaluates the components of a loop event driven until they are stable, the rest of the circuit is left out"""
+        wheel = TimingWheel(order, trackStates=True, within=set(loop))
+        for comp in loop:
+            wheel.schedule(comp, 0)
+        seen: typing.Dict[tuple, int] = {}
+        waves: typing.List[typing.List["LogicComponent"]] = []
+        while wheel.pending > 0:
+            if _repeatsState(wheel, wheel.step(), seen, waves, unstable):
+                return False
+            if len(waves) > MAX_EVAL_CYCLES * len(loop):
+                if unstable is not None:
+                    unstable.extend(loop)
+                return False
+        return True
+
+    @staticmethod
+    def changedFanout(comp: "LogicComponent") -> typing.List["LogicComponent"]:
+        """Returns the components connected to the outputs in comp.changedPorts
+
+        Args:
+            comp (LogicComponent): A component which was just evaluated
+
+        Returns:
+            List[LogicComponent]: The components reading a changed output (once per connection, the TimingWheel
+            removes duplicates). Targets whose input doesn't know the connection are always included
+        """
+        changedPorts = comp.changedPorts
+        targets: typing.List["LogicComponent"] = []
+        for target, targetKey in comp.outputs:
+            connection = target.inputs.get(targetKey)
+            if connection is None or connection[1] in changedPorts:
+                targets.append(target)
+        return targets
+
+
+class GraphOrder:
+    """Cached topological order of a circuit.
+
+    Components are grouped into levels (ticks) like in Kahn's algorithm, so that every component
+    has a higher level than all components it depends on. Edges starting at a Register are ignored,
+    as registers only change their outputs when they are updated.
+    The order can be patched when single connections are added or removed, instead of being recomputed.
+    """
+
+    def __init__(self, components: typing.List["LogicComponent"], versionOf: typing.Callable[[], int] = None):
+        # returns the topology version of the components, a snapshot of a circuit has its own version
+        self.versionOf: typing.Callable[[], int] = versionOf or LogicComponent.currentTopologyVersion
+        self.version: int = self.versionOf()
+        self.components: typing.List["LogicComponent"] = list(components)
+        # unique successors of each component (including successors outside of the component list)
+        self.fanout: typing.Dict["LogicComponent", typing.List["LogicComponent"]] = {}
+        self.level: typing.Dict["LogicComponent", int] = {}
+        self.acyclic: bool = False
+        self.valid: bool = True
+        self.programCounters: typing.List["ProgramCounter"] = [comp for comp in self.components if type(comp) == ProgramCounter]
+        self.instructionMemory: "InstructionMemory" = next((comp for comp in self.components if type(comp) == InstructionMemory), None)
+        self._ticks: typing.List[typing.List["LogicComponent"]] = None
+        self._sccs: typing.List[typing.List["LogicComponent"]] = None
+        self._build()
+
+    def _build(self) -> None:
+        for comp in self.components:
+            self.fanout[comp] = []
+        indeg = {comp: 0 for comp in self.components}
+        for comp in self.components:
+            for target, _ in comp.getOutputs():
+                if target not in self.fanout[comp]:
+                    self.fanout[comp].append(target)
+                    if target in indeg and type(comp) != Register:
+                        indeg[target] += 1
+
+        tick = 0
+        currentTick = [comp for comp in self.components if indeg[comp] == 0]
+        while len(currentTick) > 0:
+            nextTick = []
+            for u in currentTick:
+                self.level[u] = tick
+                if type(u) == Register:
+                    continue
+                for v in self.fanout[u]:
+                    if v in indeg:
+                        indeg[v] -= 1
+                        if indeg[v] == 0:
+                            nextTick.append(v)
+            currentTick = nextTick
+            tick += 1
+        self.acyclic = len(self.level) == len(self.components)
+
+    def isStale(self) -> bool:
+        """Whether the graph changed in a way this order doesn't know about"""
+        return not self.valid or self.version != self.versionOf()
+
+    def getTicks(self) -> typing.List[typing.List["LogicComponent"]]:
+        """Returns the components grouped by their level, in the order of the component list inside each level"""
+        if self._ticks is None:
+            ticks: typing.List[typing.List["LogicComponent"]] = []
+            for comp in self.components:
+                level = self.level[comp]
+                while len(ticks) <= level:
+                    ticks.append([])
+                ticks[level].append(comp)
+            self._ticks = [tick for tick in ticks if len(tick) > 0]
+        return self._ticks
+
+    def stronglyConnectedComponents(self) -> typing.List[typing.List["LogicComponent"]]:
+        """Returns the strongly connected components of the circuit (Tarjan's algorithm).
+
+        Every component is in exactly one of them. They are in topological order, i.e. all components an SCC
+        depends on are in earlier SCCs. Inside an SCC the components keep the order of the component list.
+        """
+        if self._sccs is None:
+            position = {comp: i for i, comp in enumerate(self.components)}
+            index: typing.Dict["LogicComponent", int] = {}
+            low: typing.Dict["LogicComponent", int] = {}
+            stack: typing.List["LogicComponent"] = []
+            onStack: typing.Set["LogicComponent"] = set()
+            sccs: typing.List[typing.List["LogicComponent"]] = []
+            for root in self.components:
+                if root in index:
+                    continue
+                index[root] = low[root] = len(index)
+                stack.append(root)
+                onStack.add(root)
+                work = [(root, self.successors(root), 0)]
+                while len(work) > 0:
+                    v, successors, i = work[-1]
+                    if i < len(successors):
+                        work[-1] = (v, successors, i + 1)
+                        w = successors[i]
+                        if w not in index:
+                            index[w] = low[w] = len(index)
+                            stack.append(w)
+                            onStack.add(w)
+                            work.append((w, self.successors(w), 0))
+                        elif w in onStack:
+                            low[v] = min(low[v], index[w])
+                        continue
+                    work.pop()
+                    if len(work) > 0:
+                        u = work[-1][0]
+                        low[u] = min(low[u], low[v])
+                    if low[v] == index[v]:
+                        scc = []
+                        while True:
+                            w = stack.pop()
+                            onStack.discard(w)
+                            scc.append(w)
+                            if w is v:
+                                break
+                        sccs.append(sorted(scc, key=position.__getitem__))
+            # Tarjan finds the SCCs in reverse topological order
+            sccs.reverse()
+            self._sccs = sccs
+        return self._sccs
+
+    def loops(self) -> typing.List[typing.List["LogicComponent"]]:
+        """Returns the SCCs which form a feedback loop, i.e. with more than one component or a connection to itself"""
+        return [scc for scc in self.stronglyConnectedComponents()
+                if len(scc) > 1 or scc[0] in self.successors(scc[0])]
+
+    def successors(self, comp: "LogicComponent") -> typing.List["LogicComponent"]:
+        """The successors of a component inside the component list, a Register has none (like in the levels)"""
+        if type(comp) == Register:
+            return []
+        return [target for target in self.fanout[comp] if target in self.fanout]
+
+    def addEdge(self, origin: "LogicComponent", target: "LogicComponent") -> None:
+        """Patches the order after a connection from origin to target was added"""
+        if origin not in self.fanout or target in self.fanout[origin]:
+            return
+        self.fanout[origin].append(target)
+        self._sccs = None
+        if target not in self.level or not self.acyclic or type(origin) == Register or self.level[origin] < self.level[target]:
+            return
+        # raise the level of the target and everything depending on it
+        self._ticks = None
+        self.level[target] = self.level[origin] + 1
+        stack = [target]
+        while len(stack) > 0:
+            u = stack.pop()
+            if type(u) == Register:
+                continue
+            for v in self.fanout[u]:
+                if v in self.level and self.level[v] <= self.level[u]:
+                    if v is origin:
+                        # the new connection closed a cycle, the levels are meaningless now
+                        self.acyclic = False
+                        return
+                    self.level[v] = self.level[u] + 1
+                    stack.append(v)
+
+    def removeEdge(self, origin: "LogicComponent", target: "LogicComponent") -> None:
+        """Patches the order after a connection from origin to target was removed"""
+        if origin not in self.fanout or target not in self.fanout[origin]:
+            return
+        if any(out is target for out, _ in origin.getOutputs()):
+            return  # there is still another connection between the two components
+        self.fanout[origin].remove(target)
+        self._sccs = None
+        if not self.acyclic:
+            # removing the connection might have broken the cycle, so the order has to be computed again
+            self.valid = False
+
+
+class TimingWheel:
+    """Discrete event scheduler of a circuit.
+
+    Components are scheduled for a tick and kept in a ring of buckets, one bucket per tick, which is large enough
+    for the longest propagation delay. When a component changes its outputs, the components connected to them
+    are scheduled delay ticks later. The delay is looked up by component first and by component type second
+    and defaults to 1, which gives the same waves as evaluating the fanout in the next tick.
+    Every component is scheduled at most once per tick, so a step costs O(scheduled components) and empty ticks
+    are skipped without touching the rest of the circuit.
+    """
+
+    def __init__(self, order: "GraphOrder" = None, delays: typing.Dict[typing.Any, int] = None, trackStates: bool = False,
+                 within: typing.Set["LogicComponent"] = None):
+        self.order: "GraphOrder" = order if order is not None and not order.isStale() else None
+        self.delays: typing.Dict[typing.Any, int] = dict(delays) if delays is not None else {}
+        if any(delay < 1 for delay in self.delays.values()):
+            raise ValueError("Propagation delays have to be at least 1 tick")
+        self.now: int = 0 # the tick evaluated by the next step
+        self.pending: int = 0 # number of scheduled evaluations
+        self.buckets: typing.List[typing.List["LogicComponent"]] = [[] for _ in range(max(self.delays.values(), default=1) + 1)]
+        self._scheduledFor: typing.Dict["LogicComponent", int] = {} # last tick each component was scheduled for
+        self._delayOf: typing.Dict["LogicComponent", int] = {}
+        self.within: typing.Optional[typing.Set["LogicComponent"]] = within # if set, only these components are scheduled
+        # Zobrist style hash of the states of all evaluated components, it only depends on their current states
+        self.trackStates: bool = trackStates
+        self.stateHash: int = 0
+        self._hashOf: typing.Dict["LogicComponent", int] = {}
+
+    def delayOf(self, comp: "LogicComponent") -> int:
+        """Returns the propagation delay of a component in ticks"""
+        delay = self._delayOf.get(comp)
+        if delay is None:
+            delay = self.delays.get(comp, self.delays.get(type(comp), 1))
+            self._delayOf[comp] = delay
+        return delay
+
+    def schedule(self, comp: "LogicComponent", delay: int = None) -> None:
+        """Schedules the evaluation of a component
+
+        Args:
+            comp (LogicComponent): The component to evaluate
+            delay (int): Ticks from now, the propagation delay of the component by default. 0 is the current tick
+        """
+        if self.within is not None and comp not in self.within:
+            return
+        if delay is None:
+            delay = self.delayOf(comp)
+        tick = self.now + delay
+        if self._scheduledFor.get(comp) == tick:
+            return
+        self._scheduledFor[comp] = tick
+        self.buckets[tick % len(self.buckets)].append(comp)
+        self.pending += 1
+
+    def nextTick(self) -> typing.Optional[int]:
+        """Returns the next tick with scheduled components, None if nothing is scheduled"""
+        if self.pending == 0:
+            return None
+        size = len(self.buckets)
+        tick = self.now
+        while len(self.buckets[tick % size]) == 0:
+            tick += 1
+        return tick
+
+    def step(self) -> typing.List["LogicComponent"]:
+        """Evaluates the next tick with scheduled components, empty ticks in between are skipped
+
+        Returns:
+            List[LogicComponent]: The evaluated components, empty if nothing was scheduled
+        """
+        if self.pending == 0:
+            return []
+        self.now = self.nextTick()
+        index = self.now % len(self.buckets)
+        current = self.buckets[index]
+        self.buckets[index] = []
+        self.pending -= len(current)
+        # the fanout is scheduled relative to the evaluated tick, at least one tick later
+        for g in current:
+            changedPorts = g.changedPorts
+            changedPorts.clear()
+            if self.trackStates and g not in self._hashOf:
+                self._hashOf[g] = _stateHash(g)
+            if g.eval():  # evaluate component
+                if self.trackStates:
+                    newHash = _stateHash(g)
+                    self.stateHash ^= self._hashOf[g] ^ newHash
+                    self._hashOf[g] = newHash
+                if len(changedPorts) > 0:
+                    # the component reported its changed outputs, only their connections are evaluated
+                    targets = Algorithms.changedFanout(g)
+                elif self.order is not None and g in self.order.fanout:
+                    targets = self.order.fanout[g]
+                else:
+                    targets = [tuple[0] for tuple in g.getOutputs()]
+                for target in targets:
+                    self.schedule(target)
+        self.now += 1
+        return current
+
+    def stateKey(self) -> tuple:
+        """Returns the hash of all states (only with trackStates) together with the scheduled components.
+        The evaluation continues the same way whenever the same key is reached again."""
+        size = len(self.buckets)
+        scheduled = tuple(tuple(comp.id for comp in self.buckets[(self.now + i) % size]) for i in range(size))
+        return self.stateHash, scheduled
+
+    def runTicks(self, ticks: int, updateFunction=None, waitFunction=None) -> None:
+        """Advances the time by the given number of ticks and evaluates everything scheduled until then"""
+        end = self.now + ticks
+        while self.pending > 0 and self.nextTick() < end:
+            evaluated = self.step()
+            if updateFunction is not None:
+                updateFunction(components=evaluated)
+            if waitFunction is not None:
+                waitFunction()
+        self.now = max(self.now, end)
+
+    def runUntilStable(self, maxSteps: int = None, updateFunction=None, waitFunction=None) -> bool:
+        """Evaluates until nothing is scheduled anymore
+
+        Args:
+            maxSteps (int): Optional maximum number of evaluated ticks
+
+        Returns:
+            bool: True if the circuit became stable, False if maxSteps was exceeded (e.g. an oscillating loop)
+        """
+        steps = 0
+        while self.pending > 0:
+            if maxSteps is not None and steps >= maxSteps:
+                return False
+            evaluated = self.step()
+            steps += 1
+            if updateFunction is not None:
+                updateFunction(components=evaluated)
+            if waitFunction is not None:
+                waitFunction()
+        return True
+
+
+def _repeatsState(wheel: TimingWheel, wave: typing.List["LogicComponent"], seen: typing.Dict[tuple, int],
+                  waves: typing.List[typing.List["LogicComponent"]], unstable: typing.List["LogicComponent"] = None) -> bool:
+    """Records the state after a wave and returns whether it was reached before. In that case the components
+    evaluated since then are added to unstable"""
+    waves.append(wave)
+    key = wheel.stateKey()
+    if key in seen:
+        if unstable is not None:
+            unstable.extend(dict.fromkeys(comp for wave in waves[seen[key]:] for comp in wave))
+        return True
+    seen[key] = len(waves)
+    return False
+
+
+def _stateHash(comp: "LogicComponent") -> int:
+    return hash((comp.id, tuple(value[0] for value in comp.state.values())))
+
+
+def hasHiddenState(components: typing.Iterable["LogicComponent"]) -> bool:
+    """Whether some components keep state outside of their outputs, e.g. the values of registers and memories"""
+    for comp in components:
+        if isinstance(comp, (Register, RegisterBlock, DataMemory, ProgramCounter)) or getattr(comp, "pure", True) is False:
+            return True
+    return False
@@ -8,6 +8,10 @@ GRID_ROWS = 40
 PALETTE_COLS = 3
 MIME_TYPE = "application/x-qt-grid-item"
 MAX_EVAL_CYCLES: int = 5
+TURBO_MAX_CYCLES: int = 1_000_000 # clock cycles a "run until" runs at most if its condition is never met
+FRAME_INTERVAL: int = 16 # ms between two repaints of the grid during animated evaluation, i.e. ~60 fps
+CUSTOM_COMPONENT_CACHE_SIZE: int = 1024 # input combinations memoized per combinational custom component
+CUSTOM_COMPONENT_LUT_BITS: int = 8 # custom components with at most this many input bits get a full lookup table
 APP_NAME = "CircuitQuest"
 BG_COLOR = (36,38,106)
 PR_COLOR_1 = (42,114,255)
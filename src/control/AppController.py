@@ -94,7 +94,7 @@ class AppController():
         """Handles level selection event from LevelSelectionScreen"""
 
         levelData = self.levelFileController.loadLevel(levelNumber)
-        self.levelController.setLevel(levelData)
+        self.levelController.setLevel(levelData, self.levelFileController.path)
         self.switchToScene(Scene.LEVEL)
 
     def stopApp(self):
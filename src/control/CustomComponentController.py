@@ -86,6 +86,24 @@ class CustomComponentController:
         #Return True otherwise
         return True
 
+    @staticmethod
+    def loadCustomComponentFile(filePath: Path) -> CustomLogicComponentData:
+        """Loads the JSON file of a single custom component.
+
+        Raises:
+            JSONDecodeError: If the file isn't valid JSON.
+            KeyError: If an entry of the component data is missing.
+        """
+        with open(filePath, "r") as f:
+            componentJson = json.load(f)
+        return CustomLogicComponentData(
+            componentJson["name"],
+            componentJson["inputMap"],
+            componentJson["outputMap"],
+            componentJson["components"],
+            componentJson["connections"]
+        )
+
     @staticmethod
     def loadCustomComponents() -> List[CustomLogicComponentData]:
         """Loads all custom components and returns them as a list of CustomLogicComponent
@@ -104,16 +122,7 @@ class CustomComponentController:
                     # Try loading the JSON file
                     try:
                         filePath = entry / f"{entry.name}.json"
-                        with open(filePath, "r") as f:
-                            componentJson = json.load(f)
-                            newComponent = CustomLogicComponentData(
-                                componentJson["name"],
-                                componentJson["inputMap"],
-                                componentJson["outputMap"],
-                                componentJson["components"],
-                                componentJson["connections"]
-                            )
-                            customComponentList.append(newComponent)
+                        customComponentList.append(CustomComponentController.loadCustomComponentFile(filePath))
 
                     # Catch possible exceptions
                     except JSONDecodeError as e:
@@ -0,0 +1,335 @@
+import copy
+import threading
+import traceback
+import typing
+
+from PySide6.QtCore import QObject, QThread, Signal
+
+from src.constants import TURBO_MAX_CYCLES
+from src.control.LogicComponentController import LogicComponentController, StopCondition
+from src.infrastructure.eventBus import EventBus
+from src.model import DataMemory, InstructionMemory, ProgramCounter, Register, RegisterBlock
+from src.model.CustomLogicComponent import CustomLogicComponent
+from src.model.Input import Input
+from src.model.LogicComponent import LogicComponent
+
+# ===== NOTE =====
+# The evaluation worker runs LogicComponentController.eval() on a worker thread, so big circuits don't block the GUI.
+# The worker never touches the components of the GUI. It evaluates a snapshot, i.e. a deep copy of the circuit
+# with its own bus and controller, and sends the states of every wave back to the GUI thread through queued signals.
+# The GUI thread copies those states into the real components and emits view:components_updated as usual.
+# When the evaluation is done, the remaining internal state (registers, memories, ...) is taken over as well.
+# Inputs are never overwritten, so they can still be toggled while an evaluation is running.
+# In turbo mode ("run until") the snapshot runs clock cycles without any waves or waits, the GUI is updated once at the end.
+# The topology of a snapshot never changes, so it has its own topology version and edits in the GUI don't invalidate
+# its netlist. The worker keeps the last snapshot and only copies the circuit again after it was edited,
+# otherwise the states of the circuit are copied into the snapshot before the next evaluation.
+# ================
+
+# attributes besides the state that an evaluation can change, they are taken over from a snapshot.
+# The memory of a DataMemory and the child components of custom components are handled by _copyState.
+_STATE_ATTRIBUTES: typing.Dict[type, typing.Tuple[str, ...]] = {
+    Register: ("nextState", "needNewState"),
+    RegisterBlock: ("registers",),
+    ProgramCounter: ("maxValue",),
+}
+# attributes which are only replaced when something is loaded, a snapshot can share them with the circuit
+_LOADED_ATTRIBUTES: typing.Dict[type, typing.Tuple[str, ...]] = {
+    InstructionMemory: ("instructionList", "program"),
+}
+
+StateList = typing.List[typing.Tuple[LogicComponent, dict]] # (original component, copied state) pairs
+
+
+class EvaluationStopped(Exception):
+    """Raised inside the worker thread when the running evaluation was stopped."""
+
+
+class _SnapshotController(LogicComponentController):
+    """The controller of a snapshot. While a worker thread evaluates the snapshot, the waits between waves
+    are handled by that thread instead of a QEventLoop."""
+
+    def __init__(self, bus: EventBus):
+        super().__init__(bus)
+        self.thread: typing.Optional["_EvaluationThread"] = None
+        self.tick: int = 0 # number of evaluated ticks (waves), shown by the SimulationControls
+
+    def updateComponents(self, **tickList) -> None:
+        self.tick += 1
+        super().updateComponents(**tickList)
+
+    def _waitWithEventLoop(self) -> None:
+        if self.thread is None:
+            super()._waitWithEventLoop()
+        else:
+            self.thread.waitForNextTick()
+
+    def _showsWaves(self) -> bool:
+        return (self.thread is not None and self.thread.stepping) or super()._showsWaves()
+
+
+class CircuitSnapshot:
+    """A deep copy of the circuit of a controller, which can be evaluated without touching the original components.
+
+    The copies get their own bus, so events emitted during the evaluation (e.g. newCycle) only reach the
+    controller of the snapshot.
+    """
+
+    def __init__(self, controller: LogicComponentController):
+        self.bus: EventBus = EventBus()
+        self.sourceVersion: int = controller.versionOf() # topology version of the circuit when it was copied
+        self.version: int = 0 # topology version of the copies, see LogicComponentController.versionOf
+        self.originals: typing.List[LogicComponent] = list(controller.components)
+        # map every bus the components know to the private bus, so deepcopy doesn't copy the subscribers
+        memo = {id(controller.bus): self.bus}
+        for comp in self.originals:
+            memo[id(comp.bus)] = self.bus
+        self.copies: typing.List[LogicComponent] = copy.deepcopy(self.originals, memo)
+        self.originalOf: typing.Dict[int, LogicComponent] = {
+            id(copied): original for copied, original in zip(self.copies, self.originals)
+        }
+        self.copyOf: typing.Dict[int, LogicComponent] = {
+            id(original): copied for original, copied in zip(self.originals, self.copies)
+        }
+        for comp in self.copies:
+            if type(comp) == ProgramCounter:
+                # deepcopy doesn't run __init__, which subscribes the program counter
+                self.bus.subscribe("logic:instruction_count", comp.onInstructionCount)
+
+        self.controller: _SnapshotController = _SnapshotController(self.bus)
+        self.controller.versionOf = lambda: self.version
+        self.controller.components = self.copies
+        self.controller.indexClockedElements()
+        self._takeSettings(controller)
+
+    def matches(self, controller: LogicComponentController) -> bool:
+        """Whether this snapshot is still a copy of the circuit of the controller, i.e. no component
+        or connection was added or removed since it was taken"""
+        return self.sourceVersion == controller.versionOf() and len(controller.components) == len(self.originals) \
+            and all(comp is original for comp, original in zip(controller.components, self.originals))
+
+    def refresh(self, controller: LogicComponentController) -> None:
+        """Copies the current states of the circuit into the snapshot, so it can be evaluated again.
+        Only call this if the snapshot matches the circuit and no evaluation of it is running."""
+        for original, copied in zip(self.originals, self.copies):
+            _copyState(original, copied)
+            for name in _LOADED_ATTRIBUTES.get(type(original), ()):
+                setattr(copied, name, getattr(original, name))
+        self.controller.tick = 0
+        self._takeSettings(controller)
+
+    def _takeSettings(self, controller: LogicComponentController) -> None:
+        """Takes over the settings of the controller that can change without changing the circuit"""
+        fixedInputs = [self.copyOf[id(comp)] for comp in controller.fixedInputs]
+        if fixedInputs != self.controller.fixedInputs:
+            self.controller.invalidateNetlist() # the constants of the netlist depend on the fixed inputs
+        self.controller.fixedInputs = fixedInputs
+        self.controller.inputs = [self.copyOf[id(comp)] for comp in controller.inputs]
+        self.controller.outputs = [self.copyOf[id(comp)] for comp in controller.outputs]
+        for name in ("registerBlock", "instructionMemory", "dataMemory"):
+            original = getattr(controller, name)
+            setattr(self.controller, name, self.copyOf[id(original)] if original is not None else None)
+        self.controller.tickLength = controller.tickLength
+        self.controller.propagationDelays = {self.copyOf.get(id(key), key): delay
+                                             for key, delay in controller.propagationDelays.items()}
+
+    def statesOf(self, copies: typing.List[LogicComponent]) -> StateList:
+        """Returns the original components together with a copy of the state of their snapshot"""
+        if len(copies) == 0:
+            copies = self.copies
+        return [(self.originalOf[id(comp)], dict(comp.getState())) for comp in copies]
+
+    def adopt(self) -> None:
+        """Takes over the state of all copies into the original components. Only call this when the evaluation is done."""
+        for original, copied in zip(self.originals, self.copies):
+            if type(original) != Input:
+                _copyState(copied, original)
+
+
+def _copyState(source: LogicComponent, target: LogicComponent) -> None:
+    """Copies the state of a component into its copy (or the other way round), child components
+    of custom components are copied recursively
+
+    Raises:
+        ValueError: If the copy doesn't have the same child components as the source
+    """
+    target.state = dict(source.state)
+    for name in _STATE_ATTRIBUTES.get(type(source), ()):
+        value = getattr(source, name)
+        setattr(target, name, list(value) if isinstance(value, list) else value)
+    if type(source) == DataMemory:
+        target.dataList.assign(source.dataList)
+    if isinstance(source, CustomLogicComponent):
+        if len(source.childComponents) != len(target.childComponents):
+            raise ValueError("The copy of a custom component has different child components")
+        for sourceChild, targetChild in zip(source.childComponents, target.childComponents):
+            _copyState(sourceChild, targetChild)
+
+
+class _EvaluationThread(QThread):
+    """Evaluates a snapshot. The signals are emitted from the worker thread and delivered queued to the GUI thread."""
+    tickEvaluated = Signal(object, object, int) # this thread, StateList of one wave, number of evaluated ticks
+    evaluated = Signal(object, bool, bool) # this thread, success, stopped
+
+    def __init__(self, snapshot: CircuitSnapshot, tickLength: typing.Callable[[], float], stepping: bool,
+                 turbo: typing.Tuple[typing.Optional[StopCondition], int] = None):
+        super().__init__()
+        self.snapshot = snapshot
+        self.tickLength = tickLength
+        self.stepping = stepping
+        self.turbo = turbo # (condition, maximum number of cycles) of a "run until", None for a normal evaluation
+        self.cycles: int = 0 # completed clock cycles of a "run until"
+        self.stopRequested = threading.Event()
+        self.stepRequested = threading.Event()
+        snapshot.controller.thread = self
+        snapshot.bus.subscribe("view:components_updated", self.onComponentsUpdated)
+
+    def onComponentsUpdated(self, components: typing.List[LogicComponent]) -> None:
+        self.tickEvaluated.emit(self, self.snapshot.statesOf(components), self.snapshot.controller.tick)
+
+    def waitForNextTick(self) -> None:
+        """Called after every wave. Waits for the next step or the tick length and aborts if the evaluation was stopped"""
+        if self.stepping:
+            self.stepRequested.wait()
+            self.stepRequested.clear()
+        elif self.tickLength() > 0:
+            self.stopRequested.wait(self.tickLength())
+        if self.stopRequested.is_set():
+            raise EvaluationStopped()
+
+    def runTurbo(self) -> bool:
+        """Runs the clock cycles of a "run until", it can be stopped after every cycle"""
+        condition, maxCycles = self.turbo
+        controller = self.snapshot.controller
+        self.cycles = controller.runCycles(
+            maxCycles, lambda: self.stopRequested.is_set() or (condition is not None and condition.isMet()))
+        if self.stopRequested.is_set():
+            raise EvaluationStopped()
+        return len(controller.unstableLoops) == 0
+
+    def run(self) -> None:
+        success, stopped = False, False
+        try:
+            success = self.runTurbo() if self.turbo is not None else self.snapshot.controller.eval()
+        except EvaluationStopped:
+            stopped = True
+        except Exception:
+            traceback.print_exc()
+            stopped = True
+        self.snapshot.bus.unsubscribe("view:components_updated", self.onComponentsUpdated)
+        self.snapshot.controller.thread = None
+        self.evaluated.emit(self, success, stopped)
+
+
+class EvaluationWorker(QObject):
+    """Runs the evaluation of a controller's circuit on a worker thread.
+
+    start() evaluates the circuit with the tick length of the controller, step() evaluates one wave at a time
+    and stop() aborts the running evaluation. The components are updated wave by wave on the GUI thread.
+    """
+    evaluationFinished = Signal(bool) # emitted with the result of eval() when an evaluation was completed
+    evaluationStopped = Signal()
+    tickApplied = Signal(int) # emitted with the number of evaluated ticks whenever a wave was applied
+    cyclesCompleted = Signal(int) # emitted with the number of clock cycles when a "run until" is done
+
+    def __init__(self, controller: LogicComponentController, parent: QObject = None):
+        super().__init__(parent)
+        self.controller: LogicComponentController = controller
+        self.evaluationThread: typing.Optional[_EvaluationThread] = None
+        self.snapshot: typing.Optional[CircuitSnapshot] = None # the last snapshot, reused while the circuit is unchanged
+        self.lastWave: typing.List[LogicComponent] = []
+
+    def isRunning(self) -> bool:
+        return self.evaluationThread is not None
+
+    def isStepping(self) -> bool:
+        return self.evaluationThread is not None and self.evaluationThread.stepping
+
+    def start(self) -> None:
+        """Starts an evaluation, or continues a stepped evaluation without pausing after every wave"""
+        if self.evaluationThread is not None:
+            self.evaluationThread.stepping = False
+            self.evaluationThread.stepRequested.set()
+            return
+        self._startThread(stepping=False)
+
+    def step(self) -> None:
+        """Evaluates the next wave. Starts a stepped evaluation if none is running"""
+        if self.evaluationThread is None:
+            self._startThread(stepping=True)
+        else:
+            self.evaluationThread.stepping = True
+            self.evaluationThread.stepRequested.set()
+
+    def stop(self, wait: bool = False) -> None:
+        """Aborts the running evaluation after the current wave.
+
+        Args:
+            wait (bool): If True, blocks until the worker thread is done. Use this before the circuit is cleared.
+        """
+        thread = self.evaluationThread
+        if thread is None:
+            return
+        thread.stopRequested.set()
+        thread.stepRequested.set()
+        if wait:
+            thread.wait()
+            self.evaluationThread = None
+            self.evaluationStopped.emit()
+
+    def runUntil(self, condition: typing.Optional[StopCondition], maxCycles: int = TURBO_MAX_CYCLES) -> None:
+        """Runs clock cycles in turbo mode until the condition is met, see LogicComponentController.runUntil.
+        Nothing happens while another evaluation is running."""
+        if self.evaluationThread is not None:
+            return
+        self._startThread(stepping=False, turbo=(condition, maxCycles))
+
+    def _startThread(self, stepping: bool, turbo: typing.Tuple[typing.Optional[StopCondition], int] = None) -> None:
+        self.lastWave = []
+        snapshot = self._snapshot()
+        if turbo is not None and turbo[0] is not None:
+            condition = turbo[0]
+            turbo = (StopCondition(snapshot.copyOf[id(condition.component)], condition.value, condition.register), turbo[1])
+        self.evaluationThread = _EvaluationThread(snapshot, lambda: self.controller.tickLength, stepping, turbo)
+        self.evaluationThread.tickEvaluated.connect(self._applyTick)
+        self.evaluationThread.evaluated.connect(self._onEvaluated)
+        self.evaluationThread.start()
+
+    def _snapshot(self) -> CircuitSnapshot:
+        """Returns a snapshot with the current states of the circuit, the circuit is only copied again if it was edited"""
+        if self.snapshot is not None and self.snapshot.matches(self.controller):
+            self.snapshot.refresh(self.controller)
+        else:
+            self.snapshot = CircuitSnapshot(self.controller)
+        return self.snapshot
+
+    def _applyTick(self, thread: _EvaluationThread, states: StateList, tick: int) -> None:
+        if thread is not self.evaluationThread:
+            return # a wave of a stopped evaluation
+        components = []
+        for comp, state in states:
+            if type(comp) != Input:
+                comp.state = state
+            components.append(comp)
+        self.lastWave = components
+        self.controller.bus.emit("view:components_updated", components)
+        self.tickApplied.emit(tick)
+
+    def _onEvaluated(self, thread: _EvaluationThread, success: bool, stopped: bool) -> None:
+        if thread is not self.evaluationThread:
+            return # already handled by stop(wait=True)
+        self.evaluationThread = None
+        thread.wait()
+        if stopped:
+            self.evaluationStopped.emit()
+            return
+        thread.snapshot.adopt()
+        # Without a tick length only the last wave was sent, so the labels of all components are updated,
+        # while the connections of the last wave stay active
+        bus = self.controller.bus
+        with bus.batch("view:components_updated"):
+            bus.emit("view:components_updated", self.controller.components)
+            bus.emit("view:components_updated", self.lastWave)
+        if thread.turbo is not None:
+            self.cyclesCompleted.emit(thread.cycles)
+        self.evaluationFinished.emit(success)
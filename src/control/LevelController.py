@@ -1,23 +1,41 @@
 from src.control.LogicComponentController import LogicComponentController
+from src.engine.BatchEvaluator import BatchEvaluator
 from src.model import DataMemory, InstructionMemory, Register, Input, RegisterBlock
 from src.model.LogicComponent import LogicComponent
 from src.infrastructure.eventBus import getBus
 from src.constants import COMPONENT_MAP
 
-from typing import List, TypeVar, Type
+from pathlib import Path
+from typing import List, Optional, TypeVar, Type, Union
 
 class LevelController:
 
-    def __init__(self, logicComponentController: LogicComponentController, levelData = None, grid = None):
+    def __init__(self, logicComponentController: LogicComponentController, levelData = None, grid = None,
+                 levelDirectory: Union[str, Path, None] = None):
         self.levelData = levelData
+        # directory of the level file, relative paths in the level (e.g. memory images) are resolved against it
+        self.levelDirectory: Optional[Path] = Path(levelDirectory) if levelDirectory is not None else None
         self.logicComponentController = logicComponentController
         self.eventBus = getBus()
         self.currentLevel = None
         self.outputPredictions = []
+        self.evaluationWorker = None # the EvaluationWorker of the level scene, stopped before tests touch the circuit
 
-    def setLevel(self, levelData)-> None:
-        """Sets the current level data"""
+    def setEvaluationWorker(self, evaluationWorker) -> None:
+        """Sets the worker evaluating the circuit in the background, see runTests"""
+        self.evaluationWorker = evaluationWorker
+
+    def setLevel(self, levelData, levelDirectory: Union[str, Path, None] = None)-> None:
+        """Sets the current level data and the directory of its level file"""
         self.levelData = levelData
+        self.levelDirectory = Path(levelDirectory) if levelDirectory is not None else None
+
+    def resolvePath(self, path: Union[str, Path]) -> Path:
+        """Resolves a path of the level file, relative paths are relative to the directory of the level file"""
+        path = Path(path)
+        if self.levelDirectory is None or path.is_absolute():
+            return path
+        return self.levelDirectory / path
 
     def getLevel(self) -> dict:
         """Returns the current level data"""
@@ -60,6 +78,8 @@ class LevelController:
                 comp.state = {"outValue": (componentData["initialValue"], 32)}
                 
             if type(comp) == Input:
+                if componentData.get("fixedValue", False):
+                    self.logicComponentController.setFixedInput(comp)
                 if "initialValue" in componentData:
                     comp.state["outValue"] = (componentData["initialValue"], componentData["initialBitWidth"])
                     print(" settin bitwidth, and value")
@@ -76,10 +96,17 @@ class LevelController:
                 memoryData = self.levelData["memoryContents"]
                 if type(comp) == InstructionMemory:
                     instructions = memoryData["instructionMemory"]
-                    comp.loadInstructions(instructions)
+                    if isinstance(instructions, str):
+                        comp.loadImage(self.resolvePath(instructions)) # path of a program file
+                    else:
+                        comp.loadInstructions(instructions)
                 if type(comp) == DataMemory:
                     data = memoryData["dataMemory"]
-                    comp.loadData(data)
+                    if isinstance(data, str):
+                        # path of a memory image, for data that doesn't fit into a level file
+                        comp.loadImage(self.resolvePath(data))
+                    else:
+                        comp.loadData(data)
 
         # Set up connections if any
         if self.levelData.get("connections") is not None:
@@ -106,7 +133,7 @@ class LevelController:
         """Checks if the current configuration solves the level.
         In case there are output predictions, these will be checked first.
         This assumes that either the input values are fixed for this level or the user chooses the right predictions for their input.
-        Afterward, all tests from the level file will be run.
+        Afterward, all tests from the level file will be run (see runTests).
 
         Returns:
             bool: True if and only if the output predictions (if any) are correct and the tests pass.
@@ -116,17 +143,40 @@ class LevelController:
             for i, prediction in enumerate(self.outputPredictions):
                 if not prediction == self.logicComponentController.outputs[i].getState()["outValue"]:
                     return False
-        # Then iterate through tests
-        for i in range(len(self.levelData["tests"])):
-            test = self.levelData["tests"][i]
+        return all(self.runTests(self.levelData["tests"]))
+
+    def runTests(self, tests: List[dict]) -> List[bool]:
+        """Runs the given tests of a level file on the current circuit.
+        If possible, they are evaluated at once by the BatchEvaluator without touching the component states,
+        otherwise one after another with eval(). A running background evaluation is stopped before that.
+
+        Args:
+            tests (List[dict]): Tests with "inputs" and "expected_output" like in the level files
+
+        Returns:
+            List[bool]: Whether each test passed
+        """
+        results = BatchEvaluator(self.logicComponentController.getNetlist()).runTests(
+            self.logicComponentController.getInputs(),
+            self.logicComponentController.getOutputs(),
+            tests
+        )
+        if results is not None:
+            return results
+        # Otherwise iterate through tests, the worker must not evaluate the circuit at the same time
+        if self.evaluationWorker is not None:
+            self.evaluationWorker.stop(wait=True)
+        results = []
+        for test in tests:
             for i in range(len(test["inputs"])): # iterate through inputs in specific test
                 self.logicComponentController.getInputs()[i].setState(tuple(test["inputs"][i]))
             self.logicComponentController.eval()
+            passed = True
             for i in range(len(test["expected_output"])): # iterate through expected outputs in specific test
-                #print(self.logicComponentController.getOutputs()[i].getState()['outValue'],"==?", tuple(test["expected_output"][i]))
                 if self.logicComponentController.getOutputs()[i].getState()['outValue'] != tuple(test["expected_output"][i]):
-                    return False
-        return True
+                    passed = False
+            results.append(passed)
+        return results
     
     def resetLevel(self)-> None:
         """Resets the level to its initial state"""
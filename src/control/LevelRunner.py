@@ -0,0 +1,263 @@
+import argparse
+import itertools
+import json
+import os
+import sys
+import typing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from src.constants import COMPONENT_MAP
+from src.control.CustomComponentController import COMPONENT_DIRECTORY, CustomComponentController
+from src.control.LevelController import LevelController
+from src.control.LevelFileController import LevelFileController
+from src.control.LogicComponentController import LogicComponentController
+from src.infrastructure.eventBus import EventBus, getBus, setBus
+from src.model.CustomLogicComponent import CustomLogicComponent
+from src.model.Input import Input
+from src.model.Output import Output
+
+# ===== NOTE =====
+# Headless runner for the content pipeline: it verifies all level files (optionally together with reference
+# solutions) and all custom components, using all cores.
+# - Levels are built by the LevelController like in the game, but on a headless bus, so no view is involved.
+# - Every level is one job of a ProcessPoolExecutor. The tests of big combinational levels are split into
+#   several jobs, levels with sequential components keep their tests together because they depend on each other.
+# - Jobs only get file paths and test ranges, every worker process builds its circuits from the JSON files itself.
+# ================
+
+# components whose state depends on earlier tests, the tests of levels containing them can't be split
+_SEQUENTIAL_TYPES = ("Register", "RegisterBlock", "DataMemory", "InstructionMemory", "ProgramCounter", "DLatch")
+
+
+@dataclass()
+class LevelRunResult:
+    """The test results of a single level."""
+    levelId: int
+    results: typing.List[bool] = field(default_factory=list) # whether each test passed
+    error: typing.Optional[str] = None # set if the level or its solution couldn't be built or evaluated
+    hasSolution: bool = False # whether a reference solution was added to the level
+
+    @property
+    def passed(self) -> bool:
+        return self.error is None and all(self.results)
+
+
+@dataclass()
+class CustomComponentResult:
+    """The validation result of a single custom component."""
+    name: str
+    valid: bool
+    error: typing.Optional[str] = None
+
+
+def _initWorker() -> None:
+    """Gives every worker process its own headless bus"""
+    setBus(EventBus())
+    getBus().setHeadless(True)
+
+
+def _levelFile(levelsPath: str, levelNumber: int) -> dict:
+    fileController = LevelFileController()
+    fileController.path = levelsPath
+    return fileController.loadLevel(levelNumber)
+
+
+def _solutionFile(solutionsPath: typing.Optional[str], levelNumber: int) -> typing.Optional[dict]:
+    if solutionsPath is None:
+        return None
+    solutionFile = Path(solutionsPath) / f"level_{levelNumber}.json"
+    if not solutionFile.exists():
+        return None
+    with open(solutionFile, "r") as f:
+        return json.load(f)
+
+
+def buildLevel(levelData: dict, solution: dict = None, levelDirectory: str = None) -> LevelController:
+    """Builds a level headless and adds the components and connections of a reference solution.
+
+    The solution has the same format as a level file: "components" are added after the components of the level
+    and the indices of its "connections" refer to all components (level components first).
+    Relative paths in the level are resolved against levelDirectory.
+
+    Raises:
+        ValueError: If a component or a connection of the solution is invalid.
+    """
+    levelController = LevelController(LogicComponentController(), levelData, levelDirectory=levelDirectory)
+    levelController.buildLevel()
+    if solution is not None:
+        logicController = levelController.logicComponentController
+        for componentData in solution.get("components", []):
+            if componentData["type"] not in COMPONENT_MAP:
+                raise ValueError(f"Unknown component type: {componentData['type']}")
+            logicController.addLogicComponent(COMPONENT_MAP[componentData["type"]])
+        components = logicController.getComponents()
+        for connection in solution.get("connections", []):
+            if not logicController.addConnection(components[connection["origin"]], connection["originKey"],
+                                                 components[connection["destination"]], connection["destinationKey"]):
+                raise ValueError(f"Invalid connection in solution: {connection}")
+    return levelController
+
+
+def runLevelShard(levelsPath: str, levelNumber: int, solutionsPath: typing.Optional[str],
+                  start: int, stop: int) -> typing.Tuple[int, int, typing.List[bool], typing.Optional[str]]:
+    """Builds a level and runs the tests start to stop-1 of it. This is the job of a worker process.
+
+    Returns:
+        Tuple[int, int, List[bool], Optional[str]]: The level number, start, the test results and an error message
+    """
+    try:
+        levelData = _levelFile(levelsPath, levelNumber)
+        levelController = buildLevel(levelData, _solutionFile(solutionsPath, levelNumber), levelsPath)
+        return levelNumber, start, levelController.runTests(levelData.get("tests", [])[start:stop]), None
+    except Exception as e:
+        return levelNumber, start, [], f"{type(e).__name__}: {e}"
+
+
+def validateCustomComponent(filePath: str, exhaustiveBits: int = 10) -> CustomComponentResult:
+    """Loads a custom component and evaluates it, exhaustively if it has at most exhaustiveBits input bits
+    and with all zeros and all ones otherwise. This is the job of a worker process.
+    """
+    name = Path(filePath).stem
+    try:
+        data = CustomComponentController.loadCustomComponentFile(Path(filePath))
+        name = data.name
+        component = CustomLogicComponent(data)
+        inputCount = len([comp for comp in component.childComponents if type(comp) == Input])
+        outputCount = len([comp for comp in component.childComponents if type(comp) == Output])
+        if inputCount != len(data.inputMap) or outputCount != len(data.outputMap):
+            return CustomComponentResult(name, False, "The inputs and outputs don't match the child components")
+
+        # drive the component with one Input per input key
+        drivers = []
+        for key, bitwidth in data.inputMap.items():
+            driver = Input()
+            driver.setState((0, bitwidth))
+            component.inputs[key] = (driver, "outValue")
+            drivers.append(driver)
+        widths = list(data.inputMap.values())
+        if sum(widths) <= exhaustiveBits:
+            vectors = itertools.product(*[range(1 << width) for width in widths])
+        else:
+            vectors = [[0] * len(widths), [(1 << width) - 1 for width in widths]]
+        for vector in vectors:
+            for driver, value, width in zip(drivers, vector, widths):
+                driver.setState((value, width))
+            if not component.eval():
+                return CustomComponentResult(name, False, f"The evaluation failed for the inputs {list(vector)}")
+        return CustomComponentResult(name, True)
+    except Exception as e:
+        return CustomComponentResult(name, False, f"{type(e).__name__}: {e}")
+
+
+class LevelRunner:
+    """Runs the tests of all levels and validates custom components in parallel worker processes.
+
+    With maxWorkers=1 all jobs run in the current process, which is handy for debugging.
+    """
+
+    def __init__(self, levelsPath: str = "levels/", solutionsPath: typing.Optional[str] = None,
+                 maxWorkers: typing.Optional[int] = None, testsPerShard: int = 64):
+        self.levelsPath: str = levelsPath
+        self.solutionsPath: typing.Optional[str] = solutionsPath
+        self.maxWorkers: int = maxWorkers or os.cpu_count() or 1
+        self.testsPerShard: int = testsPerShard
+
+    def levelNumbers(self) -> typing.List[int]:
+        """Returns the numbers of all level_<n>.json files"""
+        numbers = []
+        for levelFile in Path(self.levelsPath).glob("level_*.json"):
+            number = levelFile.stem.split("_")[1]
+            if number.isdigit():
+                numbers.append(int(number))
+        return sorted(numbers)
+
+    def shards(self, levelNumber: int) -> typing.List[typing.Tuple[int, int]]:
+        """Splits the tests of a level into (start, stop) ranges that can be run independently"""
+        levelData = _levelFile(self.levelsPath, levelNumber)
+        solution = _solutionFile(self.solutionsPath, levelNumber) or {}
+        testCount = len(levelData.get("tests", []))
+        types = [comp["type"] for comp in levelData["components"] + solution.get("components", [])]
+        if any(t in _SEQUENTIAL_TYPES for t in types):
+            return [(0, testCount)]
+        return [(start, min(start + self.testsPerShard, testCount))
+                for start in range(0, testCount, self.testsPerShard)] or [(0, 0)]
+
+    def runLevels(self, levelNumbers: typing.List[int] = None) -> typing.List[LevelRunResult]:
+        """Runs the tests of the given levels (all levels by default)
+
+        Returns:
+            List[LevelRunResult]: One result per level, in the order of levelNumbers
+        """
+        if levelNumbers is None:
+            levelNumbers = self.levelNumbers()
+        jobs = []
+        results: typing.Dict[int, LevelRunResult] = {}
+        for levelNumber in levelNumbers:
+            results[levelNumber] = LevelRunResult(levelNumber)
+            try:
+                results[levelNumber].hasSolution = _solutionFile(self.solutionsPath, levelNumber) is not None
+                shards = self.shards(levelNumber)
+            except Exception as e:
+                results[levelNumber].error = f"{type(e).__name__}: {e}"
+                continue
+            jobs += [(self.levelsPath, levelNumber, self.solutionsPath, start, stop) for start, stop in shards]
+
+        # shards of a level are collected by their start, so the test results stay in order
+        shardResults: typing.Dict[int, typing.List[typing.Tuple[int, typing.List[bool]]]] = {}
+        for levelNumber, start, testResults, error in self._map(runLevelShard, jobs):
+            if error is not None and results[levelNumber].error is None:
+                results[levelNumber].error = error
+            shardResults.setdefault(levelNumber, []).append((start, testResults))
+        for levelNumber, shards in shardResults.items():
+            for _, testResults in sorted(shards, key=lambda shard: shard[0]):
+                results[levelNumber].results += testResults
+        return [results[levelNumber] for levelNumber in levelNumbers]
+
+    def validateCustomComponents(self, directory: Path = COMPONENT_DIRECTORY) -> typing.List[CustomComponentResult]:
+        """Validates every custom component in the given directory (the app's component directory by default)"""
+        directory = Path(directory)
+        if not directory.exists():
+            return []
+        files = [entry / f"{entry.name}.json" for entry in sorted(directory.iterdir()) if entry.is_dir()]
+        return list(self._map(validateCustomComponent, [(str(filePath),) for filePath in files]))
+
+    def _map(self, function: typing.Callable, jobs: typing.List[tuple]) -> typing.Iterator:
+        if self.maxWorkers == 1 or len(jobs) <= 1:
+            previousBus = getBus()
+            _initWorker()
+            try:
+                return [function(*job) for job in jobs]
+            finally:
+                setBus(previousBus)
+        with ProcessPoolExecutor(max_workers=min(self.maxWorkers, len(jobs)), initializer=_initWorker) as executor:
+            return list(executor.map(function, *zip(*jobs)))
+
+
+def main(argv: typing.List[str] = None) -> int:
+    """Command line entry point, e.g. python -m src.control.LevelRunner --solutions solutions/ --custom-components"""
+    parser = argparse.ArgumentParser(description="Runs the tests of all levels headless and in parallel.")
+    parser.add_argument("--levels", default="levels/", help="directory of the level files")
+    parser.add_argument("--solutions", default=None, help="directory with reference solutions (level_<n>.json)")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes (default: all cores)")
+    parser.add_argument("--custom-components", action="store_true", help="also validate all custom components")
+    args = parser.parse_args(argv)
+
+    runner = LevelRunner(args.levels, args.solutions, args.workers)
+    failed = False
+    for result in runner.runLevels():
+        passedTests = sum(result.results)
+        status = "ERROR" if result.error else f"{passedTests}/{len(result.results)} tests passed"
+        print(f"level {result.levelId}: {status}" + (f" ({result.error})" if result.error else ""))
+        # without a solution the tests are expected to fail, only errors are failures then
+        failed |= result.error is not None or (result.hasSolution and not result.passed)
+    if args.custom_components:
+        for result in runner.validateCustomComponents():
+            print(f"custom component {result.name}: " + ("valid" if result.valid else f"INVALID ({result.error})"))
+            failed |= not result.valid
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,19 @@
 import typing
+from contextlib import nullcontext
+from dataclasses import dataclass
 
-from src.Algorithms import Algorithms
-from src.model import DataMemory, InstructionMemory, ProgramCounter
+from src.Algorithms import Algorithms, GraphOrder, TimingWheel, hasHiddenState
+from src.constants import MAX_EVAL_CYCLES, TURBO_MAX_CYCLES
+from src.engine.Netlist import Netlist
+from src.engine.LookupTables import synthesizeLookupTables
+from src.engine.ConstantFolding import foldConstants
+from src.model import DataMemory, DLatch, InstructionMemory, ProgramCounter, Register
 from src.model.CustomLogicComponent import CustomLogicComponent
 from src.model.CustomLogicComponentData import CustomLogicComponentData
 from src.model.Output import Output
 from src.model.LogicComponent import LogicComponent
 from src.model.Input import Input
-from src.infrastructure.eventBus import getBus
+from src.infrastructure.eventBus import EventBus, getBus
 from src.model.RegisterBlock import RegisterBlock
 from PySide6.QtCore import QTimer, QEventLoop
 
@@ -16,22 +22,64 @@ from PySide6.QtCore import QTimer, QEventLoop
 # Those lines of code make up less than 10% of the code and everything was peer-reviewed by humans and changes were made for fine-tuning.
 # ===================
 
+# sequential elements, the controller keeps an index of them, so a clock cycle doesn't have to scan all components
+CLOCKED_TYPES = (Register, RegisterBlock, ProgramCounter, DLatch, DataMemory)
+
+
+@dataclass()
+class StopCondition:
+    """The condition of a "run until", checked after every clock cycle."""
+    component: LogicComponent # a ProgramCounter, a RegisterBlock or an Output
+    value: int
+    register: int = 0 # the register number if component is a RegisterBlock
+
+    def isMet(self) -> bool:
+        if type(self.component) == RegisterBlock:
+            return self.component.registers[self.register] == self.value
+        return self.component.getState()["outValue"][0] == self.value
+
+
 class LogicComponentController:
     
-    def __init__(self):
+    def __init__(self, bus: EventBus = None):
         self.components: typing.List["LogicComponent"] = []
         self.inputs: typing.List["Input"] = []
         self.outputs: typing.List["LogicComponent"] = []
         self.updateInTick: typing.Dict = {}
         # tickLength defaults to 0, i.e. the evaluation happens instantly
         self.tickLength = 0
-        self.bus = getBus()
+        # a separate bus can be given for controllers of copied circuits, e.g. the snapshots of the EvaluationWorker
+        self.bus = bus if bus is not None else getBus()
         # Registration: now the handler is called automatically
         self.bus.subscribe("model:input_changed", self.onModelInputUpdate)
         self.bus.subscribe("newCycle", self.updateRegisters)
         self.registerBlock = None
         self.instructionMemory = None
         self.dataMemory = None
+        # cached topological order, patched when connections are added or removed through the controller
+        self.graphOrder: GraphOrder = None
+        # returns the topology version the cached order, netlist and fanout are checked against
+        self.versionOf: typing.Callable[[], int] = LogicComponent.currentTopologyVersion
+        # compiled version of the circuit, rebuilt lazily whenever the topology changed
+        self.netlist: Netlist = None
+        # inline custom components into the netlist, so their gates are scheduled like any other component
+        self.flattenCustomComponents: bool = True
+        # combinational regions with at most this many input bits are evaluated with lookup tables, 0 disables them.
+        # Only used for a headless bus, because the tables don't update the states inside of the regions
+        self.lookupTableBits: int = 8
+        # Inputs the player can't change (fixed values of a level), they are treated as constants by the netlist
+        self.fixedInputs: typing.List[Input] = []
+        self._netlistHeadless: bool = False # dead logic is only eliminated from netlists compiled for a headless bus
+        # propagation delays in ticks per component type (or component), the others take 1 tick.
+        # The netlist doesn't know about delays, so circuits are evaluated event driven while delays are set
+        self.propagationDelays: typing.Dict[typing.Any, int] = {}
+        # the feedback loops that made the last evaluation fail, empty if it succeeded
+        self.unstableLoops: typing.List[typing.List[LogicComponent]] = []
+        # index of the components in self.components with a CLOCKED_TYPE, in the same order
+        self.clockedElements: typing.List[LogicComponent] = []
+        # the components connected to the outputs of every clocked element, cached for one topology version
+        self._clockedFanout: typing.Dict[LogicComponent, typing.List[LogicComponent]] = {}
+        self._clockedFanoutVersion: int = -1
     
     
     def updateComponents(self, **tickList) -> None:
@@ -53,6 +101,63 @@ class LogicComponentController:
             loop.exec()
 
 
+    def _viewCallbacks(self) -> typing.Tuple[typing.Optional[typing.Callable], typing.Optional[typing.Callable]]:
+        """Returns the update and wait functions for the evaluation, which are both None if the bus is headless"""
+        if self.bus.headless:
+            return None, None
+        return self.updateComponents, self._waitWithEventLoop
+
+    def _showsWaves(self) -> bool:
+        """Whether every wave of the evaluation is visible on its own, i.e. there is a tick length"""
+        return self.tickLength > 0
+
+    def _coalescedViewUpdates(self):
+        """Without a tick length no wave is visible on its own, so all view updates of an evaluation are delivered at once"""
+        if not self._showsWaves():
+            return self.bus.batch("view:components_updated")
+        return nullcontext()
+
+    def getGraphOrder(self) -> GraphOrder:
+        """Returns the cached topological order of the current circuit and recomputes it if it is outdated"""
+        if self.graphOrder is None or self.graphOrder.isStale():
+            self.graphOrder = GraphOrder(self.components, self.versionOf)
+        return self.graphOrder
+
+    def getNetlist(self) -> Netlist:
+        """Returns the compiled netlist of the current circuit and recompiles it if the topology changed since the last call"""
+        if self.netlist is None or self.netlist.isStale() or self._netlistHeadless != self.bus.headless:
+            self.netlist = Netlist(self.components, self.getGraphOrder(), flatten=self.flattenCustomComponents)
+            self._netlistHeadless = self.bus.headless
+            foldConstants(self.netlist, self.fixedInputs, eliminateDeadLogic=self.bus.headless)
+            if self.bus.headless:
+                synthesizeLookupTables(self.netlist, self.lookupTableBits)
+        return self.netlist
+
+    def indexClockedElements(self) -> None:
+        """Rebuilds the index of clocked elements, needed after self.components was replaced as a whole"""
+        self.clockedElements = [comp for comp in self.components if isinstance(comp, CLOCKED_TYPES)]
+        self._clockedFanoutVersion = -1
+
+    def clockedFanout(self) -> typing.Dict[LogicComponent, typing.List[LogicComponent]]:
+        """Returns the components connected to the outputs of every clocked element (without duplicates).
+        It is only recomputed when the topology changed."""
+        if self._clockedFanoutVersion != self.versionOf():
+            self._clockedFanout = {comp: list(dict.fromkeys(out[0] for out in comp.getOutputs()))
+                                   for comp in self.clockedElements}
+            self._clockedFanoutVersion = self.versionOf()
+        return self._clockedFanout
+
+    def invalidateNetlist(self) -> None:
+        """Drops the compiled netlist and the cached order, they will be rebuilt on the next evaluation"""
+        self.netlist = None
+        self.graphOrder = None
+
+    def _patchGraphOrder(self, versionBefore: int, patch: typing.Callable[[GraphOrder], None]) -> None:
+        """Applies an incremental change to the cached order if it was up to date before the change"""
+        if self.graphOrder is not None and self.graphOrder.version == versionBefore:
+            patch(self.graphOrder)
+            self.graphOrder.version = self.versionOf()
+
     def eval(self) -> bool:
         """Evaluates all the components in order.
         
@@ -64,17 +169,41 @@ class LogicComponentController:
         # I just left it commented out so we can use it just in case.
         #getBus().setManual()
         self.bus.emit("logic:instruction_count",len(self.instructionMemory.instructionList) if self.instructionMemory is not None else 0)
-        if Algorithms.khanFrontierEval(self.inputs, self.components, self.updateComponents, self._waitWithEventLoop):
-            self.updateRegisters()
-            getBus().setAuto()
-            return True
-        elif Algorithms.eventDrivenEval(self.inputs, self.components, self.updateComponents, self._waitWithEventLoop):
-            self.updateRegisters()
-            getBus().setAuto()
-            return True
-        else:
+        updateFunction, waitFunction = self._viewCallbacks()
+        self.unstableLoops = []
+        with self._coalescedViewUpdates():
+            if len(self.propagationDelays) == 0 and self.getNetlist().run(updateFunction, waitFunction, waves=self._showsWaves()):
+                self.updateRegisters()
+                self.bus.setAuto()
+                return True
+            unstable: typing.List[LogicComponent] = []
+            if len(self.propagationDelays) == 0 and not hasHiddenState(self.components):
+                # only the feedback loops are evaluated event driven, the rest of the circuit in topological order
+                evaluated = Algorithms.sccEval(self.components, updateFunction, waitFunction, order=self.getGraphOrder(),
+                                               unstable=unstable)
+            else:
+                evaluated = Algorithms.eventDrivenEval(self.inputs, self.components, updateFunction, waitFunction,
+                                                       order=self.getGraphOrder(), delays=self.propagationDelays, unstable=unstable)
+            if evaluated:
+                self.updateRegisters()
+                self.bus.setAuto()
+                return True
+            self.unstableLoops = self._loopsOf(unstable)
             return False
 
+    def _loopsOf(self, unstable: typing.List[LogicComponent]) -> typing.List[typing.List[LogicComponent]]:
+        """Returns the feedback loops containing the given components, or all loops if none of them is in a loop"""
+        loops = self.getGraphOrder().loops()
+        unstableSet = set(unstable)
+        oscillating = [loop for loop in loops if any(comp in unstableSet for comp in loop)]
+        return oscillating if len(oscillating) > 0 else loops
+
+
+    def setFixedInput(self, comp: Input) -> None:
+        """Marks an Input whose value can't be changed by the player, the netlist treats it as a constant"""
+        if comp not in self.fixedInputs:
+            self.fixedInputs.append(comp)
+            self.invalidateNetlist()
 
     def getInputs(self) -> typing.List[Input]:
         return self.inputs
@@ -94,6 +223,10 @@ class LogicComponentController:
         """
         comp = component()
         self.components.append(comp)
+        self.invalidateNetlist()
+        if isinstance(comp, CLOCKED_TYPES):
+            self.clockedElements.append(comp)
+            self._clockedFanoutVersion = -1
         if type(comp) == Input:
             self.inputs.append(comp)
         if type(comp) == Output:
@@ -125,6 +258,7 @@ class LogicComponentController:
         """
         comp = CustomLogicComponent(componentData)
         self.components.append(comp)
+        self.invalidateNetlist()
         return comp
 
 
@@ -152,8 +286,14 @@ class LogicComponentController:
                 output[0].removeInput(component, output[0].getInputs()[output[1]][1], output[1])
 
             self.components.remove(component)
+            self.invalidateNetlist()
+            if component in self.clockedElements:
+                self.clockedElements.remove(component)
+                self._clockedFanoutVersion = -1
             if type(component) == Input:
                 self.inputs.remove(component)
+                if component in self.fixedInputs:
+                    self.fixedInputs.remove(component)
             if type(component) == Output:
                 self.outputs.remove(component)
             if type(component) == RegisterBlock:
@@ -177,7 +317,10 @@ class LogicComponentController:
         Args:
             model (LogicComponent): changed component
         """
-        Algorithms.eventDrivenEval(self.inputs, self.components, self.updateComponents, self._waitWithEventLoop, startingComponents=[model])
+        updateFunction, waitFunction = self._viewCallbacks()
+        with self._coalescedViewUpdates():
+            Algorithms.eventDrivenEval(self.inputs, self.components, updateFunction, waitFunction, startingComponents=[model],
+                                       delays=self.propagationDelays)
 
     def setTickLength(self, length: float) -> None:
         """sets the tick length for evaulation in seconds
@@ -200,8 +343,10 @@ class LogicComponentController:
             """
         if target.getBitwidth(targetKey) == 0 or origin.getState()[originKey][1] == target.getBitwidth(targetKey):
             #check if bitlengths of inputs and output are thesame or if input has bitlength 0 (means bitlength hasnt been set yet)
+            versionBefore = self.versionOf()
             if target.addInput(origin, originKey, targetKey):
                 origin.addOutput(target, targetKey)
+                self._patchGraphOrder(versionBefore, lambda order: order.addEdge(origin, target))
                 return True
             return False
         else:
@@ -218,31 +363,111 @@ class LogicComponentController:
             target (LogicComponent): The component where the connection ends.
             targetKey (str): The key of the input on the target component.
         """
+        versionBefore = self.versionOf()
         origin.removeOutput(target, targetKey)
         target.removeInput(origin, originKey, targetKey)
+        self._patchGraphOrder(versionBefore, lambda order: order.removeEdge(origin, target))
 
 
     def updateRegisters(self) -> None:
         """ Updates all registers and evaluates the circuit starting from the outputs of the registers.
+        Only the indexed clocked elements are visited, so this doesn't depend on the size of the circuit.
         """
-        componentsToUpdate = []
-        for comp in self.components:
+        fanout = self.clockedFanout()
+        componentsToUpdate = {}
+        for comp in self.clockedElements:
             if hasattr(comp, "updateState"):
                 comp.updateState()
                 # collect all components which are connected to the output of the register
-                componentsToUpdate.extend([out[0] for out in comp.getOutputs()])
+                componentsToUpdate.update(dict.fromkeys(fanout[comp]))
             if type(comp) == RegisterBlock:
                 comp.updateRegisterValues()
-                
-                
-        componentsToUpdate = list(set(componentsToUpdate))
-        Algorithms.eventDrivenEval(self.inputs, self.components, self.updateComponents, self._waitWithEventLoop, startingComponents=componentsToUpdate)
+
+        componentsToUpdate = list(componentsToUpdate)
+        updateFunction, waitFunction = self._viewCallbacks()
+        with self._coalescedViewUpdates():
+            Algorithms.eventDrivenEval(self.inputs, self.components, updateFunction, waitFunction, order=self.getGraphOrder(),
+                                       startingComponents=componentsToUpdate, delays=self.propagationDelays)
+
+    def runCycles(self, cycles: int, until: typing.Callable[[], bool] = None) -> int:
+        """Runs the circuit clock cycle by clock cycle with an iterative clock driver instead of the nested
+        evaluations started by newCycle.
+
+        The combinational logic is evaluated until it is stable while the program counters hold their address.
+        Then every cycle commits the registers and the register block, lets the program counters take over their
+        next address and evaluates the components reading a committed value until they are stable again.
+        Nothing is kept per cycle, so the stack depth and the memory don't grow with the number of cycles.
+
+        Args:
+            cycles (int): The maximum number of clock cycles
+            until (Callable[[], bool]): Optional condition, the run stops after the first cycle it is met
+
+        Returns:
+            int: The number of completed cycles. Fewer than cycles if the condition was met, the program ended
+            (a program counter passed the last instruction) or the combinational logic didn't become stable.
+            In the last case self.unstableLoops is set.
+        """
+        self.bus.emit("logic:instruction_count",len(self.instructionMemory.instructionList) if self.instructionMemory is not None else 0)
+        self.unstableLoops = []
+        order = self.getGraphOrder()
+        counters = [comp for comp in self.clockedElements if type(comp) == ProgramCounter]
+        combinational = set(self.components).difference(counters)
+        registers = [comp for comp in self.clockedElements if hasattr(comp, "updateState")]
+        registerBlocks = [comp for comp in self.clockedElements if type(comp) == RegisterBlock]
+        fanout = self.clockedFanout()
+        maxSteps = MAX_EVAL_CYCLES * max(len(combinational), 1)
+        # the program counters are left out, so the wheel never evaluates them and newCycle isn't emitted
+        wheel = TimingWheel(order, self.propagationDelays, within=combinational)
+        for comp in self.components: # the state of the circuit is unknown before the first cycle
+            wheel.schedule(comp, 0)
+        stable = wheel.runUntilStable(maxSteps)
+        completed = 0
+        while stable and completed < cycles:
+            # clock edge, afterwards only the components reading a committed value are evaluated
+            for comp in registers:
+                comp.updateState()
+                for target in fanout[comp]:
+                    wheel.schedule(target, 0)
+            for comp in registerBlocks:
+                comp.updateRegisterValues()
+                wheel.schedule(comp, 0)
+            running = True
+            for counter in counters:
+                running = counter.advance() and running
+                for target in fanout[counter]:
+                    wheel.schedule(target, 0)
+            completed += 1
+            stable = wheel.runUntilStable(maxSteps)
+            if not running or (until is not None and until()):
+                break
+        if not stable:
+            self.unstableLoops = self._loopsOf([])
+        if not self.bus.headless:
+            self.updateComponents(components=[])
+        return completed
+
+    def runUntil(self, condition: typing.Optional[StopCondition], maxCycles: int = TURBO_MAX_CYCLES) -> int:
+        """Turbo mode: runs clock cycles until the condition is met, without view updates and without waiting
+        between the waves. The view is updated once at the end.
+
+        Args:
+            condition (Optional[StopCondition]): When to stop, None to just run maxCycles cycles
+            maxCycles (int): The maximum number of clock cycles
+
+        Returns:
+            int: The number of completed cycles
+        """
+        return self.runCycles(maxCycles, condition.isMet if condition is not None else None)
 
     def clearComponents(self) -> None:
         """Removes all components from the controller
         """
         self.components.clear()
+        self.invalidateNetlist()
+        self.clockedElements.clear()
+        self._clockedFanoutVersion = -1
         self.inputs.clear()
+        self.fixedInputs.clear()
         self.outputs.clear()
         self.updateInTick.clear()
         self.registerBlock = None
@@ -0,0 +1,203 @@
+import typing
+from src.engine.Netlist import Netlist
+from src.engine.Kernels import LANE_KERNELS
+from src.model.LogicComponent import LogicComponent
+from src.model.Input import Input
+from src.model.Register import Register
+
+# ===== NOTE =====
+# The batch evaluator runs a whole set of input vectors through a compiled netlist at once.
+# A net whose values are all 0 or 1 is stored as a lane mask (bit i = value for vector i), so the
+# 1-bit gates evaluate every vector with a single bitwise operation (see LANE_KERNELS).
+# Nets with wider values are stored as a list with one value per vector and evaluated lane by lane.
+# The component states are never written, so nothing is redrawn while the vectors are evaluated.
+# ================
+
+LaneValue = typing.Union[int, typing.List[int]] # lane mask or list of per-vector values
+
+
+def packLanes(values: typing.List[int]) -> LaneValue:
+    """Packs per-vector values into a lane mask if all of them are 0 or 1, otherwise returns the list"""
+    mask = 0
+    for i, value in enumerate(values):
+        if value == 1:
+            mask |= 1 << i
+        elif value != 0:
+            return values
+    return mask
+
+
+def unpackLanes(lanes: LaneValue, count: int) -> typing.List[int]:
+    """Returns one value per vector"""
+    if type(lanes) is list:
+        return lanes
+    return [(lanes >> i) & 1 for i in range(count)]
+
+
+def _lane(lanes: LaneValue, i: int) -> int:
+    if type(lanes) is list:
+        return lanes[i]
+    return (lanes >> i) & 1
+
+
+def _broadcast(value: int, count: int) -> LaneValue:
+    if value == 0:
+        return 0
+    if value == 1:
+        return (1 << count) - 1
+    return [value] * count
+
+
+class BatchEvaluator:
+    """Evaluates many input vectors in one pass over a compiled netlist.
+
+    Registers latch at most once per vector and the vectors are applied in order, so a vector sees
+    every register write of the vectors before it (like running eval() once per vector would).
+    eval() evaluates the fanout of the registers again after they latched. A register whose clock is still 1
+    and whose data input changed by that gets a pending value (Register.needNewState), which it latches
+    in the next vector even if its clock is 0 then. The pending values are carried over the same way here.
+    """
+
+    def __init__(self, netlist: Netlist):
+        self.netlist: Netlist = netlist
+        self.registers: typing.List = [node for node in netlist.nodes if type(node.component) == Register]
+        # every node except Inputs and Registers needs a kernel, components with eval() only can't be batched
+        self.supported: bool = netlist.acyclic and all(
+            node.kernel is not None or type(node.component) in (Input, Register) for node in netlist.nodes
+        )
+
+    def evaluate(self, stimuli: typing.Dict[LogicComponent, typing.List[int]],
+                 probes: typing.List[typing.Tuple[LogicComponent, str]], count: int) -> typing.Optional[typing.List[typing.List[int]]]:
+        """Evaluates all input vectors.
+
+        Args:
+            stimuli: Maps Inputs to their value in every vector. Inputs without stimuli keep their current value.
+            probes: (component, output key) pairs whose values should be returned
+            count: The number of vectors
+
+        Returns:
+            Optional[List[List[int]]]: The values of the probes for every vector,
+                or None if the netlist can't be evaluated in batches.
+        """
+        if not self.supported:
+            return None
+        probeNets = [self.netlist.netIds[probe] for probe in probes]
+        registerValues = {node.component: node.component.getState()["outValue"][0] for node in self.registers}
+        # values the registers latch in the next vector whatever their clock is
+        pending = {node.component: node.component.nextState[0] for node in self.registers
+                   if node.component.needNewState}
+        results = []
+        start = 0
+        first = 0
+        while start < count:
+            lanes = self._evaluateLanes(stimuli, start, count, registerValues)
+            if first == 1:
+                # the latching vector with the new register values: registers with a clock of 1 see new data
+                for node in self.registers:
+                    dataNet, clkNet = node.inNets
+                    value = _lane(lanes[dataNet], 0)
+                    if _lane(lanes[clkNet], 0) == 1 and value != registerValues[node.component]:
+                        pending[node.component] = value
+            latch = self._firstLatch(lanes, count - start, first)
+            if len(pending) > 0:
+                latch = first if first < count - start else None
+            stop = count - start if latch is None else latch
+            probeLanes = [lanes[net] for net in probeNets]
+            for i in range(stop):
+                results.append([_lane(values, i) for values in probeLanes])
+            if latch is None:
+                break
+            for node in self.registers:
+                dataNet, clkNet = node.inNets
+                if _lane(lanes[clkNet], latch) == 1:
+                    registerValues[node.component] = _lane(lanes[dataNet], latch)
+                elif node.component in pending:
+                    registerValues[node.component] = pending[node.component]
+            pending = {}
+            # the latching vector is evaluated again with the new register values, without latching again
+            start += latch
+            first = 1
+        return results
+
+    def runTests(self, inputs: typing.List[Input], outputs: typing.List[LogicComponent],
+                 tests: typing.List[dict]) -> typing.Optional[typing.List[bool]]:
+        """Runs the tests of a level file.
+
+        Args:
+            inputs: The Inputs in the order of the test inputs
+            outputs: The Outputs in the order of the expected outputs
+            tests: The tests, each with "inputs" and "expected_output" as lists of [value, bitwidth]
+
+        Returns:
+            Optional[List[bool]]: Whether each test passes, or None if the netlist can't be evaluated in batches
+                or a test sets an input to another bitwidth than the one the netlist was compiled with.
+        """
+        if not self.supported:
+            return None
+        stimuli = {}
+        for i in range(max((len(test["inputs"]) for test in tests), default=0)):
+            # the widths of all nets were fixed when the netlist was compiled
+            width = self.netlist.netWidths[self.netlist.netIds[(inputs[i], "outValue")]]
+            # an input which is missing in a test keeps the value of the previous test
+            value = inputs[i].getState()["outValue"][0]
+            stimulus = []
+            for test in tests:
+                if i < len(test["inputs"]):
+                    if test["inputs"][i][1] != width:
+                        return None
+                    value = test["inputs"][i][0]
+                stimulus.append(value)
+            stimuli[inputs[i]] = stimulus
+        values = self.evaluate(stimuli, [(output, "outValue") for output in outputs], len(tests))
+        widths = [self.netlist.nodeOf[output].outWidths[0] for output in outputs]
+
+        passed = []
+        for test, row in zip(tests, values):
+            passed.append(all(
+                (row[i], widths[i]) == tuple(expected) for i, expected in enumerate(test["expected_output"])
+            ))
+        return passed
+
+    def _evaluateLanes(self, stimuli: dict, start: int, stop: int, registerValues: dict) -> typing.List[LaneValue]:
+        """Evaluates the vectors start..stop-1 with fixed register values and returns the lanes of every net"""
+        netlist = self.netlist
+        count = stop - start
+        full = (1 << count) - 1
+        lanes: typing.List[LaneValue] = [0] * len(netlist.values)
+        for net, comp, key in netlist.sources:
+            if comp in stimuli:
+                lanes[net] = packLanes(stimuli[comp][start:stop])
+            elif comp in registerValues:
+                lanes[net] = _broadcast(registerValues[comp], count)
+            else:
+                lanes[net] = _broadcast(comp.getState()[key][0], count)
+
+        for level in netlist.levels:
+            for node in level:
+                if node.kernel is None:
+                    continue # Inputs and Registers are sources
+                ins = [lanes[net] for net in node.inNets]
+                laneKernel = LANE_KERNELS.get(type(node.component))
+                if laneKernel is not None and all(type(value) is int for value in ins):
+                    result = laneKernel(full, *ins)
+                else:
+                    kernel = node.kernel
+                    rows = [kernel(*row) for row in zip(*[unpackLanes(value, count) for value in ins])]
+                    result = [packLanes(list(column)) for column in zip(*rows)]
+                for net, value in zip(node.outNets, result):
+                    lanes[net] = value
+        return lanes
+
+    def _firstLatch(self, lanes: typing.List[LaneValue], count: int, first: int) -> typing.Optional[int]:
+        """Returns the first vector (not before first) in which any register clock is 1"""
+        latch = None
+        for node in self.registers:
+            clk = lanes[node.inNets[1]]
+            if type(clk) is list:
+                index = next((i for i in range(first, count) if clk[i] == 1), None)
+            else:
+                clk = (clk >> first) << first
+                index = (clk & -clk).bit_length() - 1 if clk else None
+            if index is not None and (latch is None or index < latch):
+                latch = index
+        return latch
@@ -0,0 +1,315 @@
+import typing
+from src.model import (ALUAdvanced, ALUSimple, Adder32bit, And, Collector1to2, Collector1to3, Collector1to5,
+                       Collector1to6, Collector1to8, Collector8to16, Collector8to32, ControlUnit, DecoderThreeBit,
+                       FullAdder, HalfAdder, Multiplexer2Inp, Multiplexer4Inp, Multiplexer8Inp, Nand, Nor, Not, Or,
+                       Output, ShiftLeft2, SignExtend, Splitter32to8, Splitter8to1, Xnor, Xor)
+from src.model.LogicComponent import LogicComponent
+from src.engine.Kernels import _CONTROL_SIGNALS, _NO_CONTROL_SIGNALS
+
+# ===== NOTE =====
+# A small reduced ordered binary decision diagram (ROBDD) package.
+# Nodes are integers: 0 and 1 are the constants, every other node is an index into Bdd.nodes.
+# Multi-bit values are bit vectors, i.e. lists of nodes with the least significant bit first.
+# SYMBOLIC_KERNELS mirrors the kernels in Kernels.py on bit vectors, so a whole circuit can be
+# turned into one BDD per output bit and compared with another circuit independent of its input width.
+# ================
+
+FALSE: int = 0
+TRUE: int = 1
+
+BitVector = typing.List[int]
+
+
+class Bdd:
+    """Manager for the nodes of reduced ordered binary decision diagrams.
+
+    Variables with a lower index are closer to the root.
+    Creating more than nodeLimit nodes raises a MemoryError, as BDDs can grow exponentially.
+    """
+
+    def __init__(self, nodeLimit: int = 1_000_000):
+        self.nodeLimit: int = nodeLimit
+        terminal = 1 << 62 # variable index of the constants, below every real variable
+        self.nodes: typing.List[typing.Tuple[int, int, int]] = [(terminal, FALSE, FALSE), (terminal, TRUE, TRUE)]
+        self.unique: typing.Dict[typing.Tuple[int, int, int], int] = {}
+        self.iteCache: typing.Dict[typing.Tuple[int, int, int], int] = {}
+
+    def var(self, index: int) -> int:
+        """Returns the node of a single variable"""
+        return self._mk(index, FALSE, TRUE)
+
+    def _mk(self, var: int, low: int, high: int) -> int:
+        if low == high:
+            return low
+        key = (var, low, high)
+        node = self.unique.get(key)
+        if node is None:
+            if len(self.nodes) >= self.nodeLimit:
+                raise MemoryError(f"BDD node limit of {self.nodeLimit} reached")
+            node = len(self.nodes)
+            self.nodes.append(key)
+            self.unique[key] = node
+        return node
+
+    def ite(self, f: int, g: int, h: int) -> int:
+        """If-then-else: returns the node of (f and g) or (not f and h)"""
+        if f == TRUE:
+            return g
+        if f == FALSE:
+            return h
+        if g == h:
+            return g
+        if g == TRUE and h == FALSE:
+            return f
+        key = (f, g, h)
+        result = self.iteCache.get(key)
+        if result is not None:
+            return result
+
+        nodes = self.nodes
+        var = min(nodes[f][0], nodes[g][0], nodes[h][0])
+        f0, f1 = self._cofactors(f, var)
+        g0, g1 = self._cofactors(g, var)
+        h0, h1 = self._cofactors(h, var)
+        result = self._mk(var, self.ite(f0, g0, h0), self.ite(f1, g1, h1))
+        self.iteCache[key] = result
+        return result
+
+    def _cofactors(self, f: int, var: int) -> typing.Tuple[int, int]:
+        nodeVar, low, high = self.nodes[f]
+        if nodeVar == var:
+            return low, high
+        return f, f
+
+    def notOp(self, f: int) -> int:
+        return self.ite(f, FALSE, TRUE)
+
+    def andOp(self, f: int, g: int) -> int:
+        return self.ite(f, g, FALSE)
+
+    def orOp(self, f: int, g: int) -> int:
+        return self.ite(f, TRUE, g)
+
+    def xorOp(self, f: int, g: int) -> int:
+        return self.ite(f, self.notOp(g), g)
+
+    def satisfy(self, f: int) -> typing.Optional[typing.Dict[int, int]]:
+        """Returns an assignment of variables under which f is true, or None if f is always false.
+        Variables missing in the assignment can have any value."""
+        if f == FALSE:
+            return None
+        assignment = {}
+        while f != TRUE:
+            var, low, high = self.nodes[f]
+            # in a reduced diagram every node except FALSE has a path to TRUE
+            if low != FALSE:
+                assignment[var] = 0
+                f = low
+            else:
+                assignment[var] = 1
+                f = high
+        return assignment
+
+    # ===== Bit vectors =====
+
+    def constant(self, value: int, width: int) -> BitVector:
+        return [TRUE if (value >> i) & 1 else FALSE for i in range(width)]
+
+    def add(self, a: BitVector, b: BitVector, carry: int, width: int) -> typing.Tuple[BitVector, int]:
+        """Ripple carry addition of the lowest width bits, returns the sum and the carry out"""
+        result = []
+        for i in range(width):
+            x, y = _bit(a, i), _bit(b, i)
+            xy = self.xorOp(x, y)
+            result.append(self.xorOp(xy, carry))
+            carry = self.orOp(self.andOp(x, y), self.andOp(carry, xy))
+        return result, carry
+
+    def invert(self, a: BitVector, width: int) -> BitVector:
+        return [self.notOp(_bit(a, i)) for i in range(width)]
+
+    def select(self, condition: int, a: BitVector, b: BitVector) -> BitVector:
+        """Returns a where condition is true and b otherwise"""
+        return [self.ite(condition, _bit(a, i), _bit(b, i)) for i in range(max(len(a), len(b)))]
+
+    def equalsConstant(self, a: BitVector, value: int) -> int:
+        """Returns the node which is true if the bit vector equals value"""
+        if value >> len(a):
+            return FALSE
+        result = TRUE
+        for i, bit in enumerate(a):
+            result = self.andOp(result, bit if (value >> i) & 1 else self.notOp(bit))
+        return result
+
+    def lessThan(self, a: BitVector, b: BitVector, width: int) -> int:
+        """Unsigned a < b on the lowest width bits"""
+        less = FALSE
+        for i in range(width):
+            x, y = _bit(a, i), _bit(b, i)
+            less = self.ite(self.xorOp(x, y), y, less)
+        return less
+
+    def anyBit(self, a: BitVector) -> int:
+        result = FALSE
+        for bit in a:
+            result = self.orOp(result, bit)
+        return result
+
+
+def _bit(a: BitVector, i: int) -> int:
+    return a[i] if i < len(a) else FALSE
+
+
+# ===== Symbolic kernels =====
+# A symbolic kernel receives the BDD manager and one bit vector per input (in the order of component.inputs)
+# and returns one bit vector per output (in the order of component.state), like the kernels in Kernels.py.
+
+SymbolicKernel = typing.Callable[..., typing.Tuple[BitVector, ...]]
+
+
+def _gate(op: str, negate: bool = False) -> typing.Callable[[LogicComponent], SymbolicKernel]:
+    def kernel(bdd: Bdd, a: BitVector, b: BitVector) -> tuple:
+        result = getattr(bdd, op)(_bit(a, 0), _bit(b, 0))
+        return ([bdd.notOp(result) if negate else result],)
+    return lambda comp: kernel
+
+
+def _not(bdd: Bdd, a: BitVector) -> tuple:
+    return ([bdd.notOp(_bit(a, 0))],)
+
+
+def _halfAdder(bdd: Bdd, a: BitVector, b: BitVector) -> tuple:
+    x, y = _bit(a, 0), _bit(b, 0)
+    return ([bdd.xorOp(x, y)], [bdd.andOp(x, y)])
+
+
+def _fullAdder(bdd: Bdd, a: BitVector, b: BitVector, cin: BitVector) -> tuple:
+    total, carry = bdd.add(a[:1], b[:1], _bit(cin, 0), 1)
+    return (total, [carry])
+
+
+def _identity(bdd: Bdd, a: BitVector) -> tuple:
+    return (a,)
+
+
+def _adder32(bdd: Bdd, a: BitVector, b: BitVector) -> tuple:
+    total, carry = bdd.add(a, b, FALSE, max(len(a), len(b)))
+    return (total + [carry],) # Adder32bit doesn't mask its result
+
+
+def _multiplexer(bdd: Bdd, s: BitVector, *values: BitVector) -> tuple:
+    result: BitVector = []
+    for i, value in enumerate(values):
+        result = bdd.select(bdd.equalsConstant(s, i), value, result)
+    return (result,)
+
+
+def _decoder(bdd: Bdd, c: BitVector, b: BitVector, a: BitVector) -> tuple:
+    bits = [_bit(c, 0), _bit(b, 0), _bit(a, 0)]
+    return tuple([bdd.equalsConstant(bits, i)] for i in range(8))
+
+
+def _collector(shift: int) -> typing.Callable[[LogicComponent], SymbolicKernel]:
+    def collect(bdd: Bdd, *values: BitVector) -> tuple:
+        result: BitVector = []
+        for i, value in enumerate(values):
+            for j, bit in enumerate(value):
+                position = i * shift + j
+                result.extend([FALSE] * (position + 1 - len(result)))
+                result[position] = bdd.orOp(result[position], bit)
+        return (result,)
+    return lambda comp: collect
+
+
+def _splitter(shift: int, width: int) -> typing.Callable[[LogicComponent], SymbolicKernel]:
+    def factory(comp: LogicComponent) -> SymbolicKernel:
+        count = len(comp.state)
+        return lambda bdd, value: tuple(value[i * shift:i * shift + width] for i in range(count))
+    return factory
+
+
+def _shiftLeft2(comp: LogicComponent) -> SymbolicKernel:
+    width = comp.inputBitwidths["input1"]
+    if width > 0:
+        return lambda bdd, a: (([FALSE, FALSE] + a)[:width],)
+    return lambda bdd, a: ([FALSE, FALSE] + a,)
+
+
+def _aluSimple(bdd: Bdd, a: BitVector, b: BitVector, op: BitVector, ainvert: BitVector,
+               binvert: BitVector, carryin: BitVector) -> tuple:
+    a = bdd.select(_bit(ainvert, 0), bdd.invert(a, 32), a[:32])
+    b = bdd.select(_bit(binvert, 0), bdd.invert(b, 32), b[:32])
+    total, _ = bdd.add(a, b, _bit(carryin, 0), 32)
+    # like the model (and the other evaluators), OP codes above 2 are an error if they can occur
+    valid = bdd.orOp(bdd.orOp(bdd.equalsConstant(op, 0), bdd.equalsConstant(op, 1)), bdd.equalsConstant(op, 2))
+    if valid != TRUE:
+        raise ValueError("Invalid OP code. Supported codes are 0 (AND), 1 (OR), 2 (ADD).")
+    result = bdd.select(bdd.equalsConstant(op, 0), [bdd.andOp(_bit(a, i), _bit(b, i)) for i in range(32)], [])
+    result = bdd.select(bdd.equalsConstant(op, 1), [bdd.orOp(_bit(a, i), _bit(b, i)) for i in range(32)], result)
+    result = bdd.select(bdd.equalsConstant(op, 2), total, result)
+    return (result,)
+
+
+def _aluAdvanced(bdd: Bdd, a: BitVector, b: BitVector, op: BitVector, ainvert: BitVector, bnegate: BitVector) -> tuple:
+    a = bdd.select(_bit(ainvert, 0), bdd.invert(a, 32), a[:32])
+    negated, _ = bdd.add(bdd.invert(b, 32), [], TRUE, 32)
+    b = bdd.select(_bit(bnegate, 0), negated, b[:32])
+    total, _ = bdd.add(a, b, FALSE, 32)
+    # signed comparison: flipping the sign bits turns it into an unsigned comparison
+    flippedA = [_bit(a, i) for i in range(31)] + [bdd.notOp(_bit(a, 31))]
+    flippedB = [_bit(b, i) for i in range(31)] + [bdd.notOp(_bit(b, 31))]
+    result = [bdd.lessThan(flippedA, flippedB, 32)]
+    result = bdd.select(bdd.equalsConstant(op, 0), [bdd.andOp(_bit(a, i), _bit(b, i)) for i in range(32)], result)
+    result = bdd.select(bdd.equalsConstant(op, 1), [bdd.orOp(_bit(a, i), _bit(b, i)) for i in range(32)], result)
+    result = bdd.select(bdd.equalsConstant(op, 2), total, result)
+    return (result, [bdd.notOp(bdd.anyBit(result))])
+
+
+def _controlUnit(bdd: Bdd, opcode: BitVector) -> tuple:
+    matches = {code: bdd.equalsConstant(opcode, code) for code in _CONTROL_SIGNALS}
+    outputs = []
+    for index in range(len(_NO_CONTROL_SIGNALS)):
+        width = max(max(signals[index] for signals in _CONTROL_SIGNALS.values()).bit_length(), 1)
+        vector = []
+        for bit in range(width):
+            node = FALSE
+            for code, signals in _CONTROL_SIGNALS.items():
+                if (signals[index] >> bit) & 1:
+                    node = bdd.orOp(node, matches[code])
+            vector.append(node)
+        outputs.append(vector)
+    return tuple(outputs)
+
+
+SYMBOLIC_KERNELS: typing.Dict[type, typing.Callable[[LogicComponent], SymbolicKernel]] = {
+    And: _gate("andOp"),
+    Or: _gate("orOp"),
+    Not: lambda comp: _not,
+    Nand: _gate("andOp", negate=True),
+    Nor: _gate("orOp", negate=True),
+    Xor: _gate("xorOp"),
+    Xnor: _gate("xorOp", negate=True),
+    HalfAdder: lambda comp: _halfAdder,
+    FullAdder: lambda comp: _fullAdder,
+    Output: lambda comp: _identity,
+    Multiplexer2Inp: lambda comp: _multiplexer,
+    Multiplexer4Inp: lambda comp: _multiplexer,
+    Multiplexer8Inp: lambda comp: _multiplexer,
+    DecoderThreeBit: lambda comp: _decoder,
+    Collector1to2: _collector(1),
+    Collector1to3: _collector(1),
+    Collector1to5: _collector(1),
+    Collector1to6: _collector(1),
+    Collector1to8: _collector(1),
+    Collector8to16: _collector(8),
+    Collector8to32: _collector(8),
+    Splitter8to1: _splitter(1, 1),
+    Splitter32to8: _splitter(8, 8),
+    ShiftLeft2: _shiftLeft2,
+    SignExtend: lambda comp: _identity,
+    Adder32bit: lambda comp: _adder32,
+    ALUSimple: lambda comp: _aluSimple,
+    ALUAdvanced: lambda comp: _aluAdvanced,
+    ControlUnit: lambda comp: _controlUnit,
+}
+"""Maps component classes to factories of symbolic kernels."""
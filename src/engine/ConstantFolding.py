@@ -0,0 +1,155 @@
+import typing
+from dataclasses import dataclass, field
+from src.engine.Netlist import Netlist, NetlistNode, ZERO_NET
+from src.model import Multiplexer2Inp, Multiplexer4Inp, Multiplexer8Inp, And, Or, Nand, Nor, Output
+from src.model.CustomLogicComponent import STATEFUL_TYPES
+from src.model.Input import Input
+from src.model.Register import Register
+
+# ===== NOTE =====
+# Constant propagation and dead logic elimination for the optimized schedule of a netlist.
+# - Unconnected inputs (the zero net) and Inputs whose value can't be changed by the player are constants.
+#   Nodes whose outputs only depend on constants are evaluated once here and skipped afterwards,
+#   e.g. an And with a constant 0 input. Multiplexers with a constant selection just copy the selected input.
+# - Optionally, nodes without a path to an Output or a stateful component are skipped as well.
+#   Their states aren't updated anymore, so this is only meant for headless evaluations.
+# The values of the constant Inputs are recorded as assumptions of the netlist. If one of them changes anyway,
+# the netlist evaluates its original levels until the assumption holds again.
+# ================
+
+_MULTIPLEXERS = (Multiplexer2Inp, Multiplexer4Inp, Multiplexer8Inp)
+
+# outputs of gates which are already decided by some constant inputs, None if they aren't
+_PARTIAL_RULES: typing.Dict[type, typing.Callable[[typing.List[typing.Optional[int]]], typing.Optional[tuple]]] = {
+    And: lambda ins: (0,) if 0 in ins else None,
+    Or: lambda ins: (1,) if 1 in ins else None,
+    Nand: lambda ins: (1,) if 0 in ins else None,
+    Nor: lambda ins: (0,) if 1 in ins else None,
+}
+
+
+@dataclass()
+class FoldingResult:
+    """The nodes changed by foldConstants."""
+    folded: typing.List[NetlistNode] = field(default_factory=list) # nodes with constant outputs
+    selected: typing.List[NetlistNode] = field(default_factory=list) # multiplexers with a constant selection
+    dead: typing.List[NetlistNode] = field(default_factory=list) # nodes that don't affect anything observable
+
+
+def foldConstants(netlist: Netlist, constantInputs: typing.Iterable[Input] = (),
+                  eliminateDeadLogic: bool = False) -> FoldingResult:
+    """Propagates constants through the netlist and removes the nodes which don't need to be evaluated
+    from its optimized schedule. The states of folded components are written once.
+
+    Args:
+        netlist: The compiled netlist
+        constantInputs: Inputs whose value doesn't change, e.g. the fixed inputs of a level
+        eliminateDeadLogic: Whether nodes that can't affect an Output or a stateful component are skipped
+
+    Returns:
+        FoldingResult: The folded, simplified and dead nodes
+    """
+    result = FoldingResult()
+    if not netlist.acyclic:
+        return result
+    constants: typing.Dict[int, int] = {ZERO_NET: 0}
+    for comp in constantInputs:
+        net = netlist.netIds.get((comp, "outValue"))
+        if net is not None:
+            value = comp.getState()["outValue"][0]
+            constants[net] = value
+            netlist.assumptions.append((net, comp, "outValue", value))
+
+    for level in netlist.levels:
+        for node in level:
+            if not _canFold(node):
+                continue
+            ins = [constants.get(net) for net in node.inNets]
+            outputs = _fold(node, ins)
+            if outputs is not None:
+                _writeConstants(netlist, node, outputs, constants)
+                result.folded.append(node)
+            elif type(node.component) in _MULTIPLEXERS and ins[0] is not None and ins[0] + 1 < len(node.inNets):
+                netlist.replacedRuns[node] = _selectRun(netlist, node, node.inNets[ins[0] + 1])
+                result.selected.append(node)
+
+    if eliminateDeadLogic:
+        result.dead = _deadNodes(netlist, set(result.folded))
+    skipped = set(result.folded) | set(result.dead)
+    if len(skipped) > 0 or len(result.selected) > 0:
+        netlist.skipped |= skipped
+        netlist.reschedule([node for node in netlist.nodes if node not in netlist.skipped])
+    return result
+
+
+def _canFold(node: NetlistNode) -> bool:
+    comp = node.component
+    return node.kernel is not None and type(comp) not in (Input, Register) and not isinstance(comp, STATEFUL_TYPES)
+
+
+def _fold(node: NetlistNode, ins: typing.List[typing.Optional[int]]) -> typing.Optional[tuple]:
+    """Returns the constant outputs of a node, or None if they depend on a value that isn't constant"""
+    if all(value is not None for value in ins):
+        try:
+            return tuple(node.kernel(*ins))
+        except Exception:
+            return None # e.g. an invalid ALU operation, it is reported when the node is evaluated
+    rule = _PARTIAL_RULES.get(type(node.component))
+    if rule is not None:
+        return rule(ins)
+    if type(node.component) in _MULTIPLEXERS and ins[0] is not None and ins[0] + 1 < len(ins):
+        selected = ins[ins[0] + 1]
+        return (selected,) if selected is not None else None
+    return None
+
+
+def _writeConstants(netlist: Netlist, node: NetlistNode, outputs: tuple, constants: typing.Dict[int, int]) -> None:
+    state = node.component.state
+    for net, key, width, value in zip(node.outNets, node.outKeys, node.outWidths, outputs):
+        constants[net] = value
+        netlist.values[net] = value
+        state[key] = (value, width)
+
+
+def _selectRun(netlist: Netlist, node: NetlistNode, selectedNet: int) -> typing.Callable[[], bool]:
+    """Creates the closure of a multiplexer with a constant selection"""
+    values = netlist.values
+    comp = node.component
+    net, key, width = node.outNets[0], node.outKeys[0], node.outWidths[0]
+    def select() -> bool:
+        value = values[selectedNet]
+        values[net] = value
+        state = comp.state
+        old = state[key]
+        if old[0] != value or old[1] != width:
+            state[key] = (value, width)
+            return True
+        return False
+    return select
+
+
+def _deadNodes(netlist: Netlist, folded: typing.Set[NetlistNode]) -> typing.List[NetlistNode]:
+    """Returns the nodes without a path to an Output, a stateful component or a component without kernel"""
+    driver: typing.Dict[int, NetlistNode] = {}
+    for node in netlist.nodes:
+        for net in node.outNets:
+            driver[net] = node
+    stack = [node for node in netlist.nodes if _isObservable(node)]
+    live: typing.Set[NetlistNode] = set()
+    while stack:
+        node = stack.pop()
+        if node in live:
+            continue
+        live.add(node)
+        for net in node.inNets:
+            predecessor = driver.get(net)
+            if predecessor is not None and predecessor not in live:
+                stack.append(predecessor)
+    return [node for node in netlist.nodes
+            if node not in live and node not in folded and type(node.component) != Input]
+
+
+def _isObservable(node: NetlistNode) -> bool:
+    comp = node.component
+    # components without a kernel are evaluated with eval(), which might have side effects
+    return type(comp) == Output or isinstance(comp, STATEFUL_TYPES) or node.kernel is None
@@ -0,0 +1,230 @@
+import random
+import typing
+from dataclasses import dataclass, field
+from src.engine.Netlist import Netlist
+from src.engine.BatchEvaluator import BatchEvaluator
+from src.engine.NumpyEvaluator import NumpyEvaluator
+from src.engine.Bdd import Bdd, BitVector, SYMBOLIC_KERNELS, FALSE
+from src.model.LogicComponent import LogicComponent
+from src.model.Input import Input
+from src.model.Register import Register
+
+try:
+    import numpy as np
+except ImportError: # numpy is optional, the checker compares vectors in Python without it
+    np = None
+
+# ===== NOTE =====
+# The equivalence checker compares a circuit with a reference circuit on their whole input space.
+# - If there are at most exhaustiveBits input bits, all combinations are evaluated.
+# - Otherwise random vectors (and a few corner cases) are evaluated, followed by a BDD based proof.
+# Concrete vectors are evaluated in batches by the NumpyEvaluator if NumPy is available and
+# by the BatchEvaluator otherwise, so no eval() is called per vector.
+# ================
+
+
+@dataclass()
+class CircuitPorts:
+    """A circuit together with the inputs and outputs that should be compared."""
+    netlist: Netlist
+    inputs: typing.List[Input]
+    outputs: typing.List[LogicComponent]
+
+    @staticmethod
+    def fromController(controller) -> "CircuitPorts":
+        """Creates the ports of the circuit of a LogicComponentController"""
+        return CircuitPorts(controller.getNetlist(), list(controller.getInputs()), list(controller.getOutputs()))
+
+
+@dataclass()
+class EquivalenceResult:
+    """The result of an equivalence check."""
+    equivalent: bool
+    proven: bool # False if the circuits only agree on the sampled vectors
+    method: str # "exhaustive", "bdd" or "random"
+    counterexample: typing.Optional[typing.List[int]] = None # input values for which the outputs differ
+    values: typing.List[int] = field(default_factory=list) # outputs of the circuit for the counterexample
+    expected: typing.List[int] = field(default_factory=list) # outputs of the reference for the counterexample
+
+
+class EquivalenceChecker:
+    """Checks whether a circuit computes the same outputs as a reference circuit.
+
+    Both circuits must be combinational and have the same number of inputs and outputs.
+    The bitwidths of the inputs are taken from the circuit.
+    """
+
+    def __init__(self, circuit: CircuitPorts, reference: CircuitPorts, exhaustiveBits: int = 20,
+                 samples: int = 4096, chunkSize: int = 1 << 14, seed: int = 0, bddNodeLimit: int = 1_000_000):
+        if len(circuit.inputs) != len(reference.inputs) or len(circuit.outputs) != len(reference.outputs):
+            raise ValueError("The circuits have a different number of inputs or outputs")
+        for ports in (circuit, reference):
+            if not ports.netlist.acyclic or any(type(node.component) == Register for node in ports.netlist.nodes):
+                raise ValueError("Only combinational circuits can be checked for equivalence")
+        self.circuit: CircuitPorts = circuit
+        self.reference: CircuitPorts = reference
+        self.widths: typing.List[int] = [comp.getState()["outValue"][1] for comp in circuit.inputs]
+        self.exhaustiveBits: int = exhaustiveBits
+        self.samples: int = samples
+        self.chunkSize: int = chunkSize
+        self.seed: int = seed
+        self.bddNodeLimit: int = bddNodeLimit
+        # the evaluators for concrete vectors, compiled once per circuit
+        self.evaluators: typing.Dict[int, typing.Union[NumpyEvaluator, BatchEvaluator]] = {}
+        for ports in (circuit, reference):
+            evaluator = NumpyEvaluator(ports.netlist, chunkSize=chunkSize)
+            self.evaluators[id(ports)] = evaluator if evaluator.supported else BatchEvaluator(ports.netlist)
+
+    def check(self) -> EquivalenceResult:
+        """Runs the check and returns the first counterexample that was found"""
+        if sum(self.widths) <= self.exhaustiveBits:
+            return self._checkExhaustive()
+        result = self._checkRandom()
+        if not result.equivalent:
+            return result
+        return self._checkBdd() or result
+
+    # ===== Concrete vectors =====
+
+    def _checkExhaustive(self) -> EquivalenceResult:
+        total = 1 << sum(self.widths)
+        for start in range(0, total, self.chunkSize):
+            count = min(self.chunkSize, total - start)
+            if np is not None:
+                index = np.arange(start, start + count, dtype=np.uint64)
+            else:
+                index = range(start, start + count)
+            columns = []
+            offset = 0
+            for width in self.widths:
+                mask = (1 << width) - 1
+                if np is not None:
+                    columns.append((index >> np.uint64(offset)) & np.uint64(mask))
+                else:
+                    columns.append([(i >> offset) & mask for i in index])
+                offset += width
+            result = self._compare(columns, count, "exhaustive")
+            if result is not None:
+                return result
+        return EquivalenceResult(True, True, "exhaustive")
+
+    def _checkRandom(self) -> EquivalenceResult:
+        generator = random.Random(self.seed)
+        # corner cases first: all zeros, all ones, only the highest bits and only the lowest bits
+        rows = [
+            [0] * len(self.widths),
+            [(1 << width) - 1 for width in self.widths],
+            [1 << (width - 1) for width in self.widths],
+            [1] * len(self.widths),
+        ]
+        rows += [[generator.getrandbits(width) for width in self.widths] for _ in range(self.samples)]
+        for start in range(0, len(rows), self.chunkSize):
+            chunk = rows[start:start + self.chunkSize]
+            columns = [list(column) for column in zip(*chunk)]
+            if np is not None:
+                columns = [np.array(column, dtype=np.uint64) for column in columns]
+            result = self._compare(columns, len(chunk), "random")
+            if result is not None:
+                return result
+        return EquivalenceResult(True, False, "random")
+
+    def _compare(self, columns: list, count: int, method: str) -> typing.Optional[EquivalenceResult]:
+        """Evaluates both circuits and returns a result for the first vector where they differ"""
+        values = self._evaluate(self.circuit, columns, count)
+        expected = self._evaluate(self.reference, columns, count)
+        index = _firstMismatch(values, expected, count)
+        if index is None:
+            return None
+        return EquivalenceResult(
+            False, True, method,
+            [int(column[index]) for column in columns],
+            [int(column[index]) for column in values],
+            [int(column[index]) for column in expected]
+        )
+
+    def _evaluate(self, ports: CircuitPorts, columns: list, count: int) -> list:
+        """Returns one column of values per output"""
+        probes = [(output, "outValue") for output in ports.outputs]
+        evaluator = self.evaluators[id(ports)]
+        if type(evaluator) == NumpyEvaluator:
+            return evaluator.evaluate(dict(zip(ports.inputs, columns)), probes)
+        if not evaluator.supported:
+            raise ValueError("The circuit contains components that can't be evaluated in batches")
+        stimuli = {comp: [int(value) for value in column] for comp, column in zip(ports.inputs, columns)}
+        rows = evaluator.evaluate(stimuli, probes, count)
+        return [list(column) for column in zip(*rows)] if rows else [[] for _ in probes]
+
+    # ===== BDD =====
+
+    def _checkBdd(self) -> typing.Optional[EquivalenceResult]:
+        """Proves the equivalence with BDDs, returns None if a circuit can't be expressed or the BDDs get too big"""
+        for ports in (self.circuit, self.reference):
+            if not all(type(node.component) in SYMBOLIC_KERNELS or type(node.component) == Input
+                       for node in ports.netlist.nodes):
+                return None
+        bdd = Bdd(self.bddNodeLimit)
+        # interleave the bits of all inputs, which keeps the BDDs of adders and comparators small
+        variables: typing.List[BitVector] = [[] for _ in self.widths]
+        owners: typing.Dict[int, typing.Tuple[int, int]] = {}
+        for bit in range(max(self.widths, default=0)):
+            for index, width in enumerate(self.widths):
+                if bit < width:
+                    owners[len(owners)] = (index, bit)
+                    variables[index].append(bdd.var(len(owners) - 1))
+        try:
+            values = self._symbolic(bdd, self.circuit, variables)
+            expected = self._symbolic(bdd, self.reference, variables)
+            miter = FALSE
+            for a, b in zip(values, expected):
+                for i in range(max(len(a), len(b))):
+                    miter = bdd.orOp(miter, bdd.xorOp(a[i] if i < len(a) else FALSE, b[i] if i < len(b) else FALSE))
+        except MemoryError:
+            return None
+
+        assignment = bdd.satisfy(miter)
+        if assignment is None:
+            return EquivalenceResult(True, True, "bdd")
+        counterexample = [0] * len(self.widths)
+        for var, value in assignment.items():
+            index, bit = owners[var]
+            counterexample[index] |= value << bit
+        columns = [[value] for value in counterexample]
+        return EquivalenceResult(
+            False, True, "bdd", counterexample,
+            [int(column[0]) for column in self._evaluate(self.circuit, columns, 1)],
+            [int(column[0]) for column in self._evaluate(self.reference, columns, 1)]
+        )
+
+    def _symbolic(self, bdd: Bdd, ports: CircuitPorts, variables: typing.List[BitVector]) -> typing.List[BitVector]:
+        """Returns the bit vectors of the outputs of a circuit"""
+        netlist = ports.netlist
+        vectors: typing.List[BitVector] = [[] for _ in netlist.values] # ZERO_NET stays empty, i.e. 0
+        inputIndex = {comp: i for i, comp in enumerate(ports.inputs)}
+        for net, comp, key in netlist.sources:
+            if comp in inputIndex:
+                vectors[net] = variables[inputIndex[comp]]
+            else:
+                value, width = comp.getState()[key]
+                vectors[net] = bdd.constant(value, max(width, value.bit_length()))
+        for level in netlist.levels:
+            for node in level:
+                if type(node.component) == Input:
+                    continue
+                kernel = SYMBOLIC_KERNELS[type(node.component)](node.component)
+                result = kernel(bdd, *[vectors[net] for net in node.inNets])
+                for net, vector in zip(node.outNets, result):
+                    vectors[net] = vector
+        return [vectors[netlist.netIds[(output, "outValue")]] for output in ports.outputs]
+
+
+def _firstMismatch(values: list, expected: list, count: int) -> typing.Optional[int]:
+    """Returns the first vector in which any output column differs"""
+    if np is not None:
+        different = np.zeros(count, dtype=bool)
+        for a, b in zip(values, expected):
+            different |= np.asarray(a, dtype=np.uint64) != np.asarray(b, dtype=np.uint64)
+        return int(np.argmax(different)) if different.any() else None
+    for i in range(count):
+        if any(a[i] != b[i] for a, b in zip(values, expected)):
+            return i
+    return None
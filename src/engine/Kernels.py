@@ -0,0 +1,201 @@
+import typing
+from src.model import (ALUAdvanced, ALUSimple, Adder32bit, And, Collector1to2, Collector1to3, Collector1to5,
+                       Collector1to6, Collector1to8, Collector8to16, Collector8to32, ControlUnit, DecoderThreeBit,
+                       FullAdder, HalfAdder, Multiplexer2Inp, Multiplexer4Inp, Multiplexer8Inp, Nand, Nor, Not, Or,
+                       Output, ShiftLeft2, SignExtend, Splitter32to8, Splitter8to1, Xnor, Xor)
+from src.model.ControlUnit import _NO_SIGNALS, _SIGNALS
+from src.model.LogicComponent import LogicComponent
+
+# A kernel factory receives the component at compile time and returns (function, widths).
+# The function gets the integer values of all inputs (in the order of component.inputs)
+# and returns a tuple with one integer per output (in the order of component.state).
+# widths contains the bitwidth that is written back into the state for every output.
+KernelFactory = typing.Callable[[LogicComponent], typing.Tuple[typing.Callable[..., tuple], typing.Tuple[int, ...]]]
+
+
+# ===== 1-bit gates =====
+# These mirror the eval() methods of the model classes exactly (e.g. a+b == 2 for AND)
+
+def andKernel(a: int, b: int) -> tuple:
+    return (1 if a + b == 2 else 0,)
+
+def orKernel(a: int, b: int) -> tuple:
+    return (1 if a + b >= 1 else 0,)
+
+def notKernel(a: int) -> tuple:
+    return (1 if a == 0 else 0,)
+
+def nandKernel(a: int, b: int) -> tuple:
+    return (0 if a + b == 2 else 1,)
+
+def norKernel(a: int, b: int) -> tuple:
+    return (1 if a == 0 and b == 0 else 0,)
+
+def xorKernel(a: int, b: int) -> tuple:
+    return (1 if a != b else 0,)
+
+def xnorKernel(a: int, b: int) -> tuple:
+    return (1 if a == b else 0,)
+
+def halfAdderKernel(a: int, b: int) -> tuple:
+    return (1 if a != b else 0, 1 if a + b == 2 else 0)
+
+def fullAdderKernel(a: int, b: int, cin: int) -> tuple:
+    total = a + b + cin
+    return (total % 2, total // 2)
+
+
+def _fixed(fn) -> KernelFactory:
+    """Creates a factory for kernels whose output bitwidths never change"""
+    return lambda comp: (fn, tuple(width for _, width in comp.state.values()))
+
+
+# ===== Wiring components =====
+
+def _collector(shift: int) -> KernelFactory:
+    """Creates a factory for a collector which places input i at bit i*shift"""
+    def factory(comp: LogicComponent):
+        shifts = tuple(i * shift for i in range(len(comp.inputs)))
+        def collect(*values) -> tuple:
+            outValue = 0
+            for value, s in zip(values, shifts):
+                outValue |= value << s
+            return (outValue,)
+        return collect, tuple(width for _, width in comp.state.values())
+    return factory
+
+
+def _splitter(shift: int, mask: int) -> KernelFactory:
+    """Creates a factory for a splitter which extracts output i from bit i*shift"""
+    def factory(comp: LogicComponent):
+        shifts = tuple(i * shift for i in range(len(comp.state)))
+        def split(value: int) -> tuple:
+            return tuple((value >> s) & mask for s in shifts)
+        return split, tuple(width for _, width in comp.state.values())
+    return factory
+
+
+def _multiplexer(comp: LogicComponent):
+    def select(s: int, *values) -> tuple:
+        return (values[s],)
+    return select, (comp.inputBitwidths["input1"],)
+
+
+def _decoder(comp: LogicComponent):
+    def decode(c: int, b: int, a: int) -> tuple:
+        value = (a << 2) + (b << 1) + c
+        return tuple(1 if i == value else 0 for i in range(8))
+    return decode, (1,) * 8
+
+
+def _output(comp: LogicComponent):
+    return (lambda value: (value,)), (comp.inputBitwidths["input"],)
+
+
+def _shiftLeft2(comp: LogicComponent):
+    width = comp.inputBitwidths["input1"]
+    if width > 0:
+        mask = (1 << width) - 1
+        return (lambda a: ((a << 2) & mask,)), (width,)
+    return (lambda a: (a << 2,)), (width,)
+
+
+# ===== Arithmetic components =====
+
+def aluSimpleKernel(a: int, b: int, op: int, ainvert: int, binvert: int, carryin: int) -> tuple:
+    if ainvert == 1:
+        a = (~a) & 0xFFFFFFFF
+    if binvert == 1:
+        b = (~b) & 0xFFFFFFFF
+    if op == 0:
+        return (a & b,)
+    elif op == 1:
+        return (a | b,)
+    elif op == 2:
+        return ((a + b + carryin) & 0xFFFFFFFF,)
+    raise ValueError(f"Invalid OP code: {op}. Supported codes are 0 (AND), 1 (OR), 2 (ADD).")
+
+
+def aluAdvancedKernel(a: int, b: int, op: int, ainvert: int, bnegate: int) -> tuple:
+    if ainvert == 1:
+        a = (~a) & 0xFFFFFFFF
+    if bnegate == 1:
+        b = (~b + 1) & 0xFFFFFFFF
+    if op == 0:
+        result = a & b
+    elif op == 1:
+        result = a | b
+    elif op == 2:
+        result = (a + b) & 0xFFFFFFFF
+    elif op == 3:
+        signed_a = a if a < 0x80000000 else a - 0x100000000
+        signed_b = b if b < 0x80000000 else b - 0x100000000
+        result = 1 if signed_a < signed_b else 0
+    else:
+        raise ValueError(f"Invalid OP code: {op}. Supported codes are 0 (AND), 1 (OR), 2 (ADD), 3 (SLT).")
+    return (result, 1 if result == 0 else 0)
+
+
+# Control signals for RegDst, Branch, MemRead, MemtoReg, AluOp, MemWrite, AluSrc, RegWrite (the order of the state),
+# taken from the signals ControlUnit.eval writes
+_CONTROL_SIGNALS: typing.Dict[int, tuple] = {
+    opcode: tuple(value for value, _ in signals.values()) for opcode, signals in _SIGNALS.items()
+}
+_NO_CONTROL_SIGNALS: tuple = tuple(value for value, _ in _NO_SIGNALS.values())
+
+def controlUnitKernel(opcode: int) -> tuple:
+    return _CONTROL_SIGNALS.get(opcode, _NO_CONTROL_SIGNALS)
+
+
+KERNELS: typing.Dict[type, KernelFactory] = {
+    And: _fixed(andKernel),
+    Or: _fixed(orKernel),
+    Not: _fixed(notKernel),
+    Nand: _fixed(nandKernel),
+    Nor: _fixed(norKernel),
+    Xor: _fixed(xorKernel),
+    Xnor: _fixed(xnorKernel),
+    HalfAdder: _fixed(halfAdderKernel),
+    FullAdder: _fixed(fullAdderKernel),
+    Output: _output,
+    Multiplexer2Inp: _multiplexer,
+    Multiplexer4Inp: _multiplexer,
+    Multiplexer8Inp: _multiplexer,
+    DecoderThreeBit: _decoder,
+    Collector1to2: _collector(1),
+    Collector1to3: _collector(1),
+    Collector1to5: _collector(1),
+    Collector1to6: _collector(1),
+    Collector1to8: _collector(1),
+    Collector8to16: _collector(8),
+    Collector8to32: _collector(8),
+    Splitter8to1: _splitter(1, 0x1),
+    Splitter32to8: _splitter(8, 0xFF),
+    ShiftLeft2: _shiftLeft2,
+    SignExtend: _fixed(lambda a: (a,)),
+    Adder32bit: _fixed(lambda a, b: (a + b,)),
+    ALUSimple: _fixed(aluSimpleKernel),
+    ALUAdvanced: _fixed(aluAdvancedKernel),
+    ControlUnit: _fixed(controlUnitKernel),
+}
+"""Maps component classes to kernel factories. Components of other classes are evaluated with eval()."""
+
+
+# ===== Bit-parallel kernels =====
+# Every net holds a lane mask: bit i of the integer is the value of the net for stimulus i.
+# The kernels receive the mask with all lanes set (needed for negation) and the input masks,
+# and return a tuple of output masks. They are only valid for 1-bit values.
+
+LANE_KERNELS: typing.Dict[type, typing.Callable[..., tuple]] = {
+    And: lambda full, a, b: (a & b,),
+    Or: lambda full, a, b: (a | b,),
+    Not: lambda full, a: (~a & full,),
+    Nand: lambda full, a, b: (~(a & b) & full,),
+    Nor: lambda full, a, b: (~(a | b) & full,),
+    Xor: lambda full, a, b: (a ^ b,),
+    Xnor: lambda full, a, b: (~(a ^ b) & full,),
+    HalfAdder: lambda full, a, b: (a ^ b, a & b),
+    FullAdder: lambda full, a, b, cin: (a ^ b ^ cin, (a & b) | (cin & (a ^ b))),
+    Output: lambda full, a: (a,),
+}
+"""Maps the 1-bit component classes to their bit-parallel kernels."""
@@ -0,0 +1,127 @@
+import typing
+from src.engine.Netlist import Netlist
+from src.engine.Kernels import LANE_KERNELS
+from src.model.LogicComponent import LogicComponent
+from src.model.Input import Input
+
+# ===== NOTE =====
+# The lane simulator evaluates circuits built only from 1-bit gates with bit-parallel kernels.
+# Every net carries a lane mask, bit i of it is the value of the net for stimulus i, so each gate
+# evaluates a whole word of stimuli with one bitwise operation. This makes exhaustive testing
+# (all 2^n input combinations) and stuck-at fault simulation cheap.
+# ================
+
+Fault = typing.Tuple[LogicComponent, str, int] # (component, output key, stuck-at value)
+
+
+class LaneSimulator:
+    """Evaluates a combinational 1-bit netlist on many stimuli at once.
+
+    Stimuli are evaluated in chunks of laneWidth lanes (64 by default, like a machine word).
+    With laneWidth=None all stimuli are evaluated in a single pass with arbitrarily wide masks.
+    """
+
+    def __init__(self, netlist: Netlist, laneWidth: typing.Optional[int] = 64):
+        self.netlist: Netlist = netlist
+        self.laneWidth: typing.Optional[int] = laneWidth
+        self.supported: bool = netlist.acyclic and all(
+            type(node.component) in LANE_KERNELS
+            or (type(node.component) == Input and node.outWidths == (1,))
+            for node in netlist.nodes
+        )
+
+    def simulate(self, stimuli: typing.Dict[LogicComponent, int], lanes: int,
+                 faults: typing.List[Fault] = None) -> typing.List[int]:
+        """Evaluates one chunk of stimuli.
+
+        Args:
+            stimuli: Maps Inputs to their lane mask. Inputs without stimuli keep their current value in all lanes.
+            lanes: The number of lanes
+            faults: Outputs which are stuck at 0 or 1, regardless of the inputs
+
+        Returns:
+            List[int]: The lane mask of every net (indexed by net id)
+
+        Raises:
+            ValueError: If the netlist contains components that can't be evaluated bit-parallel.
+        """
+        if not self.supported:
+            raise ValueError("The circuit contains multi-bit, sequential or cyclic parts")
+        netlist = self.netlist
+        full = (1 << lanes) - 1
+        stuck = {}
+        for comp, key, value in faults or []:
+            stuck[netlist.netIds[(comp, key)]] = full if value else 0
+
+        masks = [0] * len(netlist.values)
+        for net, comp, key in netlist.sources:
+            if comp in stimuli:
+                masks[net] = stimuli[comp] & full
+            else:
+                masks[net] = full if comp.getState()[key][0] == 1 else 0
+            if net in stuck:
+                masks[net] = stuck[net]
+
+        for level in netlist.levels:
+            for node in level:
+                if node.kernel is None:
+                    continue # Inputs are sources
+                result = LANE_KERNELS[type(node.component)](full, *[masks[net] for net in node.inNets])
+                for net, mask in zip(node.outNets, result):
+                    masks[net] = stuck.get(net, mask)
+        return masks
+
+    def truthTable(self, inputs: typing.List[LogicComponent], probes: typing.List[typing.Tuple[LogicComponent, str]],
+                   faults: typing.List[Fault] = None) -> typing.List[int]:
+        """Evaluates all 2^n combinations of the given inputs.
+
+        Input k holds bit k of the combination, so lane i of the result is the value for combination i.
+
+        Args:
+            inputs: The Inputs to enumerate
+            probes: (component, output key) pairs whose values should be returned
+            faults: Outputs which are stuck at 0 or 1
+
+        Returns:
+            List[int]: One mask with 2^n lanes per probe
+        """
+        total = 1 << len(inputs)
+        chunk = total if self.laneWidth is None else min(self.laneWidth, total)
+        probeNets = [self.netlist.netIds[probe] for probe in probes]
+        tables = [0] * len(probes)
+        for base in range(0, total, chunk):
+            lanes = min(chunk, total - base)
+            stimuli = {comp: countingMask(k, base, lanes) for k, comp in enumerate(inputs)}
+            masks = self.simulate(stimuli, lanes, faults)
+            for i, net in enumerate(probeNets):
+                tables[i] |= masks[net] << base
+        return tables
+
+    def detectableFaults(self, inputs: typing.List[LogicComponent],
+                         probes: typing.List[typing.Tuple[LogicComponent, str]]) -> typing.List[Fault]:
+        """Returns all single stuck-at faults that change at least one probe for some input combination"""
+        good = self.truthTable(inputs, probes)
+        detected = []
+        for node in self.netlist.nodes:
+            for key in node.outKeys:
+                for value in (0, 1):
+                    fault = (node.component, key, value)
+                    if self.truthTable(inputs, probes, [fault]) != good:
+                        detected.append(fault)
+        return detected
+
+
+def countingMask(bit: int, base: int, lanes: int) -> int:
+    """Returns the mask in which lane i holds the given bit of base + i"""
+    full = (1 << lanes) - 1
+    if base >> bit == (base + lanes - 1) >> bit:
+        # the bit is constant within these lanes
+        return full if (base >> bit) & 1 else 0
+    period = 1 << bit
+    offset = base % (2 * period)
+    pattern = ((1 << period) - 1) << period # one period of zeros followed by one period of ones
+    length = 2 * period
+    while length < offset + lanes:
+        pattern |= pattern << length
+        length *= 2
+    return (pattern >> offset) & full
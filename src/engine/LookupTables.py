@@ -0,0 +1,243 @@
+import typing
+from src.engine.Netlist import Netlist, NetlistNode, ZERO_NET, levelize
+from src.engine.BatchEvaluator import LaneValue, packLanes, unpackLanes
+from src.engine.Kernels import LANE_KERNELS
+from src.model.LogicComponent import LogicComponent
+from src.model.Input import Input
+from src.model.Output import Output
+from src.model.Register import Register
+
+# ===== NOTE =====
+# Truth table synthesis: combinational regions of a netlist with few input bits are replaced by lookup tables.
+# - A region grows backwards from a node by absorbing the nodes driving its inputs, as long as the region
+#   has at most maxInputBits input bits and stays convex (no path leaves the region and enters it again).
+# - The table holds the value of every net inside the region for every combination of the input bits.
+#   It is computed once with the bit-parallel lane kernels, where every combination is one lane.
+# - Only the outputs of the region are kept in the table: nets read outside of the region and Outputs.
+#   At run time one table index replaces all kernels of the region and only those states are written,
+#   the states inside the region are not updated. That's why the controller only uses tables for headless netlists.
+# - A table is dropped again if it would form a cycle with the tables found before it (two regions feeding each other).
+# Only the schedule of the netlist changes (see Netlist.schedule), its nodes and levels stay as they are,
+# so the other evaluators can still use the netlist.
+# ================
+
+
+class LookupTable:
+    """A combinational region of a netlist which is evaluated with a precomputed table."""
+
+    def __init__(self, netlist: Netlist, nodes: typing.List[NetlistNode], leaves: typing.List[int],
+                 widths: typing.List[int], outNets: typing.Set[int] = None):
+        self.netlist: Netlist = netlist
+        self.nodes: typing.List[NetlistNode] = nodes # in topological order
+        self.index: int = min(node.index for node in nodes)
+        self.inNets: typing.Tuple[int, ...] = tuple(leaves)
+        # the nets leaving the region, all nets of the region by default
+        self.outNets: typing.Tuple[int, ...] = tuple(net for node in self.nodes for net in node.outNets
+                                                     if outNets is None or net in outNets)
+        self.components: typing.List[LogicComponent] = [node.component for node in self.nodes]
+        # (net, bit offset in the table index, width) of every input
+        self.leaves: typing.List[typing.Tuple[int, int, int]] = []
+        offset = 0
+        for net, width in zip(leaves, widths):
+            self.leaves.append((net, offset, width))
+            offset += width
+        self.bits: int = offset
+        # (net, component, output key, width) of every output of the region, aligned with columns
+        kept = set(self.outNets)
+        self.outputs: typing.List[typing.Tuple[int, LogicComponent, str, int]] = [
+            output for node in self.nodes for output in zip(node.outNets, [node.component] * len(node.outNets),
+                                                            node.outKeys, node.outWidths)
+            if output[0] in kept
+        ]
+        self.columns: typing.List[typing.List[int]] = self._build()
+
+    def _build(self) -> typing.List[typing.List[int]]:
+        """Evaluates the region for all input combinations at once, one lane per combination"""
+        count = 1 << self.bits
+        full = (1 << count) - 1
+        lanes: typing.Dict[int, LaneValue] = {ZERO_NET: 0}
+        for net, offset, width in self.leaves:
+            if width == 1:
+                # bit offset of the index alternates every 2**offset combinations
+                period = 1 << (offset + 1)
+                lanes[net] = full // ((1 << period) - 1) * (((1 << (1 << offset)) - 1) << (1 << offset))
+            else:
+                mask = (1 << width) - 1
+                lanes[net] = [(index >> offset) & mask for index in range(count)]
+
+        for node in self.nodes:
+            ins = [lanes[net] for net in node.inNets]
+            laneKernel = LANE_KERNELS.get(type(node.component))
+            if laneKernel is not None and all(type(value) is int for value in ins):
+                result = laneKernel(full, *ins)
+            else:
+                kernel = node.kernel
+                rows = [kernel(*row) for row in zip(*[unpackLanes(value, count) for value in ins])]
+                result = [packLanes(list(column)) for column in zip(*rows)]
+            for net, value in zip(node.outNets, result):
+                lanes[net] = value
+        return [unpackLanes(lanes[net], count) for net, _, _, _ in self.outputs]
+
+    def run(self) -> bool:
+        """Looks up the values of the region, the nodes are evaluated as usual if an input is wider than expected"""
+        values = self.netlist.values
+        index = 0
+        for net, offset, width in self.leaves:
+            value = values[net]
+            if value >> width:
+                # e.g. the bitwidth of an Input was changed after the table was built
+                return any([node.run() for node in self.nodes])
+            index |= value << offset
+        changed = False
+        for (net, comp, key, width), column in zip(self.outputs, self.columns):
+            value = column[index]
+            values[net] = value
+            state = comp.state
+            old = state[key]
+            if old[0] != value or old[1] != width:
+                state[key] = (value, width)
+                changed = True
+        return changed
+
+
+def synthesizeLookupTables(netlist: Netlist, maxInputBits: int = 8, minNodes: int = 3) -> typing.List[LookupTable]:
+    """Replaces combinational regions of a netlist with lookup tables and rebuilds its schedule.
+
+    Args:
+        netlist: The compiled netlist, its nodes and levels are not changed
+        maxInputBits: The maximum number of input bits of a region, the table has 2**maxInputBits entries
+        minNodes: Regions with fewer nodes are evaluated as usual
+
+    Returns:
+        List[LookupTable]: The tables, also stored in netlist.lookupTables
+    """
+    if not netlist.acyclic or maxInputBits <= 0:
+        return []
+    levelOf: typing.Dict[NetlistNode, int] = {}
+    for i, level in enumerate(netlist.levels):
+        for node in level:
+            levelOf[node] = i
+    candidates = [node for node in netlist.nodes if _canTabulate(node) and node not in netlist.skipped]
+    driver: typing.Dict[int, NetlistNode] = {}
+    consumers: typing.Dict[int, typing.List[NetlistNode]] = {}
+    # the widths written by the kernels, the states may not have their final widths before the first evaluation
+    widthOf: typing.Dict[int, int] = dict(enumerate(netlist.netWidths))
+    for node in netlist.nodes:
+        for net, width in zip(node.outNets, node.outWidths):
+            driver[net] = node
+            widthOf[net] = width
+        for net in node.inNets:
+            consumers.setdefault(net, []).append(node)
+
+    assigned: typing.Set[NetlistNode] = set()
+    tables: typing.List[LookupTable] = []
+    active = [node for node in netlist.nodes if node not in netlist.skipped]
+    # grow regions from the deepest nodes, so they end at the sinks of the circuit
+    for root in sorted(candidates, key=lambda node: (-levelOf[node], -node.index)):
+        if root in assigned:
+            continue
+        region = _growRegion(root, widthOf, driver, consumers, levelOf, assigned, netlist.skipped, maxInputBits)
+        if region is None or len(region[0]) < minNodes:
+            continue
+        nodes, leaves = region
+        if _formsCycle(active, assigned | set(nodes), tables, nodes):
+            continue
+        nodes.sort(key=lambda node: (levelOf[node], node.index))
+        assigned.update(nodes)
+        tables.append(LookupTable(netlist, nodes, leaves, [widthOf[net] for net in leaves],
+                                  _regionOutputs(nodes, consumers)))
+
+    netlist.lookupTables = tables
+    if len(tables) > 0 and not netlist.reschedule([node for node in active if node not in assigned] + tables):
+        netlist.lookupTables = [] # can't happen after the cycle checks, the plain schedule is kept anyway
+        tables = []
+    return tables
+
+
+class _Region:
+    """A candidate region during the cycle check, it only needs the attributes used by levelize"""
+
+    def __init__(self, nodes: typing.List[NetlistNode], index: int):
+        self.index: int = index
+        produced = {net for node in nodes for net in node.outNets}
+        self.inNets: typing.List[int] = [net for node in nodes for net in node.inNets if net not in produced]
+        self.outNets: typing.List[int] = list(produced)
+
+
+def _formsCycle(active: typing.List[NetlistNode], assigned: typing.Set[NetlistNode], tables: typing.List[LookupTable],
+                nodes: typing.List[NetlistNode]) -> bool:
+    """Whether the units of the schedule contain a cycle if the given nodes become a table as well.
+    Every region is convex on its own, but two regions can still feed each other."""
+    if len(tables) == 0:
+        return False
+    units = [node for node in active if node not in assigned]
+    units += [_Region(table.nodes, table.index) for table in tables]
+    units.append(_Region(nodes, min(node.index for node in nodes)))
+    return levelize(units, lambda unit: type(unit) != NetlistNode or type(unit.component) != Register) is None
+
+
+def _regionOutputs(nodes: typing.List[NetlistNode], consumers: dict) -> typing.Set[int]:
+    """Returns the nets of a region that are read outside of it, and the nets of its Outputs"""
+    region = set(nodes)
+    return {net for node in nodes for net in node.outNets
+            if type(node.component) == Output or any(consumer not in region for consumer in consumers.get(net, []))}
+
+
+def _canTabulate(node: NetlistNode) -> bool:
+    return node.kernel is not None and type(node.component) not in (Input, Register)
+
+
+def _growRegion(root: NetlistNode, widthOf: typing.Dict[int, int], driver: dict, consumers: dict, levelOf: dict,
+                assigned: set, skipped: set, maxInputBits: int) -> typing.Optional[typing.Tuple[typing.List[NetlistNode], typing.List[int]]]:
+    """Absorbs the drivers of the region inputs until the inputs get too wide. Returns the nodes and input nets"""
+    region = {root}
+    leaves = _leaves(region)
+    if _width(widthOf, leaves) > maxInputBits:
+        return None
+    grown = True
+    while grown:
+        grown = False
+        # nearest drivers first
+        for net in sorted(leaves, key=lambda net: -levelOf.get(driver.get(net), -1)):
+            candidate = driver.get(net)
+            if candidate is None or candidate in region or candidate in assigned or candidate in skipped \
+                    or not _canTabulate(candidate):
+                continue
+            newLeaves = _leaves(region | {candidate})
+            if _width(widthOf, newLeaves) > maxInputBits:
+                continue
+            if not _isConvex(candidate, region, consumers, levelOf):
+                continue
+            region.add(candidate)
+            leaves = newLeaves
+            grown = True
+            break
+    return list(region), sorted(leaves)
+
+
+def _leaves(region: typing.Set[NetlistNode]) -> typing.Set[int]:
+    produced = {net for node in region for net in node.outNets}
+    return {net for node in region for net in node.inNets if net not in produced and net != ZERO_NET}
+
+
+def _width(widthOf: typing.Dict[int, int], nets: typing.Iterable[int]) -> int:
+    return sum(widthOf[net] for net in nets)
+
+
+def _isConvex(candidate: NetlistNode, region: typing.Set[NetlistNode], consumers: dict, levelOf: dict) -> bool:
+    """Whether no consumer of the candidate outside of the region leads back into the region"""
+    deepest = max(levelOf[node] for node in region)
+    stack = [node for net in candidate.outNets for node in consumers.get(net, []) if node not in region]
+    visited = set(stack)
+    while stack:
+        node = stack.pop()
+        if type(node.component) == Register or levelOf[node] >= deepest:
+            continue # registers end a path and nodes at the deepest level can't reach the region
+        for net in node.outNets:
+            for consumer in consumers.get(net, []):
+                if consumer in region:
+                    return False
+                if consumer not in visited:
+                    visited.add(consumer)
+                    stack.append(consumer)
+    return True
@@ -0,0 +1,348 @@
+import typing
+from src.Algorithms import GraphOrder
+from src.model.LogicComponent import LogicComponent
+from src.model.Input import Input
+from src.model.Register import Register
+from src.model.Output import Output
+from src.model.CustomLogicComponent import CustomLogicComponent
+from src.engine.Kernels import KERNELS
+
+# ===== NOTE =====
+# The netlist is a compiled, flat representation of a component graph.
+# Every output of every component gets an integer net id and all values live in one shared list.
+# Components with a kernel (see Kernels.py) are evaluated by small closures reading and writing
+# that list directly, all other components fall back to their own eval() method.
+# The component states are kept up to date, so the GUI and the level tests can read them as usual.
+#
+# With flatten=True custom components are inlined: their child gates become nodes of this netlist.
+# The nets of the Input children are aliases of the nets connected to the custom component, and the nets
+# of the Output children are aliases of the nets driving them, so neither of them is evaluated.
+# The custom component itself becomes a port node after its children, which copies the output nets into its state.
+# ================
+
+ZERO_NET: int = 0 # net id that always holds 0, used for unconnected inputs
+
+
+class NetlistNode:
+    """A single component inside a compiled netlist."""
+    __slots__ = ("component", "index", "inNets", "outNets", "outKeys", "outWidths", "kernel", "run")
+
+    def __init__(self, component: LogicComponent, index: int):
+        self.component = component
+        self.index = index
+        self.inNets: typing.Tuple[int, ...] = ()
+        self.outNets: typing.Tuple[int, ...] = ()
+        self.outKeys: typing.Tuple[str, ...] = tuple(component.getState().keys())
+        self.outWidths: typing.Tuple[int, ...] = tuple(value[1] for value in component.getState().values())
+        self.kernel: typing.Optional[typing.Callable[..., tuple]] = None # None if the node falls back to eval()
+        self.run: typing.Callable[[], bool] = None
+
+
+class Netlist:
+    """Compiles a list of components into integer nets, a levelized schedule and per-node closures.
+
+    Outputs of Registers are treated as sources (like in Algorithms.khanFrontierEval),
+    they only change when the registers are updated.
+    """
+
+    def __init__(self, components: typing.List[LogicComponent], order: GraphOrder = None, flatten: bool = False):
+        self.components: typing.List[LogicComponent] = list(components)
+        if order is None or order.isStale():
+            order = GraphOrder(self.components, order.versionOf if order is not None else None)
+        self.versionOf: typing.Callable[[], int] = order.versionOf # the version source of the order, see GraphOrder
+        self.version: int = self.versionOf()
+        self.order: GraphOrder = order
+        self.values: typing.List[int] = [0] # net 0 is the constant zero net
+        self.netIds: typing.Dict[typing.Tuple[LogicComponent, str], int] = {}
+        self.netWidths: typing.List[int] = [0]
+        self.nodes: typing.List[NetlistNode] = []
+        self.nodeOf: typing.Dict[LogicComponent, NetlistNode] = {}
+        # (net, component, key) of nets which are not driven by a scheduled node and have to be read before every run
+        self.sources: typing.List[typing.Tuple[int, LogicComponent, str]] = []
+        self.levels: typing.List[typing.List[NetlistNode]] = []
+        self.levelComponents: typing.List[typing.List[LogicComponent]] = []
+        self.acyclic: bool = False
+        self.flatten: bool = flatten
+        # custom components inlined into this netlist, outer components before the ones nested in them
+        self.flattened: typing.List[CustomLogicComponent] = []
+        self._flattenedSet: typing.Set[CustomLogicComponent] = set()
+        # what run() executes unless every wave should be shown: the closures of every level and the components
+        # reported to the view after it. This is the same as levels, unless an optimization pass
+        # (e.g. LookupTables.py) replaced some nodes.
+        self.schedule: typing.List[typing.List[typing.Callable[[], bool]]] = []
+        self.scheduleComponents: typing.List[typing.List[LogicComponent]] = []
+        self.lookupTables: typing.List = [] # set by LookupTables.synthesizeLookupTables
+        # nodes the optimized schedule doesn't evaluate, e.g. constants or dead logic (see ConstantFolding.py)
+        self.skipped: typing.Set[NetlistNode] = set()
+        # cheaper closures replacing the run of single nodes in the optimized schedule
+        self.replacedRuns: typing.Dict[NetlistNode, typing.Callable[[], bool]] = {}
+        # (net, component, key, value) of source values the optimized schedule relies on,
+        # if any of them changed the original levels are evaluated instead
+        self.assumptions: typing.List[typing.Tuple[int, LogicComponent, str, int]] = []
+        self._levelRuns: typing.List[typing.List[typing.Callable[[], bool]]] = []
+        self._constantsStale: bool = False # set when the skipped nodes were evaluated with different assumptions
+        self._compile()
+
+    def isStale(self) -> bool:
+        """Whether any connection changed since this netlist was compiled"""
+        return self.version != self.versionOf()
+
+    def netId(self, component: LogicComponent, key: str) -> int:
+        """Returns the net id of an output, allocating a new net if it does not exist yet"""
+        net = self.netIds.get((component, key))
+        if net is None:
+            net = len(self.values)
+            self.netIds[(component, key)] = net
+            self.values.append(component.getState()[key][0])
+            self.netWidths.append(component.getState()[key][1])
+            if component not in self.nodeOf or type(component) in (Input, Register):
+                self.sources.append((net, component, key))
+        return net
+
+    def _compile(self) -> None:
+        for comp in self.components:
+            self._addNode(comp)
+
+        # allocate the nets of all outputs first, so that net ids follow the component order
+        for node in self.nodes:
+            node.outNets = tuple(self.netId(node.component, key) for key in node.outKeys)
+
+        # the ports of inlined custom components are aliases, outer components first as inner ones may connect to them
+        for custom in self.flattened:
+            for child, connection in zip(custom.inputComponents, custom.getInputs().values()):
+                self.netIds[(child, "outValue")] = self._connectionNet(connection)
+            for child in custom.outputComponents:
+                self.netIds[(child, "outValue")] = self._connectionNet(child.getInputs()["input"])
+
+        # resolve the inputs of every node
+        for node in self.nodes:
+            if node.component in self._flattenedSet:
+                node.inNets = tuple(self.netId(child, "outValue") for child in node.component.outputComponents)
+            else:
+                node.inNets = tuple(self._connectionNet(connection) for connection in node.component.getInputs().values())
+            self._bind(node)
+
+        if len(self.flattened) > 0:
+            self._levelize()
+        else:
+            # the levels of the cached order become the schedule, so animations look the same as before
+            self.acyclic = self.order.acyclic
+            if self.acyclic:
+                for tickComponents in self.order.getTicks():
+                    self.levels.append([self.nodeOf[comp] for comp in tickComponents])
+                    self.levelComponents.append(tickComponents)
+        self._levelRuns = [[node.run for node in level] for level in self.levels]
+        self.schedule = self._levelRuns
+        self.scheduleComponents = list(self.levelComponents)
+
+    def _addNode(self, comp: LogicComponent) -> None:
+        """Adds the node of a component, custom components are inlined if possible"""
+        if self.flatten and type(comp) == CustomLogicComponent and _canFlatten(comp):
+            self.flattened.append(comp)
+            self._flattenedSet.add(comp)
+            for child in comp.childComponents:
+                if type(child) not in (Input, Output):
+                    self._addNode(child)
+        node = NetlistNode(comp, len(self.nodes))
+        self.nodes.append(node)
+        self.nodeOf[comp] = node
+
+    def _connectionNet(self, connection: typing.Optional[typing.Tuple[LogicComponent, str]]) -> int:
+        """Returns the net of an input connection, the zero net if the input is unconnected"""
+        if connection is None:
+            return ZERO_NET
+        return self.netId(connection[0], connection[1])
+
+    def _levelize(self) -> None:
+        """Groups the nodes into levels like GraphOrder does for components, used when custom components are inlined.
+        Only the top level components of a level are reported to the view."""
+        levels = levelize(self.nodes, lambda node: type(node.component) != Register)
+        self.acyclic = levels is not None
+        if not self.acyclic:
+            return
+        topLevel = set(self.components)
+        for level in levels:
+            self.levels.append(level)
+            self.levelComponents.append([node.component for node in level if node.component in topLevel])
+
+    def _bind(self, node: NetlistNode) -> None:
+        """Creates the closure that evaluates a node"""
+        comp = node.component
+        values = self.values
+        outNets, outKeys = node.outNets, node.outKeys
+
+        if type(comp) == Input:
+            # inputs are read together with the other sources before every run
+            node.run = lambda: True
+            return
+
+        factory = _portKernel if comp in self._flattenedSet else KERNELS.get(type(comp))
+        if factory is None:
+            def fallback() -> bool:
+                changed = comp.eval()
+                state = comp.getState()
+                for net, key in zip(outNets, outKeys):
+                    values[net] = state[key][0]
+                return bool(changed)
+            node.run = fallback
+            return
+
+        kernel, widths = factory(comp)
+        node.kernel, node.outWidths = kernel, widths
+        inNets = node.inNets
+        outputs = tuple(zip(outNets, outKeys, widths))
+
+        if len(inNets) == 2 and len(outNets) == 1:
+            # fast path for the 1-bit gates
+            a, b = inNets
+            net, key, width = outputs[0]
+            def runGate() -> bool:
+                value, = kernel(values[a], values[b])
+                values[net] = value
+                state = comp.state
+                old = state[key]
+                if old[0] != value or old[1] != width:
+                    state[key] = (value, width)
+                    return True
+                return False
+            node.run = runGate
+            return
+
+        def runKernel() -> bool:
+            result = kernel(*[values[i] for i in inNets])
+            state = comp.state
+            changed = False
+            for (net, key, width), value in zip(outputs, result):
+                values[net] = value
+                old = state[key]
+                if old[0] != value or old[1] != width:
+                    state[key] = (value, width)
+                    changed = True
+            return changed
+        node.run = runKernel
+
+    def readSources(self) -> None:
+        """Copies the current values of Inputs, Registers and external components into the net values"""
+        values = self.values
+        for net, comp, key in self.sources:
+            values[net] = comp.getState()[key][0]
+
+    def reschedule(self, units: typing.List) -> bool:
+        """Replaces the optimized schedule with the levels of the given units, used by the optimization passes.
+
+        Args:
+            units: Nodes and other units with inNets, outNets, index, run and components (e.g. lookup tables)
+
+        Returns:
+            bool: False if the units contain a cycle, the schedule is left as it is then
+        """
+        runOf = self.replacedRuns
+        levels = levelize(units, lambda unit: type(unit) != NetlistNode or type(unit.component) != Register)
+        if levels is None:
+            return False
+        reported = {comp for components in self.levelComponents for comp in components}
+        self.schedule = [[runOf.get(unit, unit.run) for unit in level] for level in levels]
+        self.scheduleComponents = [
+            [comp for unit in level for comp in (unit.components if type(unit) != NetlistNode else [unit.component])
+             if comp in reported]
+            for level in levels
+        ]
+        return True
+
+    def _assumptionsHold(self) -> bool:
+        for _, comp, key, value in self.assumptions:
+            if comp.getState()[key][0] != value:
+                self._constantsStale = True
+                return False
+        if self._constantsStale:
+            # the skipped nodes were evaluated with other values, the original levels restore their constants
+            self._constantsStale = False
+            return False
+        return True
+
+    def run(self, updateFunction = None, waitFunction = None, waves: bool = False) -> bool:
+        """Evaluates all nodes level by level.
+
+        Args:
+            updateFunction: Optional function called with components=<components of the level> after each level
+            waitFunction: Optional function called after each level
+            waves: If True, the nodes are evaluated in their original levels, so every wave can be shown on its own.
+                Otherwise the optimized schedule is used.
+
+        Returns:
+            bool: False if the netlist contains a cycle and can't be evaluated in topological order, True otherwise
+        """
+        if not self.acyclic:
+            return False
+        self.readSources()
+        assumptionsHold = self._assumptionsHold()
+        if waves or not assumptionsHold:
+            schedule, scheduleComponents = self._levelRuns, self.levelComponents
+        else:
+            schedule, scheduleComponents = self.schedule, self.scheduleComponents
+        for level, levelComponents in zip(schedule, scheduleComponents):
+            for run in level:
+                run()
+            if len(levelComponents) == 0:
+                continue # only gates inside custom components, nothing to show
+            if updateFunction is not None:
+                updateFunction(components=levelComponents)
+            if waitFunction is not None:
+                waitFunction()
+        return True
+
+
+def levelize(units: typing.List, drivesSuccessors: typing.Callable[[typing.Any], bool]) -> typing.Optional[typing.List[typing.List]]:
+    """Groups nodes (or anything else with inNets, outNets and index) into levels with Kahn's algorithm.
+
+    Args:
+        units: The units to levelize
+        drivesSuccessors: Whether the outputs of a unit are edges, False for units that are sources like Registers
+
+    Returns:
+        Optional[List[List]]: The levels, every level sorted by index, or None if the units contain a cycle
+    """
+    driver = {}
+    for unit in units:
+        if drivesSuccessors(unit):
+            for net in unit.outNets:
+                driver[net] = unit
+    fanout = {unit: [] for unit in units}
+    indeg = {}
+    for unit in units:
+        predecessors = {driver[net] for net in unit.inNets if net in driver}
+        indeg[unit] = len(predecessors)
+        for predecessor in predecessors:
+            fanout[predecessor].append(unit)
+
+    levels = []
+    currentLevel = [unit for unit in units if indeg[unit] == 0]
+    scheduled = 0
+    while len(currentLevel) > 0:
+        currentLevel.sort(key=lambda unit: unit.index)
+        levels.append(currentLevel)
+        scheduled += len(currentLevel)
+        nextLevel = []
+        for u in currentLevel:
+            for v in fanout[u]:
+                indeg[v] -= 1
+                if indeg[v] == 0:
+                    nextLevel.append(v)
+        currentLevel = nextLevel
+    return levels if scheduled == len(units) else None
+
+
+def _canFlatten(custom: CustomLogicComponent) -> bool:
+    """Whether all children of a custom component can be inlined, i.e. they are ports, have kernels or can be flattened"""
+    for child in custom.childComponents:
+        if type(child) in (Input, Output) or type(child) in KERNELS:
+            continue
+        if type(child) == CustomLogicComponent and _canFlatten(child):
+            continue
+        return False
+    return len(custom.inputComponents) == len(custom.getInputs()) and len(custom.outputComponents) == len(custom.state)
+
+
+def _portKernel(custom: CustomLogicComponent):
+    """Kernel of an inlined custom component, it copies the values driving its Output children"""
+    return (lambda *values: values), tuple(child.inputBitwidths["input"] for child in custom.outputComponents)
@@ -0,0 +1,236 @@
+import functools
+import typing
+from src.engine.Netlist import Netlist
+from src.model import (ALUAdvanced, ALUSimple, Adder32bit, And, Collector1to2, Collector1to3, Collector1to5,
+                       Collector1to6, Collector1to8, Collector8to16, Collector8to32, ControlUnit, DecoderThreeBit,
+                       FullAdder, HalfAdder, Multiplexer2Inp, Multiplexer4Inp, Multiplexer8Inp, Nand, Nor, Not, Or,
+                       Output, ShiftLeft2, SignExtend, Splitter32to8, Splitter8to1, Xnor, Xor)
+from src.model.LogicComponent import LogicComponent
+from src.model.Input import Input
+from src.model.Register import Register
+from src.engine.Kernels import _CONTROL_SIGNALS
+
+try:
+    import numpy as np
+except ImportError: # numpy is optional, the evaluator reports itself as unavailable without it
+    np = None
+
+# ===== NOTE =====
+# Optional NumPy backend for sweeping very many stimuli through a combinational circuit.
+# All net values live in one uint64 array with one row per net and one column per stimulus.
+# Every level of the netlist is evaluated with one vectorized operation per component class,
+# e.g. all And gates of a level are evaluated by a single np.bitwise_and over their input rows.
+# 32-bit components mask their results like the model classes do.
+# ================
+
+_MASK32 = 0xFFFFFFFF
+MAX_SWEEP_BITS: int = 24 # sweeps over more input bits would need gigabytes for the index array alone
+
+
+# ===== Vector kernels =====
+# They receive one array per input (of shape (stimuli,) or (components, stimuli)) and return a tuple of arrays.
+
+def _and(a, b): return (np.bitwise_and(a, b),)
+def _or(a, b): return (np.bitwise_or(a, b),)
+def _not(a): return (np.bitwise_xor(a, 1),)
+def _nand(a, b): return (np.bitwise_xor(np.bitwise_and(a, b), 1),)
+def _nor(a, b): return (np.bitwise_xor(np.bitwise_or(a, b), 1),)
+def _xor(a, b): return (np.bitwise_xor(a, b),)
+def _xnor(a, b): return (np.bitwise_xor(np.bitwise_xor(a, b), 1),)
+def _halfAdder(a, b): return (np.bitwise_xor(a, b), np.bitwise_and(a, b))
+def _identity(a): return (a,)
+def _adder32(a, b): return (a + b,)
+
+def _fullAdder(a, b, cin):
+    total = a + b + cin
+    return (total & 1, total >> 1)
+
+def _multiplexer(s, *values):
+    return (np.choose(s.astype(np.intp), values),)
+
+def _decoder(c, b, a):
+    value = (a << 2) + (b << 1) + c
+    return tuple((value == i).astype(np.uint64) for i in range(8))
+
+def _aluSimple(a, b, op, ainvert, binvert, carryin):
+    a = np.where(ainvert == 1, ~a & _MASK32, a)
+    b = np.where(binvert == 1, ~b & _MASK32, b)
+    if np.any(op > 2):
+        raise ValueError("Invalid OP code. Supported codes are 0 (AND), 1 (OR), 2 (ADD).")
+    return (np.select([op == 0, op == 1], [a & b, a | b], (a + b + carryin) & _MASK32),)
+
+def _aluAdvanced(a, b, op, ainvert, bnegate):
+    a = np.where(ainvert == 1, ~a & _MASK32, a)
+    b = np.where(bnegate == 1, (~b + 1) & _MASK32, b)
+    if np.any(op > 3):
+        raise ValueError("Invalid OP code. Supported codes are 0 (AND), 1 (OR), 2 (ADD), 3 (SLT).")
+    signedA = a.astype(np.int64) - np.where(a >= 0x80000000, 1 << 32, 0)
+    signedB = b.astype(np.int64) - np.where(b >= 0x80000000, 1 << 32, 0)
+    result = np.select(
+        [op == 0, op == 1, op == 2],
+        [a & b, a | b, (a + b) & _MASK32],
+        (signedA < signedB).astype(np.uint64)
+    )
+    return (result, (result == 0).astype(np.uint64))
+
+def _controlUnit(opcode):
+    conditions = [opcode == code for code in _CONTROL_SIGNALS]
+    signals = list(zip(*_CONTROL_SIGNALS.values()))
+    return tuple(np.select(conditions, [np.uint64(v) for v in signal], np.uint64(0)) for signal in signals)
+
+@functools.lru_cache(maxsize=None)
+def _collector(shift: int, count: int):
+    def collect(*values):
+        outValue = values[0]
+        for i in range(1, count):
+            outValue = outValue | (values[i] << (i * shift))
+        return (outValue,)
+    return collect
+
+@functools.lru_cache(maxsize=None)
+def _splitter(shift: int, mask: int, count: int):
+    return lambda value: tuple((value >> (i * shift)) & mask for i in range(count))
+
+@functools.lru_cache(maxsize=None)
+def _shiftLeft2(width: int):
+    if width > 0:
+        mask = (1 << width) - 1
+        return lambda a: ((a << 2) & mask,)
+    return lambda a: (a << 2,)
+
+
+# Maps component classes to factories returning the vector kernel of a component.
+# Components of the same class with the same kernel function are evaluated together.
+VECTOR_KERNELS: typing.Dict[type, typing.Callable[[LogicComponent], typing.Callable[..., tuple]]] = {
+    And: lambda comp: _and,
+    Or: lambda comp: _or,
+    Not: lambda comp: _not,
+    Nand: lambda comp: _nand,
+    Nor: lambda comp: _nor,
+    Xor: lambda comp: _xor,
+    Xnor: lambda comp: _xnor,
+    HalfAdder: lambda comp: _halfAdder,
+    FullAdder: lambda comp: _fullAdder,
+    Output: lambda comp: _identity,
+    Multiplexer2Inp: lambda comp: _multiplexer,
+    Multiplexer4Inp: lambda comp: _multiplexer,
+    Multiplexer8Inp: lambda comp: _multiplexer,
+    DecoderThreeBit: lambda comp: _decoder,
+    Collector1to2: lambda comp: _collector(1, len(comp.inputs)),
+    Collector1to3: lambda comp: _collector(1, len(comp.inputs)),
+    Collector1to5: lambda comp: _collector(1, len(comp.inputs)),
+    Collector1to6: lambda comp: _collector(1, len(comp.inputs)),
+    Collector1to8: lambda comp: _collector(1, len(comp.inputs)),
+    Collector8to16: lambda comp: _collector(8, len(comp.inputs)),
+    Collector8to32: lambda comp: _collector(8, len(comp.inputs)),
+    Splitter8to1: lambda comp: _splitter(1, 0x1, len(comp.state)),
+    Splitter32to8: lambda comp: _splitter(8, 0xFF, len(comp.state)),
+    ShiftLeft2: lambda comp: _shiftLeft2(comp.inputBitwidths["input1"]),
+    SignExtend: lambda comp: _identity,
+    Adder32bit: lambda comp: _adder32,
+    ALUSimple: lambda comp: _aluSimple,
+    ALUAdvanced: lambda comp: _aluAdvanced,
+    ControlUnit: lambda comp: _controlUnit,
+}
+
+
+def isAvailable() -> bool:
+    """Whether NumPy is installed"""
+    return np is not None
+
+
+class NumpyEvaluator:
+    """Evaluates a combinational netlist on many stimuli with NumPy.
+
+    Registers are treated as constants with their current value. Stimuli are processed in chunks
+    of chunkSize columns, so sweeping millions of combinations doesn't need millions of columns at once.
+    """
+
+    def __init__(self, netlist: Netlist, chunkSize: int = 1 << 16):
+        self.netlist: Netlist = netlist
+        self.chunkSize: int = chunkSize
+        self.supported: bool = isAvailable() and netlist.acyclic and all(
+            type(node.component) in VECTOR_KERNELS or type(node.component) in (Input, Register)
+            for node in netlist.nodes
+        )
+        # per level: (kernel, input rows, output rows) with one row index array per input and output
+        self.steps: typing.List[typing.Tuple[typing.Callable[..., tuple], list, list]] = []
+        if self.supported:
+            self._compile()
+
+    def _compile(self) -> None:
+        for level in self.netlist.levels:
+            groups: typing.Dict[typing.Callable, typing.List] = {}
+            for node in level:
+                factory = VECTOR_KERNELS.get(type(node.component))
+                if factory is not None:
+                    groups.setdefault(factory(node.component), []).append(node)
+            for kernel, nodes in groups.items():
+                inRows = [np.array(nets, dtype=np.intp) for nets in zip(*[node.inNets for node in nodes])]
+                outRows = [np.array(nets, dtype=np.intp) for nets in zip(*[node.outNets for node in nodes])]
+                self.steps.append((kernel, inRows, outRows))
+
+    def evaluate(self, stimuli: typing.Dict[LogicComponent, "np.ndarray"],
+                 probes: typing.List[typing.Tuple[LogicComponent, str]]) -> typing.List["np.ndarray"]:
+        """Evaluates the given stimuli.
+
+        Args:
+            stimuli: Maps Inputs to one value per stimulus, all arrays must have the same length.
+                Inputs without stimuli keep their current value.
+            probes: (component, output key) pairs whose values should be returned
+
+        Returns:
+            List[np.ndarray]: One uint64 array per probe with the value for every stimulus
+
+        Raises:
+            ValueError: If the netlist can't be evaluated by this backend.
+        """
+        if not self.supported:
+            raise ValueError("NumPy is not installed or the circuit contains unsupported components")
+        count = len(next(iter(stimuli.values()))) if stimuli else 1
+        probeNets = [self.netlist.netIds[probe] for probe in probes]
+        results = [np.empty(count, dtype=np.uint64) for _ in probes]
+        for start in range(0, count, self.chunkSize):
+            stop = min(start + self.chunkSize, count)
+            values = self._evaluateChunk({comp: column[start:stop] for comp, column in stimuli.items()}, stop - start)
+            for result, net in zip(results, probeNets):
+                result[start:stop] = values[net]
+        return results
+
+    def sweep(self, inputs: typing.List[Input],
+              probes: typing.List[typing.Tuple[LogicComponent, str]]) -> typing.Tuple["np.ndarray", typing.List["np.ndarray"]]:
+        """Evaluates every combination of values of the given inputs (within their bitwidths).
+
+        Input 0 holds the lowest bits of the combination index.
+
+        Returns:
+            Tuple[np.ndarray, List[np.ndarray]]: The combination indices and one array per probe
+
+        Raises:
+            ValueError: If the inputs have more than MAX_SWEEP_BITS bits together
+        """
+        widths = [comp.getState()["outValue"][1] for comp in inputs]
+        if sum(widths) > MAX_SWEEP_BITS:
+            raise ValueError(f"Can't sweep {sum(widths)} input bits, at most {MAX_SWEEP_BITS} bits are supported")
+        total = 1 << sum(widths)
+        index = np.arange(total, dtype=np.uint64)
+        stimuli = {}
+        offset = 0
+        for comp, width in zip(inputs, widths):
+            stimuli[comp] = (index >> np.uint64(offset)) & np.uint64((1 << width) - 1)
+            offset += width
+        return index, self.evaluate(stimuli, probes)
+
+    def _evaluateChunk(self, stimuli: dict, count: int) -> "np.ndarray":
+        netlist = self.netlist
+        values = np.zeros((len(netlist.values), count), dtype=np.uint64)
+        for net, comp, key in netlist.sources:
+            if comp in stimuli:
+                values[net] = stimuli[comp]
+            else:
+                values[net] = comp.getState()[key][0]
+        for kernel, inRows, outRows in self.steps:
+            result = kernel(*[values[rows] for rows in inRows])
+            for rows, value in zip(outRows, result):
+                values[rows] = value
+        return values
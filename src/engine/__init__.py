@@ -0,0 +1,6 @@
+"""Compiled evaluation engine for the logic components."""
+from .Netlist import Netlist, NetlistNode
+from .BatchEvaluator import BatchEvaluator
+from .LaneSimulator import LaneSimulator
+from .NumpyEvaluator import NumpyEvaluator
+from .EquivalenceChecker import EquivalenceChecker, CircuitPorts, EquivalenceResult
@@ -1,35 +1,108 @@
 from collections import defaultdict
+from contextlib import contextmanager
 
 class EventBus:
     """
     A lightweight event bus for subscribing to and emitting events.
+
+    Handlers are stored in pre-bound tuples which are only rebuilt when a subscription changes,
+    so emitting doesn't copy any lists. Handlers can also subscribe for a single key of an event
+    (e.g. one component of view:components_updated), they are only called if that key is part of
+    the first argument of the emit.
     """
     def __init__(self):
         self._subs = defaultdict(list)
+        self._dispatch = {} # event -> tuple of handlers
+        self._keyedDispatch = defaultdict(dict) # event -> key -> tuple of handlers
+        self._batchedEvents = None # events whose emits are currently collected by batch()
+        self._pending = {}
         self.manual = False
-        
+        self.headless = False
+
     def subscribe(self, event, handler):
         """Subscribe a handler to an event."""
         self._subs[event].append(handler)
-        
+        self._dispatch[event] = tuple(self._subs[event])
+
     def unsubscribe(self, event, handler):
         """Unsubscribe a handler from an event."""
         if handler in self._subs[event]:
             self._subs[event].remove(handler)
-        
-    
+            self._dispatch[event] = tuple(self._subs[event])
+
+    def subscribeFor(self, event, key, handler):
+        """Subscribe a handler to an event, but only for emits whose first argument contains key."""
+        handlers = self._keyedDispatch[event]
+        handlers[key] = handlers.get(key, ()) + (handler,)
+
+    def unsubscribeFor(self, event, key, handler):
+        """Unsubscribe a handler that was subscribed with subscribeFor."""
+        handlers = self._keyedDispatch[event]
+        current = handlers.get(key, ())
+        if handler in current:
+            remaining = tuple(h for h in current if h != handler)
+            if remaining:
+                handlers[key] = remaining
+            else:
+                del handlers[key]
+
     def emit(self, event, *args, **kwargs):
-        if not self.manual:
-            for h in list(self._subs.get(event, [])):
-                h(*args, **kwargs)
-    
+        if self.manual or (self.headless and event.startswith("view:")):
+            return
+        if self._batchedEvents is not None and event in self._batchedEvents:
+            self._collect(event, args, kwargs)
+            return
+        for h in self._dispatch.get(event, ()):
+            h(*args, **kwargs)
+        keyed = self._keyedDispatch.get(event)
+        if keyed and args:
+            for key in args[0]:
+                for h in keyed.get(key, ()):
+                    h(*args, **kwargs)
+
+    def _collect(self, event, args, kwargs):
+        """Coalesces an emit during batch(): plain handlers only get the last emit,
+        keyed handlers get the last emit that contained their key."""
+        _, keyedCalls = self._pending.get(event, (None, {}))
+        if self._keyedDispatch.get(event) and args:
+            for key in args[0]:
+                keyedCalls[key] = (args, kwargs)
+        self._pending[event] = ((args, kwargs), keyedCalls)
+
+    @contextmanager
+    def batch(self, *events):
+        """Collects the emits of the given events and delivers them coalesced when the block ends.
+        Other events are emitted immediately."""
+        if self._batchedEvents is not None:
+            # already batching, the outer batch delivers everything
+            yield
+            return
+        self._batchedEvents = set(events)
+        try:
+            yield
+        finally:
+            pending = self._pending
+            self._batchedEvents = None
+            self._pending = {}
+            for event, ((args, kwargs), keyedCalls) in pending.items():
+                for h in self._dispatch.get(event, ()):
+                    h(*args, **kwargs)
+                keyed = self._keyedDispatch.get(event, {})
+                for key, (keyArgs, keyKwargs) in keyedCalls.items():
+                    for h in keyed.get(key, ()):
+                        h(*keyArgs, **keyKwargs)
+
     # for testing and step by step
     def setManual(self):
         self.manual = True
-    
+
     def setAuto(self):
         self.manual = False
-            
+
+    def setHeadless(self, headless: bool):
+        """In headless mode view events are dropped and the evaluation skips all per-wave view updates."""
+        self.headless = headless
+
 
 _bus = None
 
@@ -35,7 +35,6 @@ class ALUAdvanced(LogicComponent):  # A advanced 32-bit ALU
         Returns:
             bool: True if the output state has changed, False otherwise.
         """
-        oldState = self.state.copy()
         if self.inputs["input1"] is None: # set input to 0 if no component is connected
             a: int = 0
         else:
@@ -78,25 +77,22 @@ class ALUAdvanced(LogicComponent):  # A advanced 32-bit ALU
 
        
         if op == 0:       # AND
-            self.state["outValue"] = (a & b, 32)
+            changed = self.setOutput("outValue", a & b, 32)
         elif op == 1:     # OR
-            self.state["outValue"] = (a | b, 32)
+            changed = self.setOutput("outValue", a | b, 32)
         elif op == 2:     # ADD
             result = a + b  # Addition (subtraction handled by Bnegate)
             # Mask to simulate 32-bit overflow behavior
-            self.state["outValue"] = (result & 0xFFFFFFFF, 32)
+            changed = self.setOutput("outValue", result & 0xFFFFFFFF, 32)
         elif op == 3:  # SLT (Set on Less Than)
             # Convert to signed 32-bit integers for proper comparison
             signed_a = a if a < 0x80000000 else a - 0x100000000
             signed_b = b if b < 0x80000000 else b - 0x100000000
-            self.state["outValue"] = (1 if signed_a < signed_b else 0, 32)
+            changed = self.setOutput("outValue", 1 if signed_a < signed_b else 0, 32)
         else:  # Invalid OP code
             raise ValueError(f"Invalid OP code: {op}. Supported codes are 0 (AND), 1 (OR), 2 (ADD), 3 (SLT).")
         
         # Set zero output - 1 if result is 0, 0 otherwise
-        self.state["zero"] = (1 if self.state["outValue"][0] == 0 else 0, 1)
+        changed |= self.setOutput("zero", 1 if self.state["outValue"][0] == 0 else 0, 1)
         
-        if self.state != oldState:
-            return True
-        else:
-            return False
\ No newline at end of file
+        return changed
\ No newline at end of file
@@ -1,7 +1,17 @@
 import typing
 from .LogicComponent import LogicComponent
 
-
+# (ainvert, binvert, operation) of the ALUop values and R-type funct fields
+_LOAD_STORE: typing.Tuple[int, int, int] = (0, 0, 0)
+_BRANCH: typing.Tuple[int, int, int] = (0, 1, 2) # SUBTRACT
+_DEFAULT_FUNCT: typing.Tuple[int, int, int] = (0, 0, 0)
+_FUNCT_SIGNALS: typing.Dict[int, typing.Tuple[int, int, int]] = {
+    0: (0, 0, 2), # ADD
+    2: (0, 1, 2), # SUBTRACT
+    4: (0, 0, 0), # AND
+    5: (0, 0, 1), # OR
+    10: (0, 1, 3), # SLT
+}
 
 class ALUControl(LogicComponent):
 
@@ -19,66 +29,22 @@ class ALUControl(LogicComponent):
         Returns:
             bool: True if the output state has changed, False otherwise.
         """
-        oldState = self.state.copy()
-
         if self.inputs["ALUop"] is None or self.inputs["funct"] is None:
             ALUop = 0
         else:
             ALUop = self.inputs["ALUop"][0].getState()[self.inputs["ALUop"][1]][0]
             funct = self.inputs["funct"][0].getState()[self.inputs["funct"][1]][0]
-        
+
         if ALUop == 0:  # lw or sw
-            self.state = {
-                "ainvert": (0, 1),
-                "binvert": (0, 1),
-                "operation": (0, 2)  # ADD
-            }
+            signals = _LOAD_STORE
         elif ALUop == 1:  # beq
-            self.state = {
-                "ainvert": (0, 1),
-                "binvert": (1, 1),
-                "operation": (2, 2)  # SUBTRACT
-            }
-        
+            signals = _BRANCH
         elif ALUop == 2:  # R-type
-            if funct == 0:  # ADD
-                self.state = {
-                    "ainvert": (0, 1),
-                    "binvert": (0, 1),
-                    "operation": (2, 2)
-                }
-            elif funct == 2:  # SUBTRACT
-                self.state = {
-                    "ainvert": (0, 1),  
-                    "binvert": (1, 1),
-                    "operation": (2, 2)
-                }
-            elif funct == 4:  # AND
-                self.state = {
-                    "ainvert": (0, 1),
-                    "binvert": (0, 1),
-                    "operation": (0, 2)
-                }
-            elif funct == 5:  # OR
-                self.state = {
-                    "ainvert": (0, 1),
-                    "binvert": (0, 1),
-                    "operation": (1, 2)
-                }
-            elif funct == 10:  # SLT
-                self.state = {
-                    "ainvert": (0, 1),
-                    "binvert": (1, 1),
-                    "operation": (3, 2)  
-                }
-            else: #Default to ADD for unknown funct
-                self.state = {
-                    "ainvert": (0, 1),
-                    "binvert": (0, 1),
-                    "operation": (0, 2)  
-                }
-
-        if self.state != oldState:
-            return True
+            signals = _FUNCT_SIGNALS.get(funct, _DEFAULT_FUNCT)
         else:
-            return False
\ No newline at end of file
+            return False # the outputs are kept
+
+        changed = self.setOutput("ainvert", signals[0], 1)
+        changed |= self.setOutput("binvert", signals[1], 1)
+        changed |= self.setOutput("operation", signals[2], 2)
+        return changed
\ No newline at end of file
@@ -35,7 +35,6 @@ class ALUSimple(LogicComponent):  # A simple 32-bit ALU
         Returns:
             bool: True if the output state has changed, False otherwise.
         """
-        oldState = self.state.copy()
         if self.inputs["input1"] is None: # set input to 0 if no component is connected
             a: int = 0
         else:
@@ -83,17 +82,14 @@ class ALUSimple(LogicComponent):  # A simple 32-bit ALU
             b = (~b) & 0xFFFFFFFF  # Bitwise NOT and mask to 32 bits (necessary because ~b produces negative numbers)
             
         if op == 0:       # AND
-            self.state["outValue"] = (a & b, 32)
+            changed = self.setOutput("outValue", a & b, 32)
         elif op == 1:     # OR
-            self.state["outValue"] = (a | b, 32)
+            changed = self.setOutput("outValue", a | b, 32)
         elif op == 2:     # ADD
             result = a + b + carryin  # Add carry-in for two's complement operations
             # Mask to simulate 32-bit overflow behavior
-            self.state["outValue"] = (result & 0xFFFFFFFF, 32)
+            changed = self.setOutput("outValue", result & 0xFFFFFFFF, 32)
         else:             # Invalid OP code
             raise ValueError(f"Invalid OP code: {op}. Supported codes are 0 (AND), 1 (OR), 2 (ADD).")
         
-        if self.state != oldState:
-            return True
-        else:
-            return False
+        return changed
@@ -19,7 +19,6 @@ class Adder32bit(LogicComponent):
             bool: True if the output state has changed, False otherwise.
         """
         
-        oldState = self.state.copy()
         if self.inputs["inputA"] is None: # set input to false if no component is connected
             a: int = 0
         else:
@@ -35,10 +34,4 @@ class Adder32bit(LogicComponent):
             # gets the component out of the second tuple in self.inputs and then
             #   uses the key from that tuple to access the right output from the
             #   components state
-        self.state = {
-            "outSum": ((a + b), 32)  # Sum is 1 if the total number of 1s is odd
-        }
-        if self.state != oldState:
-            return True
-        else:
-            return False
\ No newline at end of file
+        return self.setOutput("outSum", a + b, 32)
\ No newline at end of file
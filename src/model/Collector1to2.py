@@ -24,7 +24,6 @@ class Collector1to2(LogicComponent):
         The resulting 2-bit integer is stored in self.state['outValue'] as
         (value, 2).
         """
-        oldState = self.state.copy()
         outValue: int = 0
         for i,value in enumerate(self.inputs.values()):
             if value is None: # set input to false if no component is connected
@@ -36,8 +35,4 @@ class Collector1to2(LogicComponent):
                 #   components state
             # shift the bit into the correct position and combine
             outValue |= (bit << (i))
-        self.state["outValue"] = (outValue, 2)
-        if self.state != oldState:
-            return True
-        else:
-            return False
+        return self.setOutput("outValue", outValue, 2)
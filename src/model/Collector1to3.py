@@ -23,7 +23,6 @@ class Collector1to3(LogicComponent):
         Returns:
             bool: True if the output state has changed, False otherwise.
         """
-        oldState = self.state.copy()
         outValue: int = 0
         for i,value in enumerate(self.inputs.values()):
             if value is None: # set input to false if no component is connected
@@ -35,8 +34,4 @@ class Collector1to3(LogicComponent):
                 #   components state
             # shift the bit into the correct position and combine
             outValue |= (bit << (i))
-        self.state["outValue"] = (outValue, 3)
-        if self.state != oldState:
-            return True
-        else:
-            return False
\ No newline at end of file
+        return self.setOutput("outValue", outValue, 3)
\ No newline at end of file
@@ -20,7 +20,6 @@ class Collector1to6(LogicComponent):
         Returns:
             bool: True if the output state has changed, False otherwise.
         """
-        oldState = self.state.copy()
         outValue = 0
         for i,value in enumerate(self.inputs.values()):
             if value is None: # set input to false if no component is connected
@@ -31,9 +30,5 @@ class Collector1to6(LogicComponent):
                 #   uses the key from that tuple to access the right output from the 
                 #   components state
             outValue |= (bit << (i))
-        self.state["outValue"] = (outValue, 6)
-        if self.state != oldState:
-            return True
-        else:
-            return False
+        return self.setOutput("outValue", outValue, 6)
     
\ No newline at end of file
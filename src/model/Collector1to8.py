@@ -20,7 +20,6 @@ class Collector1to8(LogicComponent):
         Returns:
             bool: True if the output state has changed, False otherwise.
         """
-        oldState = self.state.copy()
         outValue: int = 0
         for i,value in enumerate(self.inputs.values()):
             if value is None: # set input to false if no component is connected
@@ -32,9 +31,5 @@ class Collector1to8(LogicComponent):
                 #   components state
             # shift the bit into the correct position and combine
             outValue |= (bit << (i))
-        self.state["outValue"] = (outValue, 8)
-        if self.state != oldState:
-            return True
-        else:
-            return False
+        return self.setOutput("outValue", outValue, 8)
     
\ No newline at end of file
@@ -17,7 +17,6 @@ class Collector8to16(LogicComponent):
         Returns:
             bool: True if the output state has changed, False otherwise.
         """
-        oldState = self.state.copy()
         outValue = 0
         
         for i in range(1, 3):
@@ -33,8 +32,4 @@ class Collector8to16(LogicComponent):
             # input1 -> bits 0-7, input2 -> bits 8-15, input3 -> bits 16-23, input4 -> bits 24-31
             outValue |= (byte_value << ((i-1) * 8))
         
-        self.state["outValue"] = (outValue, 16)
-        if self.state != oldState:
-            return True
-        else:
-            return False
\ No newline at end of file
+        return self.setOutput("outValue", outValue, 16)
\ No newline at end of file
@@ -18,7 +18,6 @@ class Collector8to32(LogicComponent):
         Returns:
             bool: True if the output state has changed, False otherwise.
         """
-        oldState = self.state.copy()
         outValue: int = 0
         for i,value in enumerate(self.inputs.values()):
             if value is None: # set input to false if no component is connected
@@ -30,8 +29,4 @@ class Collector8to32(LogicComponent):
                 #   components state
             # shift the bits into the correct position and combine
             outValue |= (bit << (i*8))
-        self.state["outValue"] = (outValue, 32)
-        if self.state != oldState:
-            return True
-        else:
-            return False
\ No newline at end of file
+        return self.setOutput("outValue", outValue, 32)
\ No newline at end of file
@@ -6,6 +6,23 @@ from .LogicComponent import LogicComponent
 # Those lines of code make up less than 10% of the code and everything was peer-reviewed by humans and changes were made for fine-tuning.
 # ===================
 
+# the control signals of every supported opcode: R-type (0), lw (35), sw (43) and beq (4)
+_SIGNALS: typing.Dict[int, typing.Dict[str, typing.Tuple[int, int]]] = {
+    0: {"RegDst": (1, 1), "Branch": (0, 1), "MemRead": (0, 1), "MemtoReg": (0, 1),
+        "AluOp": (2, 2), "MemWrite": (0, 1), "AluSrc": (0, 1), "RegWrite": (1, 1)},
+    35: {"RegDst": (0, 1), "Branch": (0, 1), "MemRead": (1, 1), "MemtoReg": (1, 1),
+         "AluOp": (0, 2), "MemWrite": (0, 1), "AluSrc": (1, 1), "RegWrite": (1, 1)},
+    43: {"RegDst": (0, 1), "Branch": (0, 1), "MemRead": (0, 1), "MemtoReg": (0, 1), # RegDst and MemtoReg: don't care
+         "AluOp": (0, 2), "MemWrite": (1, 1), "AluSrc": (1, 1), "RegWrite": (0, 1)},
+    4: {"RegDst": (0, 1), "Branch": (1, 1), "MemRead": (0, 1), "MemtoReg": (0, 1), # RegDst and MemtoReg: don't care
+        "AluOp": (1, 2), "MemWrite": (0, 1), "AluSrc": (0, 1), "RegWrite": (0, 1)},
+}
+# unsupported opcodes disable all signals
+_NO_SIGNALS: typing.Dict[str, typing.Tuple[int, int]] = {
+    "RegDst": (0, 1), "Branch": (0, 1), "MemRead": (0, 1), "MemtoReg": (0, 1),
+    "AluOp": (0, 2), "MemWrite": (0, 1), "AluSrc": (0, 1), "RegWrite": (0, 1)
+}
+
 class ControlUnit(LogicComponent):
     "note that this is a simplified control unit, which can only handle lw, sw, beq and r-type instructions"
 
@@ -21,74 +38,12 @@ class ControlUnit(LogicComponent):
         Returns:
             bool: True if the output state has changed, False otherwise.
         """
-        oldState = self.state.copy()
-
         if self.inputs["input"] is None:
             opcode = 0
         else:
             opcode = self.inputs["input"][0].getState()[self.inputs["input"][1]][0]
 
-        # R-type instructions
-        if opcode == 0:
-            self.state = {
-                "RegDst": (1, 1),
-                "Branch": (0, 1),
-                "MemRead": (0, 1),
-                "MemtoReg": (0, 1),
-                "AluOp": (2, 2),
-                "MemWrite": (0, 1),
-                "AluSrc": (0, 1),
-                "RegWrite": (1, 1)
-            }
-        # lw instruction
-        elif opcode == 35:
-            self.state = {
-                "RegDst": (0, 1),
-                "Branch": (0, 1),
-                "MemRead": (1, 1),
-                "MemtoReg": (1, 1),
-                "AluOp": (0, 2),
-                "MemWrite": (0, 1),
-                "AluSrc": (1, 1),
-                "RegWrite": (1, 1)
-            }
-        # sw instruction
-        elif opcode == 43:
-            self.state = {
-                "RegDst": (0, 1),  # don't care
-                "Branch": (0, 1),
-                "MemRead": (0, 1),
-                "MemtoReg": (0, 1),  # don't care
-                "AluOp": (0, 2),
-                "MemWrite": (1, 1),
-                "AluSrc": (1, 1),
-                "RegWrite": (0, 1)
-            }
-        # beq instruction
-        elif opcode == 4:
-            self.state = {
-                "RegDst": (0, 1),  # don't care
-                "Branch": (1, 1),
-                "MemRead": (0, 1),
-                "MemtoReg": (0, 1),  # don't care
-                "AluOp": (1, 2),
-                "MemWrite": (0, 1),
-                "AluSrc": (0, 1),
-                "RegWrite": (0, 1)
-            }
-        # unsupported opcode - set all signals to 0
-        else:
-            self.state = {
-                "RegDst": (0, 1),
-                "Branch": (0, 1),
-                "MemRead": (0, 1),
-                "MemtoReg": (0, 1),
-                "AluOp": (0, 2),
-                "MemWrite": (0, 1),
-                "AluSrc": (0, 1),
-                "RegWrite": (0, 1)
-            }
-        if self.state != oldState:
-            return True
-        else:
-            return False
\ No newline at end of file
+        changed = False
+        for key, (value, width) in _SIGNALS.get(opcode, _NO_SIGNALS).items():
+            changed |= self.setOutput(key, value, width)
+        return changed
\ No newline at end of file
@@ -1,9 +1,39 @@
-from src.Algorithms import Algorithms
+import itertools
+import typing
+from collections import OrderedDict
+from src.Algorithms import Algorithms, GraphOrder
 from src.model import LogicComponent
 from src.model.CustomLogicComponentData import CustomLogicComponentData
 from src.model.Input import Input
 from src.model.Output import Output
-from src.constants import COMPONENT_MAP
+from src.model.Register import Register
+from src.model.DLatch import DLatch
+from src.model.DataMemory import DataMemory
+from src.model.InstructionMemory import InstructionMemory
+from src.model.ProgramCounter import ProgramCounter
+from src.model.RegisterBlock import RegisterBlock
+from src.constants import COMPONENT_MAP, CUSTOM_COMPONENT_CACHE_SIZE, CUSTOM_COMPONENT_LUT_BITS
+
+# ===== NOTE =====
+# Custom components without state-holding children are pure functions of their inputs.
+# Their outputs are memoized by the tuple of input states in a bounded LRU cache, so evaluating the
+# same inputs again skips the evaluation of all child components. Components with few input bits
+# get a complete lookup table on their first miss. The child components are only evaluated on a miss,
+# a hit only writes the outputs of the component, so the states of the children of pure components
+# are the ones of the last miss and not meaningful.
+# ================
+
+# child components that hold state, a custom component containing any of them is never memoized
+STATEFUL_TYPES = (Register, DLatch, DataMemory, InstructionMemory, ProgramCounter, RegisterBlock)
+
+InputKey = typing.Tuple[typing.Tuple[int, int], ...]
+OutputStates = typing.Tuple[typing.Tuple[int, int], ...]
+
+
+def _fixedTopology() -> int:
+    """Version source of the order of the children, their connections never change after the component was created"""
+    return 0
+
 
 class CustomLogicComponent(LogicComponent):
     """A custom component made by the user"""
@@ -22,31 +52,103 @@ class CustomLogicComponent(LogicComponent):
             dstComp = self.childComponents[connection["destination"]]
             srcComp.addOutput(dstComp, connection["destinationKey"])
             dstComp.addInput(srcComp, connection["originKey"], connection["destinationKey"])
+        # The Input and Output children map to the inputs and outputs of this component, in the same order
+        self.inputComponents = [comp for comp in self.childComponents if isinstance(comp, Input)]
+        self.outputComponents = [comp for comp in self.childComponents if isinstance(comp, Output)]
+        self.graphOrder: GraphOrder = GraphOrder(self.childComponents, _fixedTopology)
+
+        self.pure: bool = self._isPure()
+        self.cacheSize: int = CUSTOM_COMPONENT_CACHE_SIZE
+        self.memo: typing.OrderedDict[InputKey, OutputStates] = OrderedDict()
+        self.memoHits: int = 0
+        self.memoMisses: int = 0
+        self.lookupTable: typing.Optional[typing.Dict[InputKey, OutputStates]] = None # built on the first miss
+        # input widths of the lookup table, None if the component doesn't get one
+        self.lookupTableWidths: typing.Optional[typing.List[int]] = None
+        if self.pure and sum(componentData.inputMap.values()) <= CUSTOM_COMPONENT_LUT_BITS:
+            self.lookupTableWidths = list(componentData.inputMap.values())
+
+    def _isPure(self) -> bool:
+        """Whether the outputs only depend on the inputs, i.e. there are no stateful children and no loops"""
+        for comp in self.childComponents:
+            if isinstance(comp, STATEFUL_TYPES):
+                return False
+            if isinstance(comp, CustomLogicComponent) and not comp.pure:
+                return False
+        return len(self.inputComponents) == len(self.inputs) and self.graphOrder.acyclic
+
+    def _buildLookupTable(self, widths: typing.List[int]) -> typing.Dict[InputKey, OutputStates]:
+        """Evaluates every combination of input values"""
+        table = {}
+        initialStates = [comp.getState()["outValue"] for comp in self.inputComponents]
+        for values in itertools.product(*[range(1 << width) for width in widths]):
+            key = tuple(zip(values, widths))
+            for comp, state in zip(self.inputComponents, key):
+                comp.setState(state)
+            if self._evalChildren():
+                table[key] = tuple(comp.getState()["outValue"] for comp in self.outputComponents)
+        for comp, state in zip(self.inputComponents, initialStates):
+            comp.setState(state)
+        return table
+
+    def _evalChildren(self) -> bool:
+        if Algorithms.khanFrontierEval(self.inputComponents, self.childComponents, order=self.graphOrder):
+            return True
+        return Algorithms.eventDrivenEval(self.inputComponents, self.childComponents, order=self.graphOrder)
+
+    def _lookup(self, key: InputKey) -> typing.Optional[OutputStates]:
+        if self.lookupTable is not None and key in self.lookupTable:
+            return self.lookupTable[key]
+        outputs = self.memo.get(key)
+        if outputs is not None:
+            self.memo.move_to_end(key)
+        return outputs
+
+    def _remember(self, key: InputKey, outputs: OutputStates) -> None:
+        self.memo[key] = outputs
+        if len(self.memo) > self.cacheSize:
+            self.memo.popitem(last=False)
+
+    def clearMemo(self) -> None:
+        """Drops all memoized outputs and resets the counters, the lookup table is kept"""
+        self.memo.clear()
+        self.memoHits = 0
+        self.memoMisses = 0
 
     def eval(self) -> bool:
-        """Evaluates all child components in order
+        """Evaluates all child components in order. Pure components only write their outputs if the input
+        states were evaluated before, the child components keep their states then.
 
         Returns:
           Bool: True if evaluation was successful, false if not.
         """
-        # Filter child components to get only Input components
-        inputComponents = [comp for comp in self.childComponents if isinstance(comp, Input)]
+        inputComponents = self.inputComponents
 
         # Map external input values to internal inputs
         for i, externalInput in enumerate(self.inputs.values()):
             if externalInput is not None:
                 inputComponents[i].setState(externalInput[0].getState()["outValue"])
 
+        inputKey = None
+        if self.pure:
+            inputKey = tuple(tuple(comp.getState()["outValue"]) for comp in inputComponents)
+            outputs = self._lookup(inputKey)
+            if outputs is not None:
+                self.memoHits += 1
+                for key, state in zip(self.state.keys(), outputs):
+                    self.state[key] = state
+                return True
+            self.memoMisses += 1
+            if self.lookupTable is None and self.lookupTableWidths is not None:
+                self.lookupTable = self._buildLookupTable(self.lookupTableWidths)
+
         # Internal evaluation
-        returnValue = False
-        if Algorithms.khanFrontierEval(inputComponents, self.childComponents):
-            returnValue = True
-        elif Algorithms.eventDrivenEval(inputComponents, self.childComponents):
-            returnValue = True
+        returnValue = self._evalChildren()
 
         # Map internal output values to state
-        outputComponents = [comp for comp in self.childComponents if isinstance(comp, Output)]
         for i, key in enumerate(self.state.keys()):
-            self.state[key] = outputComponents[i].getState()["outValue"]
+            self.state[key] = self.outputComponents[i].getState()["outValue"]
 
+        if inputKey is not None and returnValue:
+            self._remember(inputKey, tuple(self.state.values()))
         return returnValue
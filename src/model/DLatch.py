@@ -19,7 +19,6 @@ class DLatch(LogicComponent):
 		Returns:
 			bool: True if the output state has changed, False otherwise.
 		"""
-        oldState = self.state.copy()
         if self.inputs["inputC"] is None: # set input to false if no component is connected
             c: int = 0
         else:
@@ -35,12 +34,8 @@ class DLatch(LogicComponent):
             #   uses the key from that tuple to access the right output from the 
             #   components state
         if c == 1: # if clock is high, set output to D
-            oldState = self.state.copy()
-            self.state["outQ"] = (d,1)
-            self.state["out!Q"] = (1 - d,1)
-            if self.state != oldState:
-                return True
-            else:
-                return False
+            changed = self.setOutput("outQ", d, 1)
+            changed |= self.setOutput("out!Q", 1 - d, 1)
+            return changed
         else: # if clock is low, keep output
             return False
\ No newline at end of file
@@ -1,5 +1,7 @@
 import typing
+from pathlib import Path
 from .LogicComponent import LogicComponent
+from .PagedMemory import ADDRESS_WORDS, PagedMemory
 
 # ===== AI NOTE =====
 # Some lines of code in this class were coded using AI to streamline the development process, but never entire code sections.
@@ -16,7 +18,8 @@ class DataMemory(LogicComponent):
         # Data Memory has exactly four inputs
         #   (Tuples of component and output key of that component)
         self.state: dict = {"readData": (0,32)}  
-        self.dataList: typing.List = [0 for _ in range(128)] # List of data stored in memory
+        # sparse memory of the whole 32-bit address space, the first 128 words are always shown
+        self.dataList: PagedMemory = PagedMemory(128)
 
     def eval(self) -> bool:
         """Evaluate the Data Memory, and return if the Output has changed.
@@ -51,14 +54,14 @@ class DataMemory(LogicComponent):
                 #   uses the key from that tuple to access the right output from the
                 #   components state
             # Write data to memory
-            if address < len(self.dataList) and address >= 0:
-                self.dataList[address] = writeData
+            if address < ADDRESS_WORDS and address >= 0:
+                self.dataList.write(address, writeData)
             return False  # No output change on write
         
 
         if memRead:
-            if address < len(self.dataList) and address >= 0:
-                data = self.dataList[address]
+            if address < ADDRESS_WORDS and address >= 0:
+                data = self.dataList.read(address)
             else:
                 data = 0  # Default data if address is out of range
             self.state = {
@@ -73,4 +76,19 @@ class DataMemory(LogicComponent):
         Args:
             data (typing.List[int]): List of data to load.
         """
-        self.dataList = data
+        self.dataList = PagedMemory(128)
+        self.dataList.loadWords(data)
+
+    def loadImage(self, path: typing.Union[str, Path], address: int = 0) -> None:
+        """Loads a memory image from a file, for data sets that are too big for a level file.
+        Text files (.hex, .mem, .txt) hold hexadecimal words, other files are mapped read-only as binary
+        little endian words.
+
+        Args:
+            path: The image file
+            address (int): The byte address of the first word
+        """
+        if Path(path).suffix.lower() in (".hex", ".mem", ".txt"):
+            self.dataList.loadHex(path, address // 4)
+        else:
+            self.dataList.mapImage(path, address // 4)
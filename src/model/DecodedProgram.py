@@ -0,0 +1,29 @@
+import typing
+from array import array
+from .PagedMemory import MappedWords, WORD_MASK
+
+# ===== NOTE =====
+# Programs of the InstructionMemory are packed once when they are loaded: the instruction words are masked to
+# 32 bits and stored in a compact array, indexed by the word address of the instruction.
+# Memory-mapped programs (see PagedMemory.MappedWords) are kept as they are, so loading a big image costs nothing
+# until its words are fetched.
+# ================
+
+
+class DecodedProgram:
+    """The instruction words of a program, packed for fetching them by their word address."""
+
+    def __init__(self, words: typing.Sequence[int] = ()):
+        # the instruction words, memory-mapped words are kept as they are, other sequences are packed into an array
+        if not isinstance(words, MappedWords):
+            words = array("I", [word & WORD_MASK for word in words])
+        self.raw: typing.Sequence[int] = words
+
+    def __len__(self) -> int:
+        return len(self.raw)
+
+    def fetch(self, index: int) -> int:
+        """Returns the instruction word at the given word address, 0 outside of the program"""
+        if 0 <= index < len(self.raw):
+            return self.raw[index]
+        return 0
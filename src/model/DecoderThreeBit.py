@@ -17,8 +17,6 @@ class DecoderThreeBit(LogicComponent):
         Returns:
             bool: True if the output state has changed, False otherwise.
         """
-        old_state = self.state.copy()
-        
         # Default input values to 0 if not connected
         a: int = 0
         b: int = 0
@@ -36,13 +34,9 @@ class DecoderThreeBit(LogicComponent):
         # calculate the binary value from the three inputs (abc)
         value: int = (a<<2) + (b<<1) + c
         
-        # Reset all outputs to 0
+        # Set the selected output to 1 and all others to 0
+        selected: str = f"outValue{value + 1}"
+        changed = False
         for key in self.state.keys():
-            self.state[key] = (0, 1)
-
-        # Set the selected output to 1
-        self.state[f"outValue{value + 1}"] = (1, 1)
-        if self.state != old_state:
-            return True
-        else:
-            return False
\ No newline at end of file
+            changed |= self.setOutput(key, 1 if key == selected else 0, 1)
+        return changed
\ No newline at end of file
@@ -19,7 +19,6 @@ class FullAdder(LogicComponent):
             bool: True if the output state has changed, False otherwise.
         """
         
-        oldState = self.state.copy()
         if self.inputs["inputA"] is None: # set input to false if no component is connected
             a:int = 0
         else:
@@ -42,11 +41,6 @@ class FullAdder(LogicComponent):
             # gets the component out of the third tuple in self.inputs and then
             #   uses the key from that tuple to access the right output from the
             #   components state
-        self.state = {
-            "outSum": ((a + b + cin) % 2, 1),  # Sum is 1 if the total number of 1s is odd
-            "cOut": ((a + b + cin) // 2, 1)  # Cout is 1 if two or more inputs are 1
-        }
-        if self.state != oldState:
-            return True
-        else:
-            return False
\ No newline at end of file
+        changed = self.setOutput("outSum", (a + b + cin) % 2, 1) # Sum is 1 if the total number of 1s is odd
+        changed |= self.setOutput("cOut", (a + b + cin) // 2, 1) # Cout is 1 if two or more inputs are 1
+        return changed
\ No newline at end of file
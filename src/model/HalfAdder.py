@@ -20,7 +20,6 @@ class HalfAdder(LogicComponent):
         Returns:
             bool: True if the output state has changed, False otherwise.
         """
-        oldState = self.state.copy()
         if self.inputs["inputA"] is None: # set input to false if no component is connected
             a: int = 0
         else:
@@ -36,11 +35,6 @@ class HalfAdder(LogicComponent):
             # gets the component out of the second tuple in self.inputs and then 
             #   uses the key from that tuple to access the right output from the 
             #   components state
-        self.state = {
-            "sum": (1,1) if a != b else (0,1),
-            "carry": (1,1) if a+b==2 else (0,1)
-        }
-        if self.state != oldState:
-            return True
-        else:
-            return False
\ No newline at end of file
+        changed = self.setOutput("sum", 1 if a != b else 0, 1)
+        changed |= self.setOutput("carry", 1 if a+b == 2 else 0, 1)
+        return changed
\ No newline at end of file
@@ -10,8 +10,8 @@ class Input(LogicComponent):
         #Inputs are always empty for Input component
         self.inputs = {} # Input has no inputs
         self.outputs: typing.List["LogicComponent"] = []
-        self.id = LogicComponent.id
-        LogicComponent.id +=1
+        self.id = LogicComponent.nextId
+        LogicComponent.nextId +=1
         # Default state for components with one output: (0,1) = (value, bitlength)
         self.state: dict = {"outValue": (0,1)} 
 
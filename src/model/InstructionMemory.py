@@ -1,5 +1,8 @@
 import typing
+from pathlib import Path
+from .DecodedProgram import DecodedProgram
 from .LogicComponent import LogicComponent
+from .PagedMemory import MappedWords, PagedMemory
 
 class InstructionMemory(LogicComponent):
 
@@ -10,7 +13,8 @@ class InstructionMemory(LogicComponent):
         # Half Adder has exactly two inputs
         #   (Tuples of component and output key of that component)
         self.state: dict = {"instruction": (0,32)}  
-        self.instructionList: typing.List = [] # List of instructions stored in memory
+        self.instructionList: typing.Sequence[int] = [] # List of instructions stored in memory
+        self.program: DecodedProgram = DecodedProgram() # the packed instructions, see loadInstructions
         
     def eval(self) -> bool:
         """Evaluate the Instruction Memory, and return if the Output has changed.
@@ -18,7 +22,6 @@ class InstructionMemory(LogicComponent):
         Returns:
             bool: True if the output state has changed, False otherwise.
         """
-        oldState = self.state.copy()
         if self.inputs["readAddress"] is None: # set input to zero if no component is connected
             address: int = 0
         else:
@@ -28,17 +31,8 @@ class InstructionMemory(LogicComponent):
             #   components state
         
         address = address // 4  # Convert byte address to word address
-        if address < len(self.instructionList):
-            instruction: int = self.instructionList[address]
-        else:
-            instruction: int = 0  # Default instruction if address is out of range
-        self.state = {
-            "instruction": (instruction, 32)
-        }
-        if self.state != oldState:
-            return True
-        else:
-            return False    
+        instruction: int = self.program.fetch(address) # 0 if the address is out of range
+        return self.setOutput("instruction", instruction, 32)    
     
     def loadInstructions(self, instructions: typing.List[int]) -> None:
         """Load a list of instructions into the instruction memory.
@@ -47,5 +41,20 @@ class InstructionMemory(LogicComponent):
             instructions (typing.List[int]): List of instructions to load.
         """
         self.instructionList = instructions
+        self.program = DecodedProgram(instructions)
+
+    def loadImage(self, path: typing.Union[str, Path]) -> None:
+        """Loads a program from a file instead of a level file. Text files (.hex, .mem, .txt) hold hexadecimal
+        words, other files are mapped read-only as binary little endian words.
+
+        Args:
+            path: The program file
+        """
+        if Path(path).suffix.lower() in (".hex", ".mem", ".txt"):
+            memory = PagedMemory()
+            memory.loadHex(path)
+            self.loadInstructions(memory[:])
+        else:
+            self.loadInstructions(MappedWords(path))
 
      
\ No newline at end of file
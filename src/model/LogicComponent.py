@@ -3,19 +3,26 @@ import typing
 from src.infrastructure.eventBus import getBus
 
 class LogicComponent(ABC):
-    """Abstract base class for all logic components in the circuit simulator."""
-    id: int = 0
+    """Abstract base class for all logic components in the circuit simulator.
+
+    The common attributes live in __slots__. Components that only use them (the gates and Output) declare
+    empty __slots__ themselves, so they don't carry an instance dict, which keeps big sandbox designs small.
+    """
+    __slots__ = ("inputs", "inputBitwidths", "outputs", "id", "label", "state", "bus", "changedPorts")
+    nextId: int = 0 # id of the next component
+    topologyVersion: int = 0 # incremented on every connection change, used to invalidate compiled netlists
     
     def __init__(self):
         
         self.inputs: typing.Dict = {} #internalKey where a input is connected to and tupels of inputs and the key of the inputs output (important for the controllers algorithms)
         self.inputBitwidths: typing.Dict = {} # internalKey of input and the bitwidth of that input
         self.outputs: typing.List[("LogicComponent",str)] = [] # list of tupels of outputs and the key they are connected to (important for the controllers algorithms)
-        self.id = LogicComponent.id
+        self.id = LogicComponent.nextId
         self.label: str = ""
-        LogicComponent.id +=1
+        LogicComponent.nextId +=1
         self.state: dict = {} # Default state for components with one output: (0,1) = (value, bitlength)
         self.bus = getBus()
+        self.changedPorts: typing.List[str] = [] # output keys changed by setOutput since the evaluator last cleared it
 
     # Implementation left to the subclasses
     @abstractmethod
@@ -23,6 +30,28 @@ class LogicComponent(ABC):
         """Evaluate the component and return if the Output has changed."""
         pass
 
+    def setOutput(self, key: str, value: int, bitwidth: int) -> bool:
+        """Writes an output in place and records its key in changedPorts if it changed.
+
+        Evaluators clear changedPorts before calling eval(), so afterwards it holds the ports whose
+        connections have to be evaluated next.
+
+        Args:
+            key (str): The key of the output in the state
+            value (int): The new value of the output
+            bitwidth (int): The bitwidth of the output
+
+        Returns:
+            bool: True if the value or the bitwidth of the output changed, False otherwise.
+        """
+        old = self.state.get(key)
+        if old is not None and old[0] == value and old[1] == bitwidth:
+            return False
+        self.state[key] = (value, bitwidth)
+        if key not in self.changedPorts:
+            self.changedPorts.append(key)
+        return True
+
     def getInputs(self) -> typing.List["LogicComponent"]:
         return self.inputs
     
@@ -41,6 +70,7 @@ class LogicComponent(ABC):
         """
         if internalKey in self.inputs and self.inputs[internalKey] is None:
             self.inputs[internalKey] = (input,key)
+            LogicComponent.topologyVersion += 1
             self.bus.emit("model:input_changed",self)
             return True
         elif internalKey in self.inputs and self.inputs[internalKey] is not None:
@@ -61,6 +91,7 @@ class LogicComponent(ABC):
             KeyError: If the internalKey is not found in inputs or the input does not match"""     
         if internalKey in self.inputs and self.inputs[internalKey] == (input,key):
             self.inputs[internalKey] = None
+            LogicComponent.topologyVersion += 1
             self.bus.emit("model:input_changed",self)
         else:
             raise KeyError(f"Key {internalKey} not found in inputs or input does not match.")
@@ -77,6 +108,7 @@ class LogicComponent(ABC):
             key (str): the key of the input from the output component
         """
         self.outputs.append((output,key))
+        LogicComponent.topologyVersion += 1
 
     def removeOutput(self, output: "LogicComponent", key:str) -> None:
         """Remove an output connection from this component
@@ -87,10 +119,16 @@ class LogicComponent(ABC):
         """
         if (output,key) in self.outputs:
             self.outputs.remove((output,key))
+            LogicComponent.topologyVersion += 1
 
     def getState(self) -> dict:
         return self.state
 
+    @staticmethod
+    def currentTopologyVersion() -> int:
+        """Returns the global topology version, the default version source of cached orders and netlists"""
+        return LogicComponent.topologyVersion
+
     def __hash__(self) -> int:
         return self.id
     
@@ -3,6 +3,7 @@ from .LogicComponent import LogicComponent
 
 class Not(LogicComponent):
     """ NOT gate component with one input and one output. """
+    __slots__ = ()
     
     def __init__(self):
         super().__init__()
@@ -19,7 +20,6 @@ class Not(LogicComponent):
             bool: True if the output state has changed, False otherwise.
         """
         
-        oldState = self.state.copy()
         if self.inputs["input"] is None: # set input to false if no component ist connected
             a: int = 0
         else:
@@ -27,11 +27,5 @@ class Not(LogicComponent):
             # gets the component out of the first tuple in self.inputs and then 
             #   uses the key from that tuple to access the right output from the 
             #   components state
-        if a == 0:
-            self.state["outValue"] = (1,1)
-        else:
-            self.state["outValue"] = (0,1)
-        if self.state != oldState:
-            return True
-        else:
-            return False
\ No newline at end of file
+        value: int = 1 if a == 0 else 0
+        return self.setOutput("outValue", value, 1)
\ No newline at end of file
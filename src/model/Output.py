@@ -3,6 +3,7 @@ from .LogicComponent import LogicComponent
 
 class Output(LogicComponent):
     """ Output component with one input and no outputs. """
+    __slots__ = ()
     
     def __init__(self):
         super().__init__()
@@ -19,7 +20,6 @@ class Output(LogicComponent):
         Returns:
             bool: True if the output state has changed, False otherwise.
         """
-        old_state = self.state.copy()
         if self.inputs["input"] is None: # set input to false if no component is connected
             value: int = 0
         else:
@@ -27,11 +27,8 @@ class Output(LogicComponent):
         # gets the component out of the first tuple in self.inputs and then 
             #   uses the key from that tuple to access the right output from the 
             #   components state
-        self.state = {"outValue": (value, self.inputBitwidths["input"])}
-        if self.state != old_state:
-            return True
-        else:
-            return False
+        width: int = self.inputBitwidths["input"]
+        return self.setOutput("outValue", value, width)
         
     def addInput(self, input, key, internalKey)-> bool:
         """ Add an input to the Output component."""
@@ -0,0 +1,192 @@
+import mmap
+import os
+import sys
+import typing
+from array import array
+from pathlib import Path
+
+# ===== NOTE =====
+# Sparse word memory for the whole 32-bit address space (2**30 words of 32 bits).
+# - Words are stored in pages of PAGE_WORDS words, backed by array('I'). A page is only allocated on its first write,
+#   unwritten words read as 0.
+# - Read-only images (e.g. a memory-mapped binary file) can be placed at any word address. Reads of words without
+#   an allocated page fall through to the images, the first write to such a page copies the image content into it.
+# - len() and iteration cover the words in use (at least minWords), so it can still be used like the plain list
+#   the memories used before.
+# Binary images are read as little endian 32-bit words.
+# ================
+
+PAGE_BITS: int = 10
+PAGE_WORDS: int = 1 << PAGE_BITS
+ADDRESS_WORDS: int = 1 << 30 # 32-bit byte addresses
+WORD_MASK: int = 0xFFFFFFFF
+
+
+class PagedMemory:
+    """Sparse 32-bit word memory with pages allocated on the first write."""
+
+    def __init__(self, minWords: int = 0):
+        self.pages: typing.Dict[int, array] = {}
+        # (first word, words) of the read-only images, later images cover earlier ones
+        self.images: typing.List[typing.Tuple[int, typing.Sequence[int]]] = []
+        self.size: int = minWords # number of words in use, the highest written or loaded word + 1
+
+    def read(self, word: int) -> int:
+        """Returns the word at the given word address, 0 if it was never written"""
+        page = self.pages.get(word >> PAGE_BITS)
+        if page is not None:
+            return page[word & (PAGE_WORDS - 1)]
+        return self._readImage(word)
+
+    def write(self, word: int, value: int) -> None:
+        """Writes a word, the value is truncated to 32 bits
+
+        Raises:
+            IndexError: If the word address is outside of the 32-bit address space
+        """
+        if word < 0 or word >= ADDRESS_WORDS:
+            raise IndexError(f"Word address {word} is outside of the address space")
+        page = self.pages.get(word >> PAGE_BITS)
+        if page is None:
+            page = self._allocate(word >> PAGE_BITS)
+        page[word & (PAGE_WORDS - 1)] = value & WORD_MASK
+        if word >= self.size:
+            self.size = word + 1
+
+    def loadWords(self, words: typing.Iterable[int], address: int = 0) -> None:
+        """Writes consecutive words starting at the given word address, page by page"""
+        words = [value & WORD_MASK for value in words]
+        if address < 0 or address + len(words) > ADDRESS_WORDS:
+            raise IndexError("The words don't fit into the address space")
+        offset = 0
+        while offset < len(words):
+            word = address + offset
+            index, start = word >> PAGE_BITS, word & (PAGE_WORDS - 1)
+            count = min(PAGE_WORDS - start, len(words) - offset)
+            page = self.pages.get(index)
+            if page is None:
+                page = self._allocate(index)
+            page[start:start + count] = array("I", words[offset:offset + count])
+            offset += count
+        self.size = max(self.size, address + len(words))
+
+    def loadBinary(self, path: typing.Union[str, Path], address: int = 0) -> None:
+        """Copies a binary file of little endian 32-bit words into the memory, starting at the given word address"""
+        data = Path(path).read_bytes()
+        self.loadWords(_wordsOf(data), address)
+
+    def loadHex(self, path: typing.Union[str, Path], address: int = 0) -> None:
+        """Loads a text file with one or more hexadecimal words per line, like $readmemh of Verilog.
+        "@<hex word address>" continues at another address, "//" and "#" start comments."""
+        word = address
+        with open(path, "r") as f:
+            for line in f:
+                line = line.split("//")[0].split("#")[0]
+                pending: typing.List[int] = []
+                for token in line.split():
+                    if token.startswith("@"):
+                        self.loadWords(pending, word - len(pending))
+                        pending = []
+                        word = int(token[1:], 16)
+                    else:
+                        pending.append(int(token.replace("_", ""), 16))
+                        word += 1
+                self.loadWords(pending, word - len(pending))
+
+    def mapImage(self, path: typing.Union[str, Path], address: int = 0) -> None:
+        """Maps a binary file of little endian 32-bit words read-only into the memory at the given word address.
+        The file is not read into memory, only the pages that are written get copied."""
+        words = MappedWords(path)
+        if len(words) == 0:
+            return
+        if address < 0 or address + len(words) > ADDRESS_WORDS:
+            raise IndexError("The image doesn't fit into the address space")
+        self.images.append((address, words))
+        self.size = max(self.size, address + len(words))
+
+    def assign(self, other: "PagedMemory") -> None:
+        """Replaces the content of this memory with a copy of another memory, the images are shared"""
+        self.pages = {index: array("I", page) for index, page in other.pages.items()}
+        self.images = list(other.images)
+        self.size = other.size
+
+    def _readImage(self, word: int) -> int:
+        for start, words in reversed(self.images):
+            if start <= word < start + len(words):
+                return words[word - start]
+        return 0
+
+    def _allocate(self, index: int) -> array:
+        """Allocates a page, filled with the content of the images it overlaps"""
+        first = index << PAGE_BITS
+        page = array("I", bytes(4 * PAGE_WORDS))
+        for start, words in self.images:
+            begin, end = max(first, start), min(first + PAGE_WORDS, start + len(words))
+            if begin < end:
+                page[begin - first:end - first] = array("I", words[begin - start:end - start])
+        self.pages[index] = page
+        return page
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, key: typing.Union[int, slice]) -> typing.Union[int, typing.List[int]]:
+        if isinstance(key, slice):
+            return [self.read(word) for word in range(*key.indices(self.size))]
+        if key < 0:
+            key += self.size
+        return self.read(key)
+
+    def __setitem__(self, key: int, value: int) -> None:
+        if key < 0:
+            key += self.size
+        self.write(key, value)
+
+    def __iter__(self) -> typing.Iterator[int]:
+        return (self.read(word) for word in range(self.size))
+
+    def __deepcopy__(self, memo: dict) -> "PagedMemory":
+        # the images are read-only, so copies can share them
+        copied = PagedMemory()
+        copied.assign(self)
+        memo[id(self)] = copied
+        return copied
+
+
+class MappedWords:
+    """The little endian 32-bit words of a file, mapped read-only. Copies share the mapping."""
+
+    def __init__(self, path: typing.Union[str, Path]):
+        self.path: Path = Path(path)
+        self.words: typing.Sequence[int] = array("I")
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < 4:
+                return
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if sys.byteorder == "little":
+            self.words = memoryview(mapped)[:len(mapped) // 4 * 4].cast("I")
+        else:
+            self.words = _wordsOf(mapped) # the words can't be viewed in place on a big endian machine
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def __getitem__(self, key: typing.Union[int, slice]) -> typing.Union[int, typing.List[int]]:
+        if isinstance(key, slice):
+            return self.words[key].tolist()
+        return self.words[key]
+
+    def __iter__(self) -> typing.Iterator[int]:
+        return iter(self.words)
+
+    def __deepcopy__(self, memo: dict) -> "MappedWords":
+        return self
+
+
+def _wordsOf(data: typing.Union[bytes, mmap.mmap]) -> array:
+    """Converts little endian bytes to words, a trailing partial word is ignored"""
+    words = array("I")
+    words.frombytes(bytes(data[:len(data) // 4 * 4]))
+    if sys.byteorder != "little":
+        words.byteswap()
+    return words
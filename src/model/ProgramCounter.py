@@ -21,27 +21,41 @@ class ProgramCounter(LogicComponent):
         if count > 5:
             self.maxValue = count*4
 
+    def _nextAddress(self) -> int:
+        """Returns the address at the input, 0 if no component is connected"""
+        if self.inputs["input"] is None:  # set input to zero if no component is connected
+            return 0
+        # gets the component out of the first tuple in self.inputs and then
+        #   uses the key from that tuple to access the right output from the
+        #   components state
+        return self.inputs["input"][0].getState()[self.inputs["input"][1]][0]
+
     def eval(self) -> bool:
         """Evaluate the program counter state based on the input state.
 
         Returns:
             bool: True if the output state has changed, False otherwise.
         """
-        oldState = self.state.copy()
-        if self.inputs["input"] is None:  # set input to zero if no component is connected
-            value: int = 0
-        else:
-            value: int = self.inputs["input"][0].getState()[self.inputs["input"][1]][0]
-            # gets the component out of the first tuple in self.inputs and then
-            #   uses the key from that tuple to access the right output from the
-            #   components state
-        self.state = {"outValue": (value, 32)}
+        value = self._nextAddress()
         if value >= self.maxValue:
-            self.state = {"outValue": (0, 32)}
+            self.setOutput("outValue", 0, 32)
             return False
-        if self.state != oldState:
+        if self.setOutput("outValue", value, 32):
             # Only emit a new cycle event when the program counter actually changed
             self.bus.emit("newCycle")
             return True
         return False
-           
\ No newline at end of file
+
+    def advance(self) -> bool:
+        """Takes over the address at the input like a clock edge, without emitting newCycle.
+        Used by the clock driver of the LogicComponentController.
+
+        Returns:
+            bool: False if the program ended, i.e. the address is past the last instruction. The counter is reset to 0 then.
+        """
+        value = self._nextAddress()
+        if value >= self.maxValue:
+            self.setOutput("outValue", 0, 32)
+            return False
+        self.setOutput("outValue", value, 32)
+        return True
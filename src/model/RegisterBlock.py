@@ -44,12 +44,9 @@ class RegisterBlock(LogicComponent):
         readData1: int = self.registers[readReg1] if readReg1 < len(self.registers) else 0
         readData2: int = self.registers[readReg2] if readReg2 < len(self.registers) else 0
 
-        self.state = {
-            "readData1": (readData1, 32),
-            "readData2": (readData2, 32)
-        }
-        
-        return True
+        changed = self.setOutput("readData1", readData1, 32)
+        changed |= self.setOutput("readData2", readData2, 32)
+        return changed
     
     def updateRegisterValues(self):
         # Write operation
@@ -24,7 +24,6 @@ class ShiftLeft2(LogicComponent):
 		Returns:
 			bool: True if the output state has changed, False otherwise.
 		"""
-        oldState = self.state.copy()
         if self.inputs["input1"] is None: # set input to false if no component is connected
             a:int = 0
             # If no input connected, keep the configured bitwidth or default to 0
@@ -43,11 +42,7 @@ class ShiftLeft2(LogicComponent):
             mask = (1 << outputBitwidth) - 1
             shifted_value = shifted_value & mask
         
-        self.state["outValue"] = (shifted_value, outputBitwidth)
-        if self.state != oldState:
-            return True
-        else:
-            return False
+        return self.setOutput("outValue", shifted_value, outputBitwidth)
         
     def addInput(self, input: "LogicComponent", key: str, internalKey: str)-> bool:
         ret = super().addInput(input,key,internalKey)
@@ -18,7 +18,6 @@ class SignExtend(LogicComponent):
 		Returns:
 			bool: True if the output state has changed, False otherwise.
 		"""
-        oldState = self.state.copy()
         if self.inputs["input1"] is None: # set input to false if no component is connected
             a: int = 0
         else:
@@ -26,8 +25,4 @@ class SignExtend(LogicComponent):
             # gets the component out of the first tuple in self.inputs and then 
             #   uses the key from that tuple to access the right output from the 
             #   components state
-        self.state["outValue"] = (a,32) # sign-extend to 32 bits
-        if self.state != oldState:
-            return True
-        else:
-            return False
\ No newline at end of file
+        return self.setOutput("outValue", a, 32) # sign-extend to 32 bits
\ No newline at end of file
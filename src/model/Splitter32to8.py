@@ -18,7 +18,6 @@ class Splitter32to8(LogicComponent):
         Returns:
             bool: True if any output state has changed, False otherwise.
         """
-        oldState = self.state.copy()
         
         if self.inputs["input1"] is None:  # set input to zero if no component is connected
             inValue: int = 0
@@ -29,13 +28,11 @@ class Splitter32to8(LogicComponent):
             #   components state
         
         # Split the 32-bit input into four 8-bit outputs
+        changed = False
         for i, key in enumerate(self.state.keys()):
             # Extract the 8-bit value for this output
             # outValue1 -> bits 0-7, outValue2 -> bits 8-15, outValue3 -> bits 16-23, outValue4 -> bits 24-31
             byte_value = (inValue >> (i * 8)) & 0xFF
-            self.state[key] = (byte_value, 8)
+            changed |= self.setOutput(key, byte_value, 8)
 
-        if self.state != oldState:
-            return True
-        else:
-            return False
\ No newline at end of file
+        return changed
\ No newline at end of file
@@ -19,7 +19,6 @@ class Splitter8to1(LogicComponent):
         Returns:
             bool: True if any output state has changed, False otherwise.
         """
-        oldState = self.state.copy()
         if self.inputs["input1"] is None: # set input to zero if no component is connected
             inValue: int = 0
         else:
@@ -27,10 +26,8 @@ class Splitter8to1(LogicComponent):
             # gets the component out of the tuple in self.inputs and then 
             #   uses the key from that tuple to access the right output from the 
             #   components state
+        changed = False
         for i, key in enumerate(self.state.keys()):
             bit = (inValue >> (i)) & 1
-            self.state[key] = (bit, 1)
-        if self.state != oldState:
-            return True
-        else:
-            return False
+            changed |= self.setOutput(key, bit, 1)
+        return changed
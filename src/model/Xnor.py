@@ -3,6 +3,7 @@ from .LogicComponent import LogicComponent
 
 class Xnor(LogicComponent):
     """ XNOR gate that outputs 1 if both 1-bit inputs are the same, otherwise outputs 0. """
+    __slots__ = ()
     
     def __init__(self):
         super().__init__()
@@ -18,7 +19,6 @@ class Xnor(LogicComponent):
 		Returns:
 			bool: True if the output state has changed, False otherwise.
 		"""
-        oldState = self.state.copy()
         if self.inputs["input1"] is None: # set input to false if no component is connected
             a:int = 0
         else:
@@ -33,11 +33,5 @@ class Xnor(LogicComponent):
 			# gets the component out of the second tuple in self.inputs and then
             #   uses the key from that tuple to access the right output from the
             #   components state
-        if a == b:
-            self.state["outValue"] = (1,1)
-        else:
-            self.state["outValue"] = (0,1)
-        if self.state != oldState:
-            return True
-        else:
-            return False
+        value: int = 1 if a == b else 0
+        return self.setOutput("outValue", value, 1)
@@ -3,6 +3,7 @@ from .LogicComponent import LogicComponent
 
 class Xor(LogicComponent):
     """ XOR gate that outputs 1 if exactly one of the 1-bit inputs is 1, otherwise outputs 0. """
+    __slots__ = ()
 
     def __init__(self):
         super().__init__()
@@ -18,7 +19,6 @@ class Xor(LogicComponent):
 		Returns:
 			bool: True if the output state has changed, False otherwise.
 		"""
-        oldState = self.state.copy()
         if self.inputs["input1"] is None: # set input to false if no component is connected
             a: int = 0
         else:
@@ -33,11 +33,5 @@ class Xor(LogicComponent):
             # gets the component out of the second tuple in self.inputs and then 
             #   uses the key from that tuple to access the right output from the 
             #   components state
-        if a != b:
-            self.state["outValue"] = (1,1)
-        else:
-            self.state["outValue"] = (0,1)
-        if self.state != oldState:
-            return True
-        else:
-            return False
\ No newline at end of file
+        value: int = 1 if a != b else 0
+        return self.setOutput("outValue", value, 1)
\ No newline at end of file
@@ -193,8 +193,10 @@ class GridItem(QtWidgets.QFrame):
         self.customContextMenuRequested.connect(self.openContextMenu)
 
         # Subscribe to component update
+        # On a GridWidget the render scheduler is set, then the labels are updated with the next frame instead of immediately
+        self.renderScheduler = None
         self.bus = getBus()
-        self.bus.subscribe("view:components_updated", self.onComponentUpdated)
+        self.bus.subscribeFor("view:components_updated", self.logicComponent, self.onComponentUpdated)
 
         # Enable mouse tracking for tooltips
         self.setMouseTracking(True)
@@ -342,9 +344,13 @@ class GridItem(QtWidgets.QFrame):
             self.nameLabelContainer.setContentsMargins(16*self.scale_factor, 0, 16*self.scale_factor, 0)
 
     def onComponentUpdated(self, compList):
-        """Event handler for the view:components_updated event. Updated port labels."""
+        """Event handler for the view:components_updated event. Updated port labels.
+        The handler is subscribed for its own component only, so it isn't called for updates of other components."""
         if self.logicComponent in compList:
-            self.updatePortLabels()
+            if self.renderScheduler is not None:
+                self.renderScheduler.markDirty(self.logicComponent)
+            else:
+                self.updatePortLabels()
 
     def updatePortLabels(self):
         """Updates all port labels of the GridItem according to the underlying values in the backend.
@@ -380,4 +386,4 @@ class GridItem(QtWidgets.QFrame):
         """Removes the subscription to the view:components_updated event.
         Should be called first whenever you delete a GridItem.
         """
-        self.bus.unsubscribe("view:components_updated", self.onComponentUpdated)
+        self.bus.unsubscribeFor("view:components_updated", self.logicComponent, self.onComponentUpdated)
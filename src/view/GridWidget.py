@@ -11,8 +11,9 @@ from src.view.GridItems import GridItemFactory
 from src.view.DraggingLine import DraggingLine
 from src.view.GridItems import GridItem
 from src.view.Connection import Connection
+from src.view.RenderScheduler import RenderScheduler
 import json
-from typing import List, Tuple
+from typing import Iterable, List, Tuple
 
 # ===== AI NOTE =====
 # In this file, AI was used to generate the basic structure, particularly the drag and drop behaviour and the paintEvent.
@@ -36,9 +37,12 @@ class GridWidget(QtWidgets.QWidget):
         self.tempPos = None
         self.setMinimumSize(int(cols * CELL_SIZE * self.scale_factor), int(rows * CELL_SIZE * self.scale_factor))
 
+        # Updates of the components are painted at most once per frame
+        self.renderScheduler = RenderScheduler(self)
+
         #Initialize event bus
         self.eventBus = getBus()
-        self.eventBus.subscribe("view:components_updated", self.updateConnectionActivity)
+        self.eventBus.subscribe("view:components_updated", self.renderScheduler.onComponentsUpdated)
         self.eventBus.subscribe("view:components_cleared", self.visuallyRemoveAllItems)
         self.eventBus.subscribe("view:rebuild_circuit", self.rebuildCircuit)
 
@@ -112,6 +116,8 @@ class GridWidget(QtWidgets.QWidget):
         Also adds the item at the given cell (x, y). The cell must be free."""
         if not self.isOccupied(cell):
             gx, gy = cell
+            # The render scheduler updates the labels of items on the grid
+            item.renderScheduler = self.renderScheduler
             self.items.append(item)
             item.setParent(self)
             item.cell_x = gx
@@ -408,13 +414,41 @@ class GridWidget(QtWidgets.QWidget):
             components (List[LogicComponent]): The list of logic components that were updated and whose outgoing connections should become active.
         """
 
+        components = set(components)
+        dirtyRegion = QtGui.QRegion()
+        repaintAll = False
         for conn in self.connections:
-            if conn.srcItem.logicComponent in components:
-                conn.isActive = True
+            isActive = conn.srcItem.logicComponent in components
+            if conn.isActive == isActive:
+                continue
+            conn.isActive = isActive
+            path = conn.getPath()
+            if path is None:
+                repaintAll = True
             else:
-                conn.isActive = False
+                # add a margin for the pen width
+                dirtyRegion += path.boundingRect().toAlignedRect().adjusted(-2, -2, 2, 2)
 
-        self.update()
+        if repaintAll:
+            self.update()
+        elif not dirtyRegion.isEmpty():
+            self.update(dirtyRegion)
+
+    def applyComponentUpdates(self, dirty: Iterable[LogicComponent], active: List[LogicComponent]):
+        """Paints the updates collected by the render scheduler since the last frame.
+        Only the port labels of changed components and connections whose activity changed are repainted.
+
+        Args:
+            dirty (Iterable[LogicComponent]): All components that were updated since the last frame
+            active (List[LogicComponent]): The components of the latest wave, their outgoing connections become active.
+                None if the connection activity didn't change.
+        """
+        dirty = set(dirty)
+        for item in self.items:
+            if item.logicComponent in dirty:
+                item.updatePortLabels()
+        if active is not None:
+            self.updateConnectionActivity(active)
 
     def showErrorToast(self, title: str, text: str):
         """Shows an error message box with the given title and text
@@ -427,7 +461,8 @@ class GridWidget(QtWidgets.QWidget):
 
     def unsubscribe(self):
         """Unsubscribes the GridWidget from all subscriptions. This does not include the ones of the GridItems."""
-        self.eventBus.unsubscribe("view:components_updated", self.updateConnectionActivity)
+        self.eventBus.unsubscribe("view:components_updated", self.renderScheduler.onComponentsUpdated)
+        self.renderScheduler.timer.stop()
         self.eventBus.unsubscribe("view:components_cleared", self.visuallyRemoveAllItems)
         self.eventBus.unsubscribe("view:rebuild_circuit", self.rebuildCircuit)
 
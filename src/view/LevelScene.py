@@ -94,9 +94,10 @@ class LevelScene(QtWidgets.QWidget):
         sidebarFrame.addLayout(deleteAndHintContainer)
 
         # Simulation controls
-        simControls = SimulationControls(self.logicController)
-        simControls.configureReset(self.levelController.resetLevel)
-        simControls.addButton("Check solution", self.checkSolution, 0)
+        self.simControls = SimulationControls(self.logicController)
+        self.simControls.configureReset(self.levelController.resetLevel)
+        self.levelController.setEvaluationWorker(self.simControls.evaluationWorker)
+        self.simControls.addButton("Check solution", self.checkSolution, 0)
 
         # Wrap grid in scroll area
         gridScrollArea = QtWidgets.QScrollArea()
@@ -106,7 +107,7 @@ class LevelScene(QtWidgets.QWidget):
         # Add the widgets to the layout
         self.layout.addWidget(self.backButton, 0, 0)
         self.layout.addLayout(sidebarFrame, 1, 0)
-        self.layout.addWidget(simControls, 0, 1)
+        self.layout.addWidget(self.simControls, 0, 1)
         self.layout.addWidget(gridScrollArea, 1, 1)
 
     def checkSolution(self):
@@ -126,5 +127,6 @@ class LevelScene(QtWidgets.QWidget):
 
     def goToLevelSelection(self):
         """Cleans up the logic components and the grid and then emits the event to switch to the level selection."""
+        self.simControls.stopEvaluation()
         self.grid.unsubscribe()
         self.levelController.quitLevel()
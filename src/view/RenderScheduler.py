@@ -0,0 +1,59 @@
+from typing import List, Optional, Set
+from PySide6 import QtCore
+
+from src.constants import FRAME_INTERVAL
+from src.model.LogicComponent import LogicComponent
+
+
+class RenderScheduler(QtCore.QObject):
+    """Coalesces view:components_updated events of a GridWidget into at most one repaint per frame.
+
+    Every emit only marks components as dirty. When the frame timer fires, the GridWidget refreshes the
+    port labels of all components that changed since the last frame and the activity of the connections
+    of the latest wave, so animating many waves doesn't repaint the grid once per wave.
+    GridItems mark their component as dirty through their keyed subscription, so components of earlier
+    waves aren't lost when the bus delivers only the last emit of a batch.
+    """
+
+    def __init__(self, gridWidget, frameInterval: int = FRAME_INTERVAL):
+        super().__init__(gridWidget)
+        self.gridWidget = gridWidget
+        self.dirty: Set[LogicComponent] = set()
+        self.active: Optional[List[LogicComponent]] = None # the components of the latest wave
+        self.timer = QtCore.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(frameInterval)
+        self.timer.timeout.connect(self.flush)
+
+    def onComponentsUpdated(self, components: List[LogicComponent]):
+        """Event handler for the view:components_updated event. Schedules a repaint for the next frame.
+
+        Args:
+            components (List[LogicComponent]): The components that were updated in this wave
+        """
+        self.dirty.update(components)
+        self.active = components
+        self._schedule()
+
+    def markDirty(self, component: LogicComponent):
+        """Schedules a label update of a single component for the next frame"""
+        self.dirty.add(component)
+        self._schedule()
+
+    def _schedule(self):
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def flush(self):
+        """Applies all pending updates to the GridWidget immediately."""
+        self.timer.stop()
+        if not self.hasPendingUpdates():
+            return
+        dirty, active = self.dirty, self.active
+        self.dirty = set()
+        self.active = None
+        self.gridWidget.applyComponentUpdates(dirty, active)
+
+    def hasPendingUpdates(self) -> bool:
+        """Returns whether there are updates which weren't painted yet"""
+        return self.active is not None or len(self.dirty) > 0
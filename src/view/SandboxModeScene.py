@@ -47,12 +47,12 @@ class SandboxModeScene(QtWidgets.QWidget):
         sidebarFrame.addWidget(deleteArea)
 
         # Simulation controls
-        simControls = SimulationControls(self.logicController)
-        simControls.addButton("Save as logic component", self.openCreateCustomComponentDialog)
+        self.simControls = SimulationControls(self.logicController)
+        self.simControls.addButton("Save as logic component", self.openCreateCustomComponentDialog)
 
         # Add the items to the main grid layout
         layout.addLayout(sidebarFrame, 1, 0, 2, 1)
-        layout.addWidget(simControls, 0, 1)
+        layout.addWidget(self.simControls, 0, 1)
 
         # Wrap grid in scroll area
         gridScrollArea = QtWidgets.QScrollArea()
@@ -62,6 +62,7 @@ class SandboxModeScene(QtWidgets.QWidget):
         layout.addWidget(backButton, 0, 0)
 
     def goToMain(self):
+        self.simControls.stopEvaluation()
         self.logicController.clearComponents()
         self.grid.unsubscribe()
         self.bus.emit("goToMain")
@@ -1,8 +1,13 @@
+import typing
+
 from PySide6 import QtWidgets
 from PySide6.QtCore import Qt
-from PySide6.QtWidgets import QSlider, QPushButton, QLabel
+from PySide6.QtWidgets import QSlider, QPushButton, QLabel, QComboBox, QSpinBox
 
-from src.control.LogicComponentController import LogicComponentController
+from src.constants import TURBO_MAX_CYCLES
+from src.control.EvaluationWorker import EvaluationWorker
+from src.control.LogicComponentController import LogicComponentController, StopCondition
+from src.model import Output, ProgramCounter
 from src.infrastructure.eventBus import getBus
 
 # ===== AI NOTE =====
@@ -23,9 +28,34 @@ class SimulationControls(QtWidgets.QFrame):
         self.logicController = logicController
         self.eventBus = getBus()
 
+        # The evaluation runs on a worker thread, so the window stays responsive
+        self.evaluationWorker = EvaluationWorker(logicController, self)
+        self.evaluationWorker.evaluationFinished.connect(self.onEvaluationFinished)
+        self.evaluationWorker.evaluationStopped.connect(self.onEvaluationStopped)
+        self.evaluationWorker.tickApplied.connect(self.onTickApplied)
+        self.evaluationWorker.cyclesCompleted.connect(self.onCyclesCompleted)
+
         self.startStopButton: QPushButton = QPushButton("Start")
+        self.stepButton: QPushButton = QPushButton("Step")
+        self.stepButton.clicked.connect(self.stepEvaluation)
         self.resetButton: QPushButton = QPushButton("Reset")
+        self.resetButton.clicked.connect(self.stopEvaluation)
         self.speedLabel: QLabel = QLabel("Speed:", self)
+        self.tickLabel: QLabel = QLabel("Tick: 0", self)
+
+        # "Run until": runs clock cycles without showing them until the selected value is reached
+        self.runUntilButton: QPushButton = QPushButton("Run until")
+        self.runUntilButton.clicked.connect(self.runUntil)
+        self.runUntilCombo: QComboBox = QComboBox(self)
+        self.runUntilCombo.addItems(["Cycles", "PC =", "Register =", "Output ="])
+        self.runUntilCombo.currentIndexChanged.connect(self.updateRunUntilInputs)
+        self.registerSpinBox: QSpinBox = QSpinBox(self)
+        self.registerSpinBox.setRange(0, 31)
+        self.registerSpinBox.setPrefix("$")
+        self.runUntilValue: QSpinBox = QSpinBox(self)
+        self.runUntilValue.setRange(0, 2**31 - 1)
+        self.runUntilValue.setValue(100)
+        self.updateRunUntilInputs(self.runUntilCombo.currentIndex())
 
         # Configure speed slider: 1 to 10 steps per second
         self.speedSlider: QSlider = QSlider(Qt.Horizontal, self)
@@ -40,7 +70,13 @@ class SimulationControls(QtWidgets.QFrame):
         self.configureStart(self.startEvaluation)
 
         self.layout.addWidget(self.startStopButton)
+        self.layout.addWidget(self.stepButton)
         self.layout.addWidget(self.resetButton)
+        self.layout.addWidget(self.tickLabel)
+        self.layout.addWidget(self.runUntilButton)
+        self.layout.addWidget(self.runUntilCombo)
+        self.layout.addWidget(self.registerSpinBox)
+        self.layout.addWidget(self.runUntilValue)
         self.layout.addWidget(self.speedLabel)
         self.layout.addWidget(self.speedSlider)
 
@@ -62,7 +98,74 @@ class SimulationControls(QtWidgets.QFrame):
                 self.speedLabel.setText(f"Speed: {value} steps/sec")
 
     def startEvaluation(self):
-        if not self.logicController.eval():
+        """Starts the evaluation, continues a stepped evaluation or stops the evaluation if it is already running."""
+        if self.evaluationWorker.isRunning() and not self.evaluationWorker.isStepping():
+            self.stopEvaluation()
+            return
+        self.evaluationWorker.start()
+        self.startStopButton.setText("Stop")
+
+    def onTickApplied(self, tick: int):
+        """Shows the number of ticks the running evaluation has evaluated so far."""
+        self.tickLabel.setText(f"Tick: {tick}")
+
+    def onCyclesCompleted(self, cycles: int):
+        """Shows the number of clock cycles of a finished "run until"."""
+        self.tickLabel.setText(f"Cycles: {cycles}")
+
+    def updateRunUntilInputs(self, index: int):
+        """Shows the register number only if the "run until" waits for a register value."""
+        self.registerSpinBox.setVisible(self.runUntilCombo.itemText(index) == "Register =")
+
+    def stopCondition(self) -> typing.Optional[StopCondition]:
+        """Returns the condition selected for "run until", None if it only counts cycles.
+
+        Raises:
+            ValueError: If the circuit doesn't contain the component the condition refers to.
+        """
+        kind = self.runUntilCombo.currentText()
+        value = self.runUntilValue.value()
+        if kind == "Cycles":
+            return None
+        if kind == "Register =":
+            if self.logicController.registerBlock is None:
+                raise ValueError("The circuit has no register block.")
+            return StopCondition(self.logicController.registerBlock, value, self.registerSpinBox.value())
+        componentType = ProgramCounter if kind == "PC =" else Output
+        component = next((comp for comp in self.logicController.getComponents() if type(comp) == componentType), None)
+        if component is None:
+            raise ValueError(f"The circuit has no {'program counter' if componentType == ProgramCounter else 'output'}.")
+        return StopCondition(component, value)
+
+    def runUntil(self):
+        """Runs the circuit in turbo mode until the selected condition is met. The view is only updated at the end."""
+        if self.evaluationWorker.isRunning():
+            return
+        try:
+            condition = self.stopCondition()
+        except ValueError as e:
+            QtWidgets.QMessageBox.warning(self, "Run until", str(e))
+            return
+        maxCycles = self.runUntilValue.value() if condition is None else TURBO_MAX_CYCLES
+        self.evaluationWorker.runUntil(condition, maxCycles)
+        self.startStopButton.setText("Stop")
+
+    def stepEvaluation(self):
+        """Evaluates the next wave of the circuit. Starts a new evaluation if none is running."""
+        self.evaluationWorker.step()
+        self.startStopButton.setText("Start")
+
+    def stopEvaluation(self):
+        """Stops the running evaluation and waits until the worker is done, so the circuit can be changed safely."""
+        self.evaluationWorker.stop(wait=True)
+
+    def onEvaluationFinished(self, success: bool):
+        """Called when the worker completed an evaluation.
+        Args:
+            success (bool): The result of the evaluation, False if the circuit has cycles.
+        """
+        self.startStopButton.setText("Start")
+        if not success:
             # Emit components_updated with empty array so that red connection lines disappear
             self.eventBus.emit("view:components_updated", [])
 
@@ -73,8 +176,14 @@ class SimulationControls(QtWidgets.QFrame):
                 "Your logic circuit has cycles. Please resolve them and try again."
             )
 
+    def onEvaluationStopped(self):
+        """Called when the evaluation was stopped before it was done."""
+        self.startStopButton.setText("Start")
+        # Emit components_updated with empty array so that red connection lines disappear
+        self.eventBus.emit("view:components_updated", [])
+
     def configureStart(self, function):
-        """Sets the functionality of the Start button. By default, this is the eval() method of the logicController."""
+        """Sets the functionality of the Start button. By default, this starts the evaluation on the worker thread."""
         self.startStopButton.clicked.connect(function)
 
     def configureReset(self, function):
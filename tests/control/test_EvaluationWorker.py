@@ -0,0 +1,243 @@
+import pytest
+from src.control.EvaluationWorker import CircuitSnapshot, EvaluationWorker
+from src.control.LogicComponentController import LogicComponentController
+from src.infrastructure.eventBus import EventBus, getBus, setBus
+from src.model.Input import Input
+from src.model.Not import Not
+from src.model.And import And
+from src.model.Output import Output
+from src.model.Register import Register
+
+
+@pytest.fixture(autouse=True)
+def freshBus():
+    """Uses a separate bus, so components of other tests don't receive the events"""
+    previous = getBus()
+    setBus(EventBus())
+    yield
+    setBus(previous)
+
+
+def connect(lC, origin, originKey, target, targetKey):
+    assert lC.addConnection(origin, originKey, target, targetKey)
+
+
+def makeCircuit():
+    """Input -> Not -> And(Input) -> Output"""
+    lC = LogicComponentController()
+    inp = lC.addLogicComponent(Input)
+    notGate = lC.addLogicComponent(Not)
+    andGate = lC.addLogicComponent(And)
+    out = lC.addLogicComponent(Output)
+    connect(lC, inp, "outValue", notGate, "input")
+    connect(lC, notGate, "outValue", andGate, "input1")
+    connect(lC, notGate, "outValue", andGate, "input2")
+    connect(lC, andGate, "outValue", out, "input")
+    return lC, inp, notGate, andGate, out
+
+
+def test_snapshot_doesnt_touch_the_circuit():
+    """Evaluating a snapshot leaves the original components unchanged until the snapshot is adopted"""
+    lC, inp, notGate, andGate, out = makeCircuit()
+    snapshot = CircuitSnapshot(lC)
+    assert snapshot.controller.eval()
+    assert out.getState()["outValue"][0] == 0
+    assert snapshot.copies[3].getState()["outValue"][0] == 1
+    assert snapshot.copies[3].getInputs()["input"][0] is snapshot.copies[2]
+    snapshot.adopt()
+    assert out.getState()["outValue"][0] == 1
+    # the connections of the original stay as they are
+    assert out.getInputs()["input"][0] is andGate
+
+
+def test_snapshot_events_stay_private():
+    """Events of the snapshot are emitted on its own bus"""
+    lC, *_ = makeCircuit()
+    calls = []
+    getBus().subscribe("view:components_updated", calls.append)
+    snapshot = CircuitSnapshot(lC)
+    snapshot.controller.eval()
+    assert calls == []
+
+
+def test_worker_evaluates_in_background(qtbot):
+    """start() evaluates the circuit on a worker thread and updates the components afterwards"""
+    lC, inp, notGate, andGate, out = makeCircuit()
+    worker = EvaluationWorker(lC)
+    updates = []
+    getBus().subscribeFor("view:components_updated", andGate, updates.append)
+    with qtbot.waitSignal(worker.evaluationFinished, timeout=5000) as blocker:
+        worker.start()
+        assert worker.isRunning()
+    assert blocker.args == [True]
+    assert not worker.isRunning()
+    assert out.getState()["outValue"][0] == 1
+    # the view is told about every component, even if only the last wave was sent without a tick length
+    assert len(updates) > 0
+
+
+def test_worker_steps_wave_by_wave(qtbot):
+    """step() evaluates one wave at a time and sends its states to the GUI thread"""
+    lC, inp, notGate, andGate, out = makeCircuit()
+    worker = EvaluationWorker(lC)
+    updates = []
+    getBus().subscribe("view:components_updated", lambda comps: updates.append(list(comps)))
+    worker.step()
+    qtbot.waitUntil(lambda: len(updates) == 1, timeout=5000)
+    assert worker.isStepping()
+    assert updates[0] == [inp]
+    worker.step()
+    qtbot.waitUntil(lambda: len(updates) == 2, timeout=5000)
+    assert updates[1] == [notGate]
+    assert notGate.getState()["outValue"][0] == 1
+    assert out.getState()["outValue"][0] == 0
+    with qtbot.waitSignal(worker.evaluationFinished, timeout=5000):
+        worker.start() # continues without pausing
+    assert out.getState()["outValue"][0] == 1
+
+
+def test_worker_reports_ticks(qtbot):
+    """Every applied wave is reported with the number of ticks evaluated so far"""
+    lC, *_ = makeCircuit()
+    worker = EvaluationWorker(lC)
+    ticks = []
+    worker.tickApplied.connect(ticks.append)
+    worker.step()
+    qtbot.waitUntil(lambda: ticks == [1], timeout=5000)
+    worker.step()
+    qtbot.waitUntil(lambda: ticks == [1, 2], timeout=5000)
+    worker.stop(wait=True)
+
+
+def test_snapshot_has_own_topology_version():
+    """Connections changed in the GUI don't invalidate the netlist of a snapshot"""
+    lC, inp, notGate, andGate, out = makeCircuit()
+    snapshot = CircuitSnapshot(lC)
+    netlist = snapshot.controller.getNetlist()
+    lC.removeConnection(andGate, "outValue", out, "input")
+    assert snapshot.controller.getNetlist() is netlist
+    assert not snapshot.matches(lC)
+
+
+def test_worker_reuses_snapshot(qtbot):
+    """The circuit is only copied again after it was edited, otherwise the snapshot gets the current states"""
+    lC, inp, notGate, andGate, out = makeCircuit()
+    worker = EvaluationWorker(lC)
+    with qtbot.waitSignal(worker.evaluationFinished, timeout=5000):
+        worker.start()
+    snapshot = worker.snapshot
+    inp.setState((1, 1))
+    with qtbot.waitSignal(worker.evaluationFinished, timeout=5000):
+        worker.start()
+    assert worker.snapshot is snapshot
+    assert out.getState()["outValue"][0] == 0
+    lC.removeConnection(andGate, "outValue", out, "input")
+    with qtbot.waitSignal(worker.evaluationFinished, timeout=5000):
+        worker.start()
+    assert worker.snapshot is not snapshot
+
+
+def test_snapshot_keeps_propagation_delays():
+    """Delays per component are mapped to the copies, delays per type are kept"""
+    lC, inp, notGate, andGate, out = makeCircuit()
+    lC.propagationDelays = {Not: 2, andGate: 3}
+    snapshot = CircuitSnapshot(lC)
+    assert snapshot.controller.propagationDelays == {Not: 2, snapshot.copies[2]: 3}
+    snapshot.copies[0].setState((1, 1))
+    assert snapshot.controller.eval()
+    assert snapshot.copies[2].getState()["outValue"][0] == 0
+
+
+def test_worker_can_be_stopped(qtbot):
+    """stop() aborts a stepped evaluation, the remaining components keep their state"""
+    lC, inp, notGate, andGate, out = makeCircuit()
+    worker = EvaluationWorker(lC)
+    worker.step()
+    with qtbot.waitSignal(worker.evaluationStopped, timeout=5000):
+        worker.stop()
+    assert not worker.isRunning()
+    assert out.getState()["outValue"][0] == 0
+
+
+def test_stop_and_wait(qtbot):
+    """stop(wait=True) returns when the worker thread is done"""
+    lC, *_ = makeCircuit()
+    lC.setTickLength(10)
+    worker = EvaluationWorker(lC)
+    worker.start()
+    worker.stop(wait=True)
+    assert not worker.isRunning()
+
+
+def test_inputs_are_not_overwritten(qtbot):
+    """Inputs changed while the worker runs keep their new value"""
+    lC, inp, *_ = makeCircuit()
+    worker = EvaluationWorker(lC)
+    worker.step()
+    inp.setState((1, 1))
+    with qtbot.waitSignal(worker.evaluationFinished, timeout=5000):
+        worker.start()
+    assert inp.getState()["outValue"] == (1, 1)
+
+
+def test_registers_are_adopted(qtbot):
+    """The register values of the snapshot are taken over when the evaluation is done"""
+    lC = LogicComponentController()
+    data = lC.addLogicComponent(Input)
+    clk = lC.addLogicComponent(Input)
+    register = lC.addLogicComponent(Register)
+    data.setState((0, 32))
+    connect(lC, data, "outValue", register, "input")
+    connect(lC, clk, "outValue", register, "clk")
+    data.setState((7, 32))
+    clk.setState((1, 1))
+    worker = EvaluationWorker(lC)
+    with qtbot.waitSignal(worker.evaluationFinished, timeout=5000):
+        worker.start()
+    assert register.getState()["outValue"][0] == 7
+
+
+def test_memories_are_adopted_in_place():
+    """Only the state is taken over, the memory of a DataMemory stays the same object"""
+    from src.model.DataMemory import DataMemory
+    from src.model.RegisterBlock import RegisterBlock
+    lC = LogicComponentController()
+    memory = lC.addLogicComponent(DataMemory)
+    registerBlock = lC.addLogicComponent(RegisterBlock)
+    dataList = memory.dataList
+    snapshot = CircuitSnapshot(lC)
+    snapshot.copies[0].dataList.write(5, 42)
+    snapshot.copies[1].registers[3] = 9
+    snapshot.adopt()
+    assert memory.dataList is dataList
+    assert memory.dataList.read(5) == 42
+    assert registerBlock.registers[3] == 9
+    # the original doesn't share the lists of the snapshot
+    snapshot.copies[1].registers[3] = 1
+    assert registerBlock.registers[3] == 9
+
+
+def test_worker_runs_until_condition(qtbot):
+    """runUntil() runs clock cycles on the snapshot and takes over the state once it is done"""
+    from src.control.LogicComponentController import StopCondition
+    from src.model.Adder32bit import Adder32bit
+    lC = LogicComponentController()
+    reg = lC.addLogicComponent(Register)
+    adder = lC.addLogicComponent(Adder32bit)
+    one = lC.addLogicComponent(Input)
+    clk = lC.addLogicComponent(Input)
+    one.setState((1, 32))
+    clk.setState((1, 1))
+    connect(lC, reg, "outValue", adder, "inputA")
+    connect(lC, one, "outValue", adder, "inputB")
+    connect(lC, adder, "outSum", reg, "input")
+    connect(lC, clk, "outValue", reg, "clk")
+    worker = EvaluationWorker(lC)
+    cycles = []
+    worker.cyclesCompleted.connect(cycles.append)
+    with qtbot.waitSignal(worker.evaluationFinished, timeout=5000) as blocker:
+        worker.runUntil(StopCondition(reg, 12))
+    assert blocker.args == [True]
+    assert cycles == [12]
+    assert reg.getState()["outValue"] == (12, 32)
+    assert adder.getState()["outSum"] == (13, 32)
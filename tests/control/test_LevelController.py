@@ -262,6 +262,43 @@ def test_checkSolution_incorrect(level_controller, logic_controller):
     assert result == False
 
 
+def test_checkSolution_does_not_touch_states(level_controller, logic_controller):
+    """Test that the batched checkSolution leaves the input states as they were"""
+    level_controller.buildLevel()
+    and_gate = logic_controller.addLogicComponent(And)
+    inputs = logic_controller.getInputs()
+    outputs = logic_controller.getOutputs()
+    logic_controller.addConnection(inputs[0], "outValue", and_gate, "input1")
+    logic_controller.addConnection(inputs[1], "outValue", and_gate, "input2")
+    logic_controller.addConnection(and_gate, "outValue", outputs[0], "input")
+    inputs[0].setState((1, 1))
+
+    assert level_controller.checkSolution() == True
+    assert inputs[0].getState()["outValue"] == (1, 1)
+    assert inputs[1].getState()["outValue"] == (0, 1)
+
+
+def test_runTests_stops_evaluation_worker(level_controller, logic_controller):
+    """The tests evaluated with eval() stop a running background evaluation first"""
+    class Worker:
+        def __init__(self):
+            self.stopped = []
+
+        def stop(self, wait=False):
+            self.stopped.append(wait)
+
+    worker = Worker()
+    level_controller.setEvaluationWorker(worker)
+    level_controller.buildLevel()
+    inputs = logic_controller.getInputs()
+    # a feedback loop can't be evaluated in batches
+    or_gate = logic_controller.addLogicComponent(Or)
+    logic_controller.addConnection(inputs[0], "outValue", or_gate, "input1")
+    logic_controller.addConnection(or_gate, "outValue", or_gate, "input2")
+    level_controller.checkSolution()
+    assert worker.stopped == [True]
+
+
 def test_buildLevel_multiple_times(level_controller, logic_controller):
     """Test building level multiple times doesn't duplicate components"""
     # Build level
@@ -868,3 +905,25 @@ def test_adding_Register_initialValue(level_controller_with_memoryBlocks, logic_
     assert len(registers) == 2  # Two Register components should be defined in the level data provided
     assert registers[0].state == {"outValue": (34, 32)}
     assert registers[1].state == {"outValue": (42, 32)}
+
+def test_memory_images_are_relative_to_the_level_file(sample_level_data_with_memoryBlocks, logic_controller,
+                                                      tmp_path, monkeypatch):
+    """Paths in memoryContents are resolved against the directory of the level file, not the working directory"""
+    levels = tmp_path / "levels"
+    (levels / "images").mkdir(parents=True)
+    (levels / "images" / "program.hex").write_text("00430820 8CA4FFFC\n")
+    (levels / "images" / "data.hex").write_text("7 8 9\n")
+    monkeypatch.chdir(tmp_path)
+    sample_level_data_with_memoryBlocks["memoryContents"] = {
+        "instructionMemory": "images/program.hex",
+        "dataMemory": "images/data.hex",
+    }
+    controller = LevelController(logic_controller)
+    controller.setLevel(sample_level_data_with_memoryBlocks, str(levels))
+    controller.buildLevel()
+
+    components = logic_controller.getComponents()
+    instruction_memory = next(comp for comp in components if type(comp) == InstructionMemory)
+    data_memory = next(comp for comp in components if type(comp) == DataMemory)
+    assert list(instruction_memory.instructionList) == [0x00430820, 0x8CA4FFFC]
+    assert data_memory.dataList[:3] == [7, 8, 9]
@@ -0,0 +1,128 @@
+import json
+import pytest
+from src.control.LevelRunner import LevelRunner, buildLevel, validateCustomComponent, main
+from src.infrastructure.eventBus import getBus
+
+
+ANDLEVEL = {
+    "level_id": 1,
+    "components": [
+        {"type": "Input", "position": [0, 0], "immovable": True},
+        {"type": "Input", "position": [0, 2], "immovable": True},
+        {"type": "Output", "position": [4, 1], "immovable": True},
+    ],
+    "tests": [
+        {"inputs": [[a, 1], [b, 1]], "expected_output": [[a & b, 1]]} for a in (0, 1) for b in (0, 1)
+    ],
+}
+
+ANDSOLUTION = {
+    "components": [{"type": "And"}],
+    "connections": [
+        {"origin": 0, "originKey": "outValue", "destination": 3, "destinationKey": "input1"},
+        {"origin": 1, "originKey": "outValue", "destination": 3, "destinationKey": "input2"},
+        {"origin": 3, "originKey": "outValue", "destination": 2, "destinationKey": "input"},
+    ],
+}
+
+
+@pytest.fixture
+def levelDirs(tmp_path):
+    """A level directory with an And level (1) and a Register level (2), and a solution for level 1"""
+    levels = tmp_path / "levels"
+    solutions = tmp_path / "solutions"
+    levels.mkdir()
+    solutions.mkdir()
+    (levels / "level_1.json").write_text(json.dumps(ANDLEVEL))
+    registerLevel = {
+        "level_id": 2,
+        "components": [{"type": "Register", "position": [0, 0], "immovable": True, "initialValue": 0}],
+        "tests": [{"inputs": [], "expected_output": []}],
+    }
+    (levels / "level_2.json").write_text(json.dumps(registerLevel))
+    (levels / "level_blocks.json").write_text("{}")
+    (solutions / "level_1.json").write_text(json.dumps(ANDSOLUTION))
+    return str(levels), str(solutions)
+
+
+def test_levelNumbers(levelDirs):
+    """Only level_<n>.json files are levels"""
+    assert LevelRunner(levelDirs[0]).levelNumbers() == [1, 2]
+
+
+def test_shards(levelDirs):
+    """Combinational levels are split into shards, sequential levels are not"""
+    runner = LevelRunner(levelDirs[0], testsPerShard=3)
+    assert runner.shards(1) == [(0, 3), (3, 4)]
+    assert runner.shards(2) == [(0, 1)]
+
+
+def test_buildLevel_with_solution():
+    """The components of the solution are added after the level components"""
+    levelController = buildLevel(ANDLEVEL, ANDSOLUTION)
+    assert len(levelController.logicComponentController.getComponents()) == 4
+    assert levelController.runTests(ANDLEVEL["tests"]) == [True] * 4
+
+
+def test_runLevels_inline(levelDirs):
+    """With one worker everything runs in this process, the bus of the caller is restored"""
+    bus = getBus()
+    results = LevelRunner(*levelDirs, maxWorkers=1, testsPerShard=3).runLevels()
+    assert getBus() is bus
+    assert [r.levelId for r in results] == [1, 2]
+    assert results[0].passed and results[0].hasSolution
+    assert results[0].results == [True] * 4
+    assert not results[1].hasSolution
+
+
+def test_runLevels_in_processes(levelDirs):
+    """Shards are run in worker processes and merged in order"""
+    results = LevelRunner(*levelDirs, maxWorkers=2, testsPerShard=1).runLevels([1])
+    assert results[0].results == [True] * 4
+    # without the solution the tests fail, but the level is still run
+    results = LevelRunner(levelDirs[0], maxWorkers=2, testsPerShard=1).runLevels([1])
+    assert results[0].results == [False] * 4 and results[0].error is None
+
+
+def test_runLevels_reports_errors(levelDirs, tmp_path):
+    """Broken solutions and missing levels are reported as errors"""
+    broken = dict(ANDSOLUTION, components=[{"type": "NoSuchGate"}])
+    (tmp_path / "solutions" / "level_1.json").write_text(json.dumps(broken))
+    results = LevelRunner(*levelDirs, maxWorkers=1).runLevels([1, 5])
+    assert "NoSuchGate" in results[0].error
+    assert "FileNotFoundError" in results[1].error
+
+
+def test_validateCustomComponent(tmp_path):
+    """A custom component is valid if it can be evaluated for all inputs"""
+    data = {
+        "name": "MyAnd",
+        "inputMap": {"A": 1, "B": 1},
+        "outputMap": {"Y": 1},
+        "components": ["Input", "Input", "And", "Output"],
+        "connections": [
+            {"origin": 0, "originKey": "outValue", "destination": 2, "destinationKey": "input1"},
+            {"origin": 1, "originKey": "outValue", "destination": 2, "destinationKey": "input2"},
+            {"origin": 2, "originKey": "outValue", "destination": 3, "destinationKey": "input"},
+        ],
+    }
+    (tmp_path / "MyAnd").mkdir()
+    (tmp_path / "MyAnd" / "MyAnd.json").write_text(json.dumps(data))
+    assert validateCustomComponent(str(tmp_path / "MyAnd" / "MyAnd.json")).valid
+
+    data["name"] = "Broken"
+    data["outputMap"] = {"Y": 1, "Z": 1}
+    (tmp_path / "Broken").mkdir()
+    (tmp_path / "Broken" / "Broken.json").write_text(json.dumps(data))
+    results = LevelRunner(maxWorkers=2).validateCustomComponents(tmp_path)
+    assert [(r.name, r.valid) for r in results] == [("Broken", False), ("MyAnd", True)]
+
+
+def test_validateCustomComponents_missing_directory(tmp_path):
+    assert LevelRunner().validateCustomComponents(tmp_path / "missing") == []
+
+
+def test_main(levelDirs, capsys):
+    """The command line returns 0 if all levels with solutions pass"""
+    assert main(["--levels", levelDirs[0], "--solutions", levelDirs[1], "--workers", "1"]) == 0
+    assert "level 1: 4/4 tests passed" in capsys.readouterr().out
@@ -279,4 +279,163 @@ def test_cleanup(lC):
     lC.clearComponents()
     
     assert len(lC.getComponents()) == 0
-    assert len(lC.getInputs()) == 0
\ No newline at end of file
+    assert len(lC.getInputs()) == 0
+
+def test_graphOrder_is_patched_by_connections(lC):
+    in1 = lC.addLogicComponent(Input)
+    not1 = lC.addLogicComponent(Not)
+    out1 = lC.addLogicComponent(Output)
+    lC.addConnection(in1, "outValue", not1, "input")
+    order = lC.getGraphOrder()
+
+    assert lC.addConnection(not1, "outValue", out1, "input")
+    assert lC.getGraphOrder() is order
+    assert order.getTicks() == [[in1], [not1], [out1]]
+    assert lC.eval() == True
+    assert out1.getState()["outValue"] == (1, 1)
+
+    lC.removeConnection(not1, "outValue", out1, "input")
+    assert lC.getGraphOrder() is order
+    assert order.fanout[not1] == []
+
+
+def test_eval_reports_oscillating_loop(lC):
+    """A failed evaluation reports the feedback loop that never settled"""
+    from src.model.Xor import Xor
+    in1 = lC.addLogicComponent(Input)
+    xor1 = lC.addLogicComponent(Xor)
+    out1 = lC.addLogicComponent(Output)
+    in2 = lC.addLogicComponent(Input)
+    nor1 = lC.addLogicComponent(Nor)
+    nor2 = lC.addLogicComponent(Nor)
+    lC.addConnection(in1, "outValue", xor1, "input1")
+    lC.addConnection(xor1, "outValue", xor1, "input2")
+    lC.addConnection(xor1, "outValue", out1, "input")
+    # a stable SR latch is a loop as well, but it isn't reported
+    lC.addConnection(in2, "outValue", nor1, "input1")
+    lC.addConnection(nor1, "outValue", nor2, "input1")
+    lC.addConnection(nor2, "outValue", nor1, "input2")
+    in1.setState((1, 1))
+    assert lC.eval() == False
+    assert lC.unstableLoops == [[xor1]]
+
+    lC.removeConnection(xor1, "outValue", xor1, "input2")
+    assert lC.eval() == True
+    assert lC.unstableLoops == []
+
+
+def test_eval_with_latch_only_iterates_the_latch(lC, monkeypatch):
+    """A latch doesn't make the controller evaluate the whole circuit event driven"""
+    from src.Algorithms import Algorithms
+    set1 = lC.addLogicComponent(Input)
+    reset1 = lC.addLogicComponent(Input)
+    nor1 = lC.addLogicComponent(Nor)
+    nor2 = lC.addLogicComponent(Nor)
+    and1 = lC.addLogicComponent(And)
+    out1 = lC.addLogicComponent(Output)
+    lC.addConnection(reset1, "outValue", nor1, "input1")
+    lC.addConnection(set1, "outValue", nor2, "input2")
+    lC.addConnection(nor1, "outValue", nor2, "input1")
+    lC.addConnection(nor2, "outValue", nor1, "input2")
+    lC.addConnection(nor1, "outValue", and1, "input1")
+    lC.addConnection(set1, "outValue", and1, "input2")
+    lC.addConnection(and1, "outValue", out1, "input")
+    sccEval = Algorithms.sccEval
+    calls = []
+    monkeypatch.setattr(Algorithms, "sccEval", lambda *args, **kw: calls.append(args) or sccEval(*args, **kw))
+    set1.setState((1, 1))
+    assert lC.eval() == True
+    assert len(calls) == 1
+    assert out1.getState()["outValue"] == (1, 1)
+
+
+def test_runCycles_counts_with_constant_stack(lC):
+    """The program counter loop runs far more cycles than the recursion limit, without emitting newCycle"""
+    from src.model.ProgramCounter import ProgramCounter
+    from src.model.Adder32bit import Adder32bit
+    pc = lC.addLogicComponent(ProgramCounter)
+    adder = lC.addLogicComponent(Adder32bit)
+    four = lC.addLogicComponent(Input)
+    four.setState((4, 32))
+    lC.addConnection(pc, "outValue", adder, "inputA")
+    lC.addConnection(four, "outValue", adder, "inputB")
+    lC.addConnection(adder, "outSum", pc, "input")
+    pc.maxValue = 1 << 30
+    start = pc.getState()["outValue"][0] # connecting the adder already evaluated the loop
+    cycles = []
+    lC.bus.subscribe("newCycle", lambda: cycles.append(1))
+
+    assert lC.runCycles(5000) == 5000
+    assert pc.getState()["outValue"] == (start + 20000, 32)
+    assert adder.getState()["outSum"] == (start + 20004, 32)
+    assert cycles == []
+
+    # the program ends when the counter passes the last instruction
+    pc.maxValue = start + 20040
+    assert lC.runCycles(100) == 10
+    assert pc.getState()["outValue"] == (0, 32)
+
+
+def test_runCycles_commits_registers_once_per_cycle(lC):
+    from src.model.Adder32bit import Adder32bit
+    reg = lC.addLogicComponent(Register)
+    adder = lC.addLogicComponent(Adder32bit)
+    one = lC.addLogicComponent(Input)
+    clk = lC.addLogicComponent(Input)
+    one.setState((1, 32))
+    clk.setState((1, 1))
+    lC.addConnection(reg, "outValue", adder, "inputA")
+    lC.addConnection(one, "outValue", adder, "inputB")
+    lC.addConnection(adder, "outSum", reg, "input")
+    lC.addConnection(clk, "outValue", reg, "clk")
+
+    assert lC.runCycles(50) == 50
+    assert reg.getState()["outValue"] == (50, 32)
+    assert adder.getState()["outSum"] == (51, 32)
+
+
+def test_clocked_elements_are_indexed(lC):
+    from src.model.Adder32bit import Adder32bit
+    reg = lC.addLogicComponent(Register)
+    adder = lC.addLogicComponent(Adder32bit)
+    out = lC.addLogicComponent(Output)
+    reg2 = lC.addLogicComponent(Register)
+    assert lC.clockedElements == [reg, reg2]
+    assert lC.clockedFanout() == {reg: [], reg2: []}
+
+    assert lC.addConnection(reg, "outValue", adder, "inputA")
+    assert lC.addConnection(reg, "outValue", adder, "inputB")
+    assert lC.addConnection(reg, "outValue", out, "input")
+    assert lC.clockedFanout()[reg] == [adder, out]
+
+    lC.removeLogicComponent(reg)
+    assert lC.clockedElements == [reg2]
+    assert lC.clockedFanout() == {reg2: []}
+    lC.clearComponents()
+    assert lC.clockedElements == []
+
+
+def test_runUntil_stops_when_the_condition_is_met(lC):
+    from src.control.LogicComponentController import StopCondition
+    from src.model.Adder32bit import Adder32bit
+    reg = lC.addLogicComponent(Register)
+    adder = lC.addLogicComponent(Adder32bit)
+    one = lC.addLogicComponent(Input)
+    clk = lC.addLogicComponent(Input)
+    out = lC.addLogicComponent(Output)
+    one.setState((1, 32))
+    clk.setState((1, 1))
+    lC.addConnection(reg, "outValue", adder, "inputA")
+    lC.addConnection(one, "outValue", adder, "inputB")
+    lC.addConnection(adder, "outSum", reg, "input")
+    lC.addConnection(clk, "outValue", reg, "clk")
+    lC.addConnection(reg, "outValue", out, "input")
+    updates = []
+    lC.bus.subscribe("view:components_updated", updates.append)
+
+    assert lC.runUntil(StopCondition(out, 30)) == 30
+    assert out.getState()["outValue"] == (30, 32)
+    assert len(updates) == 1 # the view is only updated at the end
+    # without a condition only the cycles are counted
+    assert lC.runUntil(None, 5) == 5
+    assert reg.getState()["outValue"] == (35, 32)
@@ -0,0 +1,148 @@
+import pytest
+from src.engine.Netlist import Netlist
+from src.engine.BatchEvaluator import BatchEvaluator, packLanes, unpackLanes
+from src.control.LogicComponentController import LogicComponentController
+from src.model.Input import Input
+from src.model.Output import Output
+from src.model.FullAdder import FullAdder
+from src.model.And import And
+from src.model.Register import Register
+from src.model.DLatch import DLatch
+from src.model.Multiplexer2Input import Multiplexer2Inp
+
+
+def connect(origin, originKey, target, targetKey):
+    """Same order as LogicComponentController.addConnection"""
+    target.addInput(origin, originKey, targetKey)
+    origin.addOutput(target, targetKey)
+
+
+def test_pack_and_unpack_lanes():
+    assert packLanes([1, 0, 1, 1]) == 0b1101
+    assert packLanes([1, 2, 0]) == [1, 2, 0]
+    assert unpackLanes(0b1101, 4) == [1, 0, 1, 1]
+
+
+def test_full_adder_truth_table():
+    """All 8 vectors are evaluated as lane masks and match the truth table"""
+    a, b, cin = Input(), Input(), Input()
+    adder = FullAdder()
+    sumOut, carryOut = Output(), Output()
+    connect(a, "outValue", adder, "inputA")
+    connect(b, "outValue", adder, "inputB")
+    connect(cin, "outValue", adder, "inputCin")
+    connect(adder, "outSum", sumOut, "input")
+    connect(adder, "cOut", carryOut, "input")
+    evaluator = BatchEvaluator(Netlist([a, b, cin, adder, sumOut, carryOut]))
+    assert evaluator.supported
+    stateBefore = sumOut.getState().copy()
+
+    vectors = [(i & 1, (i >> 1) & 1, (i >> 2) & 1) for i in range(8)]
+    stimuli = {a: [v[0] for v in vectors], b: [v[1] for v in vectors], cin: [v[2] for v in vectors]}
+    results = evaluator.evaluate(stimuli, [(sumOut, "outValue"), (carryOut, "outValue")], 8)
+    assert results == [[sum(v) % 2, sum(v) // 2] for v in vectors]
+    # the component states are not touched
+    assert sumOut.getState() == stateBefore
+
+
+def test_multi_bit_values_are_evaluated_per_lane():
+    in1, in2, select = Input(), Input(), Input()
+    in1.setState((0, 8))
+    in2.setState((0, 8))
+    mux = Multiplexer2Inp()
+    out1 = Output()
+    connect(select, "outValue", mux, "selection")
+    connect(in1, "outValue", mux, "input1")
+    connect(in2, "outValue", mux, "input2")
+    mux.eval() # the output takes the bitwidth of the multiplexer when it is connected
+    connect(mux, "outputValue", out1, "input")
+    evaluator = BatchEvaluator(Netlist([in1, in2, select, mux, out1]))
+    tests = [
+        {"inputs": [[5, 8], [7, 8], [0, 1]], "expected_output": [[5, 8]]},
+        {"inputs": [[5, 8], [7, 8], [1, 1]], "expected_output": [[7, 8]]},
+        {"inputs": [[5, 8], [7, 8], [1, 1]], "expected_output": [[5, 8]]},
+    ]
+    assert evaluator.runTests([in1, in2, select], [out1], tests) == [True, True, False]
+    # the widths were fixed when the netlist was compiled, other widths are left to eval()
+    tests[0]["inputs"][0] = [5, 16]
+    assert evaluator.runTests([in1, in2, select], [out1], tests) is None
+
+
+def test_registers_latch_in_order():
+    """Vectors after a register write see the new value, like sequential eval() calls"""
+    lC = LogicComponentController()
+    data = lC.addLogicComponent(Input)
+    data.setState((0, 32))
+    clk = lC.addLogicComponent(Input)
+    reg = lC.addLogicComponent(Register)
+    out1 = lC.addLogicComponent(Output)
+    lC.addConnection(data, "outValue", reg, "input")
+    lC.addConnection(clk, "outValue", reg, "clk")
+    lC.addConnection(reg, "outValue", out1, "input")
+    reg.state = {"outValue": (42, 32)}
+
+    vectors = [(7, 0), (7, 1), (9, 0), (9, 1), (3, 1), (1, 0)]
+    tests = [{"inputs": [[d, 32], [c, 1]], "expected_output": []} for d, c in vectors]
+    results = BatchEvaluator(lC.getNetlist()).evaluate(
+        {data: [d for d, _ in vectors], clk: [c for _, c in vectors]}, [(out1, "outValue")], len(tests)
+    )
+    assert [row[0] for row in results] == [42, 7, 7, 9, 3, 3]
+    assert reg.getState()["outValue"] == (42, 32)
+
+    # the same sequence through eval()
+    expected = []
+    for d, c in vectors:
+        data.setState((d, 32))
+        clk.setState((c, 1))
+        lC.eval()
+        expected.append(out1.getState()["outValue"][0])
+    assert expected == [row[0] for row in results]
+
+
+def counterCircuit():
+    """Register -> Adder32bit(+1) -> Register, the register counts while its clock is 1"""
+    from src.model.Adder32bit import Adder32bit
+    lC = LogicComponentController()
+    reg = lC.addLogicComponent(Register)
+    adder = lC.addLogicComponent(Adder32bit)
+    one = lC.addLogicComponent(Input)
+    clk = lC.addLogicComponent(Input)
+    out1 = lC.addLogicComponent(Output)
+    one.setState((1, 32))
+    lC.addConnection(reg, "outValue", adder, "inputA")
+    lC.addConnection(one, "outValue", adder, "inputB")
+    lC.addConnection(adder, "outSum", reg, "input")
+    lC.addConnection(clk, "outValue", reg, "clk")
+    lC.addConnection(reg, "outValue", out1, "input")
+    return lC, reg, clk, out1
+
+
+@pytest.mark.parametrize("clocks", [[1, 0, 0, 1, 0, 0], [1, 1, 0, 1, 1, 1, 0], [0, 1, 0, 0, 0, 1]])
+def test_register_feedback_matches_eval(clocks):
+    """The fanout of a register is evaluated again after it latched, a register in a loop with a clock of 1
+    gets a new pending value which it latches in the next vector"""
+    lC, reg, clk, out1 = counterCircuit()
+    results = BatchEvaluator(lC.getNetlist()).evaluate({clk: clocks}, [(out1, "outValue")], len(clocks))
+    expected = []
+    for c in clocks:
+        clk.setState((c, 1))
+        lC.eval()
+        expected.append(out1.getState()["outValue"][0])
+    assert [row[0] for row in results] == expected
+    if clocks == [1, 0, 0, 1, 0, 0]:
+        assert expected == [1, 2, 2, 3, 4, 4]
+
+
+def test_unsupported_netlists():
+    """Components without a kernel can't be batched"""
+    in1 = Input()
+    latch = DLatch()
+    connect(in1, "outValue", latch, "inputD")
+    evaluator = BatchEvaluator(Netlist([in1, latch]))
+    assert not evaluator.supported
+    assert evaluator.runTests([in1], [], [{"inputs": [[1, 1]], "expected_output": []}]) is None
+
+    a, b = And(), And()
+    connect(a, "outValue", b, "input1")
+    connect(b, "outValue", a, "input1")
+    assert BatchEvaluator(Netlist([a, b])).supported == False
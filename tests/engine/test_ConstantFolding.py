@@ -0,0 +1,117 @@
+import pytest
+from src.engine.Netlist import Netlist
+from src.engine.ConstantFolding import foldConstants
+from src.control.LogicComponentController import LogicComponentController
+from src.infrastructure.eventBus import EventBus
+from src.model.Input import Input
+from src.model.And import And
+from src.model.Or import Or
+from src.model.Not import Not
+from src.model.Output import Output
+from src.model.Register import Register
+from src.model.Multiplexer2Input import Multiplexer2Inp
+
+
+def connect(origin, originKey, target, targetKey):
+    origin.addOutput(target, targetKey)
+    target.addInput(origin, originKey, targetKey)
+
+
+def test_unconnected_inputs_are_folded():
+    """An And with an unconnected input is always 0, the Not behind it always 1"""
+    in1, and1, not1, out1 = Input(), And(), Not(), Output()
+    connect(in1, "outValue", and1, "input1")
+    connect(and1, "outValue", not1, "input")
+    connect(not1, "outValue", out1, "input")
+    netlist = Netlist([in1, and1, not1, out1])
+    result = foldConstants(netlist)
+    assert [node.component for node in result.folded] == [and1, not1, out1]
+    assert out1.getState()["outValue"] == (1, 1)
+    # only the Input is left in the optimized schedule
+    assert sum(len(level) for level in netlist.schedule) == 1
+    in1.setState((1, 1))
+    assert netlist.run()
+    assert out1.getState()["outValue"] == (1, 1)
+
+
+def test_fixed_inputs_are_constants():
+    """Fixed Inputs are folded, if their value changes anyway the original levels are evaluated"""
+    fixed, free, or1, out1 = Input(), Input(), Or(), Output()
+    fixed.setState((1, 1))
+    connect(fixed, "outValue", or1, "input1")
+    connect(free, "outValue", or1, "input2")
+    connect(or1, "outValue", out1, "input")
+    netlist = Netlist([fixed, free, or1, out1])
+    result = foldConstants(netlist, [fixed])
+    assert [node.component for node in result.folded] == [or1, out1]
+    assert netlist.run()
+    assert out1.getState()["outValue"] == (1, 1)
+
+    fixed.setState((0, 1))
+    assert netlist.run()
+    assert out1.getState()["outValue"] == (0, 1)
+    fixed.setState((1, 1))
+    assert netlist.run()
+    assert out1.getState()["outValue"] == (1, 1)
+    # the constants were restored, so the optimized schedule is used again
+    assert netlist.run()
+    assert out1.getState()["outValue"] == (1, 1)
+
+
+def test_multiplexer_with_constant_selection():
+    """A multiplexer whose selection is constant only copies the selected input"""
+    sel, a, b, mux, out1 = Input(), Input(), Input(), Multiplexer2Inp(), Output()
+    sel.setState((1, 1))
+    connect(sel, "outValue", mux, "selection")
+    connect(a, "outValue", mux, "input1")
+    connect(b, "outValue", mux, "input2")
+    connect(mux, "outputValue", out1, "input")
+    netlist = Netlist([sel, a, b, mux, out1])
+    result = foldConstants(netlist, [sel])
+    assert [node.component for node in result.selected] == [mux]
+    assert result.folded == []
+    b.setState((1, 1))
+    assert netlist.run()
+    assert out1.getState()["outValue"][0] == 1
+    a.setState((1, 1))
+    b.setState((0, 1))
+    assert netlist.run()
+    assert out1.getState()["outValue"][0] == 0
+
+
+def test_dead_logic_is_skipped():
+    """Gates without a path to an Output or a stateful component are only skipped when asked for"""
+    in1, in2 = Input(), Input()
+    live, dead, deadNot, reg, out1 = And(), Or(), Not(), Register(), Output()
+    connect(in1, "outValue", live, "input1")
+    connect(in2, "outValue", live, "input2")
+    connect(live, "outValue", out1, "input")
+    connect(in1, "outValue", dead, "input1")
+    connect(in2, "outValue", dead, "input2")
+    connect(dead, "outValue", deadNot, "input")
+    components = [in1, in2, live, dead, deadNot, reg, out1]
+
+    assert foldConstants(Netlist(components)).dead == []
+    netlist = Netlist(components)
+    result = foldConstants(netlist, eliminateDeadLogic=True)
+    assert {node.component for node in result.dead} == {dead, deadNot}
+    in1.setState((1, 1))
+    in2.setState((1, 1))
+    assert netlist.run()
+    assert out1.getState()["outValue"] == (1, 1)
+    assert dead.getState()["outValue"] == (0, 1)
+    # animated runs still evaluate everything
+    assert netlist.run(waves=True)
+    assert dead.getState()["outValue"] == (1, 1)
+
+
+def test_controller_folds_fixed_inputs():
+    lC = LogicComponentController(EventBus())
+    fixed = lC.addLogicComponent(Input)
+    not1 = lC.addLogicComponent(Not)
+    lC.addConnection(fixed, "outValue", not1, "input")
+    lC.setFixedInput(fixed)
+    assert lC.fixedInputs == [fixed]
+    assert lC.getNetlist().skipped == {lC.getNetlist().nodeOf[not1]}
+    lC.removeLogicComponent(fixed)
+    assert lC.fixedInputs == []
@@ -0,0 +1,134 @@
+import sys
+import pytest
+from src.engine.Netlist import Netlist
+from src.engine.EquivalenceChecker import EquivalenceChecker, CircuitPorts
+from src.model.Input import Input
+from src.model.Output import Output
+from src.model.And import And
+from src.model.Or import Or
+from src.model.Xor import Xor
+from src.model.Nand import Nand
+from src.model.ALUSimple import ALUSimple
+from src.model.ALUAdvanced import ALUAdvanced
+from src.model.Adder32bit import Adder32bit
+from src.model.Register import Register
+
+
+def connect(origin, originKey, target, targetKey):
+    """Same order as LogicComponentController.addConnection"""
+    target.addInput(origin, originKey, targetKey)
+    origin.addOutput(target, targetKey)
+
+
+def gateCircuit(gateClass):
+    """a, b -> gate -> out"""
+    a, b = Input(), Input()
+    gate, out = gateClass(), Output()
+    connect(a, "outValue", gate, "input1")
+    connect(b, "outValue", gate, "input2")
+    connect(gate, "outValue", out, "input")
+    return CircuitPorts(Netlist([a, b, gate, out]), [a, b], [out])
+
+
+def xorFromGates():
+    """(a or b) and (a nand b)"""
+    a, b = Input(), Input()
+    or1, nand1, and1, out = Or(), Nand(), And(), Output()
+    connect(a, "outValue", or1, "input1")
+    connect(b, "outValue", or1, "input2")
+    connect(a, "outValue", nand1, "input1")
+    connect(b, "outValue", nand1, "input2")
+    connect(or1, "outValue", and1, "input1")
+    connect(nand1, "outValue", and1, "input2")
+    connect(and1, "outValue", out, "input")
+    return CircuitPorts(Netlist([a, b, or1, nand1, and1, out]), [a, b], [out])
+
+
+def aluCircuit(aluClass, **constants):
+    """32-bit inputs a and b, all other ALU inputs are constant Inputs"""
+    a, b = Input(), Input()
+    a.setState((0, 32))
+    b.setState((0, 32))
+    alu, out = aluClass(), Output()
+    components = [a, b, alu, out]
+    connect(a, "outValue", alu, "input1")
+    connect(b, "outValue", alu, "input2")
+    for key, value in constants.items():
+        constant = Input()
+        constant.setState((value, alu.inputBitwidths[key]))
+        connect(constant, "outValue", alu, key)
+        components.append(constant)
+    connect(alu, "outValue", out, "input")
+    return CircuitPorts(Netlist(components), [a, b], [out])
+
+
+def test_exhaustive_equivalent():
+    result = EquivalenceChecker(xorFromGates(), gateCircuit(Xor)).check()
+    assert result.equivalent and result.proven
+    assert result.method == "exhaustive"
+
+
+def test_exhaustive_counterexample():
+    result = EquivalenceChecker(xorFromGates(), gateCircuit(Or)).check()
+    assert not result.equivalent
+    assert result.counterexample == [1, 1]
+    assert result.values == [0] and result.expected == [1]
+
+
+def test_bdd_proves_32_bit_alus_equivalent():
+    """a - b with ALUSimple (invert b, carry in) and with ALUAdvanced (negate b)"""
+    simple = aluCircuit(ALUSimple, OP=2, Binvert=1, CarryIn=1)
+    advanced = aluCircuit(ALUAdvanced, OP=2, Bnegate=1)
+    result = EquivalenceChecker(simple, advanced, samples=64).check()
+    assert result.equivalent and result.proven
+    assert result.method == "bdd"
+
+
+def test_32_bit_counterexample():
+    """Adder32bit doesn't wrap around like the ALU does"""
+    a, b = Input(), Input()
+    a.setState((0, 32))
+    b.setState((0, 32))
+    adder, out = Adder32bit(), Output()
+    connect(a, "outValue", adder, "inputA")
+    connect(b, "outValue", adder, "inputB")
+    connect(adder, "outSum", out, "input")
+    unmasked = CircuitPorts(Netlist([a, b, adder, out]), [a, b], [out])
+
+    result = EquivalenceChecker(unmasked, aluCircuit(ALUSimple, OP=2), samples=0).check()
+    assert not result.equivalent
+    x, y = result.counterexample
+    assert result.values == [x + y]
+    assert result.expected == [(x + y) & 0xFFFFFFFF]
+
+
+def test_invalid_alu_op_raises_like_the_model():
+    """ALUSimple raises for OP code 3, the symbolic kernel does too if the code can occur"""
+    from src.engine.Bdd import Bdd, SYMBOLIC_KERNELS
+    comp = ALUSimple()
+    kernel = SYMBOLIC_KERNELS[ALUSimple](comp)
+    bdd = Bdd()
+    a, b = bdd.constant(5, 32), bdd.constant(3, 32)
+    zero = bdd.constant(0, 1)
+    with pytest.raises(ValueError):
+        kernel(bdd, a, b, [bdd.var(0), bdd.var(1)], zero, zero, zero)
+    with pytest.raises(ValueError):
+        kernel(bdd, a, b, bdd.constant(3, 2), zero, zero, zero)
+    assert kernel(bdd, a, b, bdd.constant(0, 2), zero, zero, zero)[0] == bdd.constant(1, 32)
+
+
+def test_sequential_circuits_are_rejected():
+    reg = Register()
+    ports = CircuitPorts(Netlist([reg]), [], [])
+    with pytest.raises(ValueError):
+        EquivalenceChecker(ports, ports)
+
+
+def test_without_numpy(monkeypatch):
+    """Without NumPy the vectors are evaluated by the BatchEvaluator"""
+    monkeypatch.setattr(sys.modules["src.engine.EquivalenceChecker"], "np", None)
+    monkeypatch.setattr(sys.modules["src.engine.NumpyEvaluator"], "np", None)
+    result = EquivalenceChecker(xorFromGates(), gateCircuit(Or)).check()
+    assert result.counterexample == [1, 1]
+    result = EquivalenceChecker(aluCircuit(ALUSimple, OP=0), aluCircuit(ALUAdvanced, OP=0), samples=16).check()
+    assert result.equivalent and result.method == "bdd"
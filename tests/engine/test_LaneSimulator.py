@@ -0,0 +1,95 @@
+import pytest
+from src.engine.Netlist import Netlist
+from src.engine.LaneSimulator import LaneSimulator, countingMask
+from src.model.Input import Input
+from src.model.Output import Output
+from src.model.And import And
+from src.model.Or import Or
+from src.model.Xor import Xor
+from src.model.Not import Not
+from src.model.Nand import Nand
+from src.model.FullAdder import FullAdder
+from src.model.Splitter8to1 import Splitter8to1
+
+
+def connect(origin, originKey, target, targetKey):
+    """Same order as LogicComponentController.addConnection"""
+    target.addInput(origin, originKey, targetKey)
+    origin.addOutput(target, targetKey)
+
+
+def test_counting_mask():
+    assert countingMask(0, 0, 8) == 0b10101010
+    assert countingMask(1, 0, 8) == 0b11001100
+    assert countingMask(3, 0, 8) == 0
+    assert countingMask(3, 8, 8) == 0xFF
+    assert countingMask(1, 3, 4) == 0b1001 # 3, 4, 5, 6
+
+
+@pytest.mark.parametrize("laneWidth", [64, 8, None])
+def test_truth_table_matches_eval(laneWidth):
+    """The lane masks hold the same values as evaluating every combination with eval()"""
+    inputs = [Input() for _ in range(7)]
+    gates = [And(), Or(), Xor(), Nand(), Not(), FullAdder()]
+    and1, or1, xor1, nand1, not1, adder = gates
+    out1, out2 = Output(), Output()
+    connect(inputs[0], "outValue", and1, "input1")
+    connect(inputs[1], "outValue", and1, "input2")
+    connect(inputs[2], "outValue", or1, "input1")
+    connect(inputs[3], "outValue", or1, "input2")
+    connect(and1, "outValue", xor1, "input1")
+    connect(or1, "outValue", xor1, "input2")
+    connect(inputs[4], "outValue", nand1, "input1")
+    connect(xor1, "outValue", nand1, "input2")
+    connect(nand1, "outValue", not1, "input")
+    connect(not1, "outValue", adder, "inputA")
+    connect(inputs[5], "outValue", adder, "inputB")
+    connect(inputs[6], "outValue", adder, "inputCin")
+    connect(adder, "outSum", out1, "input")
+    connect(adder, "cOut", out2, "input")
+    components = inputs + gates + [out1, out2]
+
+    simulator = LaneSimulator(Netlist(components), laneWidth)
+    assert simulator.supported
+    sums, carries = simulator.truthTable(inputs, [(out1, "outValue"), (out2, "outValue")])
+
+    for combination in range(1 << len(inputs)):
+        for k, comp in enumerate(inputs):
+            comp.setState(((combination >> k) & 1, 1))
+        for comp in gates + [out1, out2]:
+            comp.eval()
+        assert (sums >> combination) & 1 == out1.getState()["outValue"][0]
+        assert (carries >> combination) & 1 == out2.getState()["outValue"][0]
+
+
+def test_stuck_at_faults():
+    in1, in2 = Input(), Input()
+    and1, or1, out1 = And(), Or(), Output()
+    connect(in1, "outValue", and1, "input1")
+    connect(in2, "outValue", and1, "input2")
+    connect(and1, "outValue", or1, "input1")
+    connect(in1, "outValue", or1, "input2")
+    connect(or1, "outValue", out1, "input")
+    simulator = LaneSimulator(Netlist([in1, in2, and1, or1, out1]))
+    probes = [(out1, "outValue")]
+
+    # or1 = in1 | (in1 & in2) = in1
+    assert simulator.truthTable([in1, in2], probes) == [0b1010]
+    assert simulator.truthTable([in1, in2], probes, [(in1, "outValue", 1)]) == [0b1111]
+
+    # the AND gate is redundant, so its faults can't be observed at the output
+    detected = simulator.detectableFaults([in1, in2], probes)
+    assert (and1, "outValue", 0) not in detected
+    assert (and1, "outValue", 1) in detected
+    assert (in1, "outValue", 0) in detected
+
+
+def test_multi_bit_circuits_are_not_supported():
+    in1 = Input()
+    in1.setState((0, 8))
+    splitter = Splitter8to1()
+    connect(in1, "outValue", splitter, "input1")
+    simulator = LaneSimulator(Netlist([in1, splitter]))
+    assert not simulator.supported
+    with pytest.raises(ValueError):
+        simulator.simulate({}, 64)
@@ -0,0 +1,213 @@
+import itertools
+import random
+import pytest
+from src.engine.Netlist import Netlist
+from src.engine.LookupTables import LookupTable, synthesizeLookupTables
+from src.control.LogicComponentController import LogicComponentController
+from src.infrastructure.eventBus import EventBus
+from src.model.Input import Input
+from src.model.And import And
+from src.model.Or import Or
+from src.model.Not import Not
+from src.model.Xor import Xor
+from src.model.DLatch import DLatch
+from src.model.FullAdder import FullAdder
+from src.model.Output import Output
+
+
+def connect(origin, originKey, target, targetKey):
+    origin.addOutput(target, targetKey)
+    target.addInput(origin, originKey, targetKey)
+
+
+@pytest.fixture
+def adderCircuit():
+    """2-bit ripple carry adder a + b, followed by a parity check of the sum"""
+    a0, a1, b0, b1 = Input(), Input(), Input(), Input()
+    fa0, fa1 = FullAdder(), FullAdder()
+    parity = Xor()
+    s0, s1, carry, odd = Output(), Output(), Output(), Output()
+    connect(a0, "outValue", fa0, "inputA")
+    connect(b0, "outValue", fa0, "inputB")
+    connect(a1, "outValue", fa1, "inputA")
+    connect(b1, "outValue", fa1, "inputB")
+    connect(fa0, "cOut", fa1, "inputCin")
+    connect(fa0, "outSum", s0, "input")
+    connect(fa1, "outSum", s1, "input")
+    connect(fa1, "cOut", carry, "input")
+    connect(fa0, "outSum", parity, "input1")
+    connect(fa1, "outSum", parity, "input2")
+    connect(parity, "outValue", odd, "input")
+    return [a0, a1, b0, b1, fa0, fa1, parity, s0, s1, carry, odd]
+
+
+def outputStates(components):
+    return [comp.getState() for comp in components if type(comp) == Output]
+
+
+def test_tables_match_kernels(adderCircuit):
+    """A netlist with lookup tables computes the same states as one without"""
+    a0, a1, b0, b1 = adderCircuit[:4]
+    plain = Netlist(adderCircuit)
+    tabulated = Netlist(adderCircuit)
+    tables = synthesizeLookupTables(tabulated, maxInputBits=8)
+    assert len(tables) == 1
+    assert tables[0].bits == 4
+    assert tabulated.lookupTables == tables
+    # the nodes and levels stay untouched for the other evaluators
+    assert tabulated.levels == [[tabulated.nodeOf[comp] for comp in level] for level in plain.levelComponents]
+
+    for values in itertools.product((0, 1), repeat=4):
+        for comp, value in zip((a0, a1, b0, b1), values):
+            comp.setState((value, 1))
+        assert plain.run()
+        expected = [dict(state) for state in outputStates(adderCircuit)]
+        assert tabulated.run()
+        assert outputStates(adderCircuit) == expected
+    assert adderCircuit[-2].getState()["outValue"] == (1, 1) # 3 + 3 has a carry
+
+
+def test_tables_only_keep_region_outputs(adderCircuit):
+    """Nets that are only read inside of the region are not stored in the table"""
+    tables = synthesizeLookupTables(Netlist(adderCircuit))
+    fa0, fa1, parity, odd = adderCircuit[4], adderCircuit[5], adderCircuit[6], adderCircuit[-1]
+    assert tables[0].components == [fa0, fa1, parity, odd]
+    # the carry of fa0 and the parity are only read inside of the region
+    assert [(comp, key) for _, comp, key, _ in tables[0].outputs] == [(fa0, "outSum"), (fa1, "outSum"), (fa1, "cOut"),
+                                                                       (odd, "outValue")]
+    assert len(tables[0].columns) == 4
+
+
+def test_region_respects_input_bits(adderCircuit):
+    tables = synthesizeLookupTables(Netlist(adderCircuit), maxInputBits=3, minNodes=2)
+    assert all(table.bits <= 3 for table in tables)
+
+
+def test_wider_input_falls_back(adderCircuit):
+    """If an Input gets wider after the table was built, the nodes are evaluated as usual"""
+    a0, a1, b0, b1 = adderCircuit[:4]
+    plain = Netlist(adderCircuit)
+    tabulated = Netlist(adderCircuit)
+    synthesizeLookupTables(tabulated)
+    a0.setState((2, 8))
+    b0.setState((1, 1))
+    assert plain.run()
+    expected = [dict(state) for state in outputStates(adderCircuit)]
+    assert tabulated.run()
+    assert outputStates(adderCircuit) == expected
+
+
+def test_regions_stay_convex():
+    """A node whose other consumer leads back into the region is not absorbed"""
+    in1, in2, in3 = Input(), Input(), Input()
+    and1, latch, or1, not1, out1 = And(), DLatch(), Or(), Not(), Output()
+    connect(in1, "outValue", and1, "input1")
+    connect(in2, "outValue", and1, "input2")
+    connect(and1, "outValue", latch, "inputD")
+    connect(in3, "outValue", latch, "inputC")
+    connect(and1, "outValue", or1, "input1")
+    connect(latch, "outQ", or1, "input2")
+    connect(or1, "outValue", not1, "input")
+    connect(not1, "outValue", out1, "input")
+    components = [in1, in2, in3, and1, latch, or1, not1, out1]
+    netlist = Netlist(components)
+    tables = synthesizeLookupTables(netlist, minNodes=2)
+    assert len(tables) == 1
+    assert and1 not in tables[0].components
+    assert tables[0].components == [or1, not1, out1]
+
+    for value in (0, 1):
+        for comp in (in1, in2, in3):
+            comp.setState((value, 1))
+        assert netlist.run()
+        assert latch.getState()["outQ"] == (value, 1)
+        assert out1.getState()["outValue"] == (1 - value, 1)
+
+
+def randomCircuit(seed, gates=12, inputs=4):
+    """Random combinational circuit, every gate without a consumer drives an Output"""
+    rng = random.Random(seed)
+    components = [Input() for _ in range(inputs)]
+    for _ in range(gates):
+        gate = rng.choice([And, Or, Xor, Not])()
+        for key in gate.inputs:
+            connect(rng.choice(components), "outValue", gate, key)
+        components.append(gate)
+    for gate in components[inputs:]:
+        if len(gate.outputs) == 0:
+            out = Output()
+            connect(gate, "outValue", out, "input")
+            components.append(out)
+    return components
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_regions_dont_feed_each_other(seed):
+    """Regions are convex on their own but two of them can still feed each other, such a table is dropped"""
+    components = randomCircuit(seed)
+    inputs = components[:4]
+    plain = Netlist(components)
+    for bits in range(1, 5):
+        tabulated = Netlist(components)
+        tables = synthesizeLookupTables(tabulated, maxInputBits=bits, minNodes=2)
+        assert tabulated.lookupTables == tables
+        scheduled = [unit for level in tabulated.schedule for unit in level]
+        assert len(scheduled) > 0
+        for values in itertools.product((0, 1), repeat=4):
+            for comp, value in zip(inputs, values):
+                comp.setState((value, 1))
+            assert plain.run()
+            expected = [dict(state) for state in outputStates(components)]
+            assert tabulated.run()
+            assert outputStates(components) == expected
+
+
+def test_mutually_feeding_regions_are_dropped():
+    """In this circuit the third region would read from and feed the first one"""
+    tables = synthesizeLookupTables(Netlist(randomCircuit(11)), maxInputBits=3, minNodes=2)
+    assert len(tables) > 1
+    units = [[set(table.inNets), set(table.outNets)] for table in tables]
+    for (ins1, outs1), (ins2, outs2) in itertools.combinations(units, 2):
+        assert not (ins1 & outs2 and ins2 & outs1)
+
+
+def test_cyclic_tables_keep_plain_schedule(adderCircuit):
+    """If the units of a schedule contain a cycle, reschedule keeps the schedule it had"""
+    netlist = Netlist(adderCircuit)
+    schedule = netlist.schedule
+    fa0 = netlist.nodeOf[adderCircuit[4]]
+
+    class Unit:
+        def __init__(self, inNets, outNets):
+            self.inNets, self.outNets, self.index = inNets, outNets, 0
+
+    assert not netlist.reschedule([Unit(fa0.inNets, fa0.outNets), Unit(fa0.outNets, fa0.inNets[:1])])
+    assert netlist.schedule is schedule
+    assert netlist.run()
+
+
+def test_waves_use_original_levels(adderCircuit):
+    """Shown waves are not merged, only the optimized schedule uses the tables"""
+    netlist = Netlist(adderCircuit)
+    synthesizeLookupTables(netlist)
+    waves = []
+    netlist.run(lambda components: waves.append(components), waves=True)
+    assert waves == netlist.levelComponents
+    waves.clear()
+    netlist.run(lambda components: waves.append(components))
+    assert len(waves) < len(netlist.levelComponents)
+    assert any(type(run.__self__) == LookupTable for level in netlist.schedule for run in level
+               if hasattr(run, "__self__"))
+
+
+def test_controller_uses_lookup_tables(adderCircuit):
+    """Lookup tables are only used headless, they don't update the states inside of their regions"""
+    bus = EventBus()
+    lC = LogicComponentController(bus)
+    lC.components = list(adderCircuit)
+    assert lC.getNetlist().lookupTables == []
+    bus.setHeadless(True)
+    assert len(lC.getNetlist().lookupTables) == 1
+    lC.lookupTableBits = 0
+    lC.invalidateNetlist()
+    assert lC.getNetlist().lookupTables == []
@@ -0,0 +1,253 @@
+import pytest
+from src.engine.Netlist import Netlist, ZERO_NET
+from src.control.LogicComponentController import LogicComponentController
+from src.model.Input import Input
+from src.model.And import And
+from src.model.Or import Or
+from src.model.Not import Not
+from src.model.Output import Output
+from src.model.Register import Register
+from src.model.Splitter8to1 import Splitter8to1
+from src.model.Collector1to2 import Collector1to2
+from src.model.CustomLogicComponent import CustomLogicComponent
+from src.model.CustomLogicComponentData import CustomLogicComponentData
+from src.engine.BatchEvaluator import BatchEvaluator
+
+
+def connect(origin, originKey, target, targetKey):
+    origin.addOutput(target, targetKey)
+    target.addInput(origin, originKey, targetKey)
+
+
+@pytest.fixture
+def andOrCircuit():
+    """in1, in2 -> and1 -> or1 (with in3) -> out1"""
+    in1, in2, in3 = Input(), Input(), Input()
+    and1, or1, out1 = And(), Or(), Output()
+    connect(in1, "outValue", and1, "input1")
+    connect(in2, "outValue", and1, "input2")
+    connect(and1, "outValue", or1, "input1")
+    connect(in3, "outValue", or1, "input2")
+    connect(or1, "outValue", out1, "input")
+    return [in1, in2, in3, and1, or1, out1]
+
+
+def test_compile_levels(andOrCircuit):
+    """The schedule groups the components by their topological level"""
+    netlist = Netlist(andOrCircuit)
+    in1, in2, in3, and1, or1, out1 = andOrCircuit
+    assert netlist.acyclic
+    assert netlist.levelComponents == [[in1, in2, in3], [and1], [or1], [out1]]
+    assert netlist.nodeOf[and1].inNets == (netlist.netIds[(in1, "outValue")], netlist.netIds[(in2, "outValue")])
+
+
+def test_run_updates_states(andOrCircuit):
+    netlist = Netlist(andOrCircuit)
+    in1, in2, in3, and1, or1, out1 = andOrCircuit
+    in1.setState((1, 1))
+    in2.setState((1, 1))
+    assert netlist.run() == True
+    assert and1.getState()["outValue"] == (1, 1)
+    assert out1.getState()["outValue"] == (1, 1)
+
+    in2.setState((0, 1))
+    assert netlist.run() == True
+    assert and1.getState()["outValue"] == (0, 1)
+    assert out1.getState()["outValue"] == (0, 1)
+    assert netlist.values[netlist.netIds[(or1, "outValue")]] == 0
+
+
+def test_unconnected_inputs_use_zero_net():
+    not1 = Not()
+    out1 = Output()
+    connect(not1, "outValue", out1, "input")
+    netlist = Netlist([not1, out1])
+    assert netlist.nodeOf[not1].inNets == (ZERO_NET,)
+    netlist.run()
+    assert out1.getState()["outValue"] == (1, 1)
+
+
+def test_multi_bit_kernels():
+    in1 = Input()
+    in1.setState((6, 8))
+    splitter = Splitter8to1()
+    collector = Collector1to2()
+    out1 = Output()
+    connect(in1, "outValue", splitter, "input1")
+    connect(splitter, "outValue2", collector, "input1")
+    connect(splitter, "outValue4", collector, "input2")
+    connect(collector, "outValue", out1, "input")
+    Netlist([in1, splitter, collector, out1]).run()
+    assert splitter.getState()["outValue2"] == (1, 1)
+    assert out1.getState()["outValue"] == (3, 2)
+
+
+def test_cycle_is_detected():
+    in1, and1, not1 = Input(), And(), Not()
+    connect(in1, "outValue", and1, "input1")
+    connect(and1, "outValue", not1, "input")
+    connect(not1, "outValue", and1, "input2")
+    netlist = Netlist([in1, and1, not1])
+    assert netlist.acyclic == False
+    assert netlist.run() == False
+
+
+def test_register_outputs_are_sources():
+    """Registers break cycles, their outputs are read before every run"""
+    reg = Register()
+    not1 = Not()
+    connect(reg, "outValue", not1, "input")
+    connect(not1, "outValue", reg, "input")
+    netlist = Netlist([reg, not1])
+    assert netlist.acyclic
+    reg.state = {"outValue": (1, 32)}
+    netlist.run()
+    assert not1.getState()["outValue"] == (0, 1)
+
+
+def test_stale_after_connection_change(andOrCircuit):
+    netlist = Netlist(andOrCircuit)
+    assert not netlist.isStale()
+    in1, in2, in3, and1, or1, out1 = andOrCircuit
+    or1.removeOutput(out1, "input")
+    assert netlist.isStale()
+
+
+def test_controller_reuses_netlist():
+    lC = LogicComponentController()
+    in1 = lC.addLogicComponent(Input)
+    not1 = lC.addLogicComponent(Not)
+    out1 = lC.addLogicComponent(Output)
+    lC.addConnection(in1, "outValue", not1, "input")
+    assert lC.eval()
+    netlist = lC.getNetlist()
+    assert lC.eval()
+    assert lC.getNetlist() is netlist
+
+    # a rejected connection doesn't change the topology
+    lC.addConnection(in1, "outValue", not1, "input")
+    assert lC.getNetlist() is netlist
+
+    lC.addConnection(not1, "outValue", out1, "input")
+    assert lC.getNetlist() is not netlist
+    assert lC.eval()
+    assert out1.getState()["outValue"] == (1, 1)
+
+    netlist = lC.getNetlist()
+    lC.removeLogicComponent(out1)
+    assert lC.getNetlist() is not netlist
+
+
+def xorData():
+    """XOR = (A AND NOT B) OR (NOT A AND B)"""
+    return CustomLogicComponentData(
+        name="CustomXOR",
+        inputMap={"A": 1, "B": 1},
+        outputMap={"result": 1},
+        components=["Input", "Input", "Not", "Not", "And", "And", "Or", "Output"],
+        connections=[
+            {"origin": 0, "originKey": "outValue", "destination": 2, "destinationKey": "input"},
+            {"origin": 1, "originKey": "outValue", "destination": 3, "destinationKey": "input"},
+            {"origin": 0, "originKey": "outValue", "destination": 4, "destinationKey": "input1"},
+            {"origin": 3, "originKey": "outValue", "destination": 4, "destinationKey": "input2"},
+            {"origin": 2, "originKey": "outValue", "destination": 5, "destinationKey": "input1"},
+            {"origin": 1, "originKey": "outValue", "destination": 5, "destinationKey": "input2"},
+            {"origin": 4, "originKey": "outValue", "destination": 6, "destinationKey": "input1"},
+            {"origin": 5, "originKey": "outValue", "destination": 6, "destinationKey": "input2"},
+            {"origin": 6, "originKey": "outValue", "destination": 7, "destinationKey": "input"}
+        ]
+    )
+
+
+@pytest.fixture
+def customCircuit():
+    """in1, in2 -> xor1 (custom) -> not1 -> out1"""
+    in1, in2 = Input(), Input()
+    xor1 = CustomLogicComponent(xorData())
+    not1, out1 = Not(), Output()
+    connect(in1, "outValue", xor1, "A")
+    connect(in2, "outValue", xor1, "B")
+    connect(xor1, "result", not1, "input")
+    connect(not1, "outValue", out1, "input")
+    return [in1, in2, xor1, not1, out1]
+
+
+def test_flatten_inlines_custom_components(customCircuit):
+    """The gates of a custom component become nodes, its Input and Output children are only aliases"""
+    in1, in2, xor1, not1, out1 = customCircuit
+    netlist = Netlist(customCircuit, flatten=True)
+    assert netlist.flattened == [xor1]
+    assert netlist.acyclic
+    childInput = xor1.inputComponents[0]
+    assert childInput not in netlist.nodeOf
+    assert netlist.netIds[(childInput, "outValue")] == netlist.netIds[(in1, "outValue")]
+    for child in xor1.childComponents:
+        if type(child) not in (Input, Output):
+            assert child in netlist.nodeOf
+    # the view only gets the top level components, levels with only inlined gates are empty
+    assert [level for level in netlist.levelComponents if level] == [[in1, in2], [xor1], [not1], [out1]]
+    assert len(netlist.levels) > 4
+
+
+def test_flatten_matches_eval(customCircuit):
+    in1, in2, xor1, not1, out1 = customCircuit
+    flat = Netlist(customCircuit, flatten=True)
+    nested = Netlist(customCircuit)
+    assert nested.flattened == []
+    for a in (0, 1):
+        for b in (0, 1):
+            in1.setState((a, 1))
+            in2.setState((b, 1))
+            assert flat.run()
+            assert xor1.getState()["result"] == (a ^ b, 1)
+            assert out1.getState()["outValue"] == (1 - (a ^ b), 1)
+            flatValue = out1.getState()
+            assert nested.run()
+            assert out1.getState() == flatValue
+
+
+def test_flatten_nested_custom_components():
+    """Custom components inside custom components are inlined recursively"""
+    outer = CustomLogicComponent(CustomLogicComponentData(
+        name="Wrapper", inputMap={"x": 1, "y": 1}, outputMap={"z": 1},
+        components=["Input", "Input", "Output"], connections=[]
+    ))
+    inner = CustomLogicComponent(xorData())
+    x, y, z = outer.childComponents
+    outer.childComponents.insert(2, inner)
+    connect(x, "outValue", inner, "A")
+    connect(y, "outValue", inner, "B")
+    connect(inner, "result", z, "input")
+    outer.pure = False # the children were changed after creation, so the memoized outputs would be wrong
+    in1, in2, out1 = Input(), Input(), Output()
+    connect(in1, "outValue", outer, "x")
+    connect(in2, "outValue", outer, "y")
+    connect(outer, "z", out1, "input")
+
+    netlist = Netlist([in1, in2, outer, out1], flatten=True)
+    assert netlist.flattened == [outer, inner]
+    in1.setState((1, 1))
+    assert netlist.run()
+    assert inner.getState()["result"] == (1, 1)
+    assert out1.getState()["outValue"] == (1, 1)
+    in2.setState((1, 1))
+    assert netlist.run()
+    assert out1.getState()["outValue"] == (0, 1)
+
+
+def test_flatten_batch_evaluation(customCircuit):
+    in1, in2, xor1, not1, out1 = customCircuit
+    evaluator = BatchEvaluator(Netlist(customCircuit, flatten=True))
+    assert evaluator.supported
+    rows = evaluator.evaluate({in1: [0, 0, 1, 1], in2: [0, 1, 0, 1]}, [(out1, "outValue")], 4)
+    assert [row[0] for row in rows] == [1, 0, 0, 1]
+
+
+def test_controller_flattens_custom_components(customCircuit):
+    lC = LogicComponentController()
+    for comp in customCircuit:
+        lC.components.append(comp)
+    assert lC.getNetlist().flattened == [customCircuit[2]]
+    lC.flattenCustomComponents = False
+    lC.invalidateNetlist()
+    assert lC.getNetlist().flattened == []
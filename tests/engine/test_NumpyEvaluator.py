@@ -0,0 +1,101 @@
+import random
+import pytest
+from src.engine.Netlist import Netlist
+from src.engine.Kernels import KERNELS
+from src.engine.NumpyEvaluator import NumpyEvaluator, VECTOR_KERNELS
+from src.model import ALUAdvanced, ALUSimple, ControlUnit, ShiftLeft2
+from src.model.Input import Input
+from src.model.Output import Output
+from src.model.And import And
+from src.model.Xor import Xor
+from src.model.FullAdder import FullAdder
+from src.model.Collector1to2 import Collector1to2
+from src.model.DLatch import DLatch
+
+np = pytest.importorskip("numpy")
+
+
+def connect(origin, originKey, target, targetKey):
+    """Same order as LogicComponentController.addConnection"""
+    target.addInput(origin, originKey, targetKey)
+    origin.addOutput(target, targetKey)
+
+
+def randomValue(comp, key):
+    if key == "selection":
+        return random.randrange(len(comp.inputs) - 1)
+    if key == "OP":
+        return random.randrange(3 if type(comp) == ALUSimple else 4)
+    if type(comp) == ControlUnit:
+        return random.choice([0, 35, 43, 4, random.randrange(64)])
+    width = comp.inputBitwidths[key] or 8
+    return random.randrange(1 << width)
+
+
+@pytest.mark.parametrize("cls", list(VECTOR_KERNELS), ids=lambda cls: cls.__name__)
+def test_vector_kernels_match_scalar_kernels(cls):
+    """Every vector kernel computes the same values as the scalar kernel of its class"""
+    random.seed(cls.__name__)
+    comp = cls()
+    if cls == ShiftLeft2:
+        comp.inputBitwidths["input1"] = 32
+    rows = [[randomValue(comp, key) for key in comp.inputs] for _ in range(200)]
+    scalarKernel, _ = KERNELS[cls](comp)
+    vectorKernel = VECTOR_KERNELS[cls](comp)
+
+    columns = [np.array(column, dtype=np.uint64) for column in zip(*rows)]
+    vectorResults = vectorKernel(*columns)
+    for i, row in enumerate(rows):
+        assert tuple(int(result[i]) for result in vectorResults) == scalarKernel(*row)
+
+
+def test_sweep_is_bounded():
+    """A sweep over 64 input bits would need far too much memory"""
+    a, b = Input(), Input()
+    a.setState((0, 32))
+    b.setState((0, 32))
+    evaluator = NumpyEvaluator(Netlist([a, b]))
+    with pytest.raises(ValueError):
+        evaluator.sweep([a, b], [(a, "outValue")])
+
+
+def test_sweep_all_combinations():
+    """A 2-bit adder built from full adders is checked for all 16 input combinations"""
+    a0, a1, b0, b1 = Input(), Input(), Input(), Input()
+    adder0, adder1 = FullAdder(), FullAdder()
+    collector = Collector1to2()
+    xor1, and1 = Xor(), And()
+    out1, out2 = Output(), Output()
+    connect(a0, "outValue", adder0, "inputA")
+    connect(b0, "outValue", adder0, "inputB")
+    connect(a1, "outValue", adder1, "inputA")
+    connect(b1, "outValue", adder1, "inputB")
+    connect(adder0, "cOut", adder1, "inputCin")
+    connect(adder0, "outSum", collector, "input1")
+    connect(adder1, "outSum", collector, "input2")
+    connect(collector, "outValue", out1, "input")
+    connect(a0, "outValue", xor1, "input1")
+    connect(a1, "outValue", xor1, "input2")
+    connect(xor1, "outValue", and1, "input1")
+    connect(adder1, "cOut", and1, "input2")
+    connect(and1, "outValue", out2, "input")
+    components = [a0, a1, b0, b1, adder0, adder1, collector, xor1, and1, out1, out2]
+
+    evaluator = NumpyEvaluator(Netlist(components), chunkSize=5)
+    assert evaluator.supported
+    index, (sums, flags) = evaluator.sweep([a0, a1, b0, b1], [(out1, "outValue"), (out2, "outValue")])
+    assert len(index) == 16
+    for i in range(16):
+        a, b = i & 3, i >> 2
+        assert int(sums[i]) == (a + b) & 3
+        assert int(flags[i]) == ((a & 1) ^ (a >> 1)) & ((a + b) >> 2)
+
+
+def test_unsupported_components():
+    in1 = Input()
+    latch = DLatch()
+    connect(in1, "outValue", latch, "inputD")
+    evaluator = NumpyEvaluator(Netlist([in1, latch]))
+    assert not evaluator.supported
+    with pytest.raises(ValueError):
+        evaluator.evaluate({in1: np.zeros(4, dtype=np.uint64)}, [])
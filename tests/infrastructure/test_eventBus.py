@@ -36,4 +36,91 @@ def test_subscriptionAndEmmiting():
     
     in2.removeOutput(xor,"input2")
     xor.removeInput(in2,"outValue","input2")
-    assert xor.getState()["outValue"] == (0,1)
\ No newline at end of file
+    assert xor.getState()["outValue"] == (0,1)
+
+def test_subscribeFor_only_calls_matching_keys():
+    bus = EventBus()
+    calls = []
+    bus.subscribeFor("view:components_updated", "a", lambda comps: calls.append(("a", comps)))
+    bus.subscribeFor("view:components_updated", "b", lambda comps: calls.append(("b", comps)))
+    bus.emit("view:components_updated", ["a", "c"])
+    assert calls == [("a", ["a", "c"])]
+
+    handler = lambda comps: calls.append(("b2", comps))
+    bus.subscribeFor("view:components_updated", "b", handler)
+    bus.unsubscribeFor("view:components_updated", "b", handler)
+    calls.clear()
+    bus.emit("view:components_updated", ["b"])
+    assert calls == [("b", ["b"])]
+
+
+def test_unsubscribe_during_emit():
+    """Handlers can unsubscribe while the event is dispatched"""
+    bus = EventBus()
+    calls = []
+    def first():
+        calls.append(1)
+        bus.unsubscribe("event", first)
+    bus.subscribe("event", first)
+    bus.subscribe("event", lambda: calls.append(2))
+    bus.emit("event")
+    bus.emit("event")
+    assert calls == [1, 2, 2]
+
+
+def test_batch_coalesces_emits():
+    bus = EventBus()
+    plain, keyed, other = [], [], []
+    bus.subscribe("view:components_updated", lambda comps: plain.append(comps))
+    bus.subscribeFor("view:components_updated", "a", lambda comps: keyed.append(comps))
+    bus.subscribe("other", lambda: other.append(True))
+    with bus.batch("view:components_updated"):
+        bus.emit("view:components_updated", ["a"])
+        bus.emit("other")
+        bus.emit("view:components_updated", ["b"])
+        # other events are not delayed
+        assert other == [True]
+        assert plain == [] and keyed == []
+    # plain handlers see the last emit, keyed handlers the last emit containing their key
+    assert plain == [["b"]]
+    assert keyed == [["a"]]
+
+
+def test_headless_drops_view_events():
+    bus = EventBus()
+    calls = []
+    bus.subscribe("view:components_updated", calls.append)
+    bus.subscribe("model:input_changed", calls.append)
+    bus.setHeadless(True)
+    bus.emit("view:components_updated", [])
+    bus.emit("model:input_changed", 1)
+    bus.setHeadless(False)
+    assert calls == [1]
+
+
+def test_controller_eval_coalesces_view_updates():
+    """Without a tick length one eval leads to one view update"""
+    getBus().setAuto()
+    lC = LogicComponentController()
+    in1 = lC.addLogicComponent(Input)
+    in2 = lC.addLogicComponent(Input)
+    xor = lC.addLogicComponent(Xor)
+    lC.addConnection(in1, "outValue", xor, "input1")
+    lC.addConnection(in2, "outValue", xor, "input2")
+    updates = []
+    handler = lambda comps: updates.append(list(comps))
+    getBus().subscribe("view:components_updated", handler)
+    try:
+        assert lC.eval()
+        assert len(updates) == 1
+        assert xor in updates[0]
+
+        updates.clear()
+        getBus().setHeadless(True)
+        in1.setState((1, 1))
+        assert lC.eval()
+        assert updates == []
+        assert xor.getState()["outValue"] == (1, 1)
+    finally:
+        getBus().setHeadless(False)
+        getBus().unsubscribe("view:components_updated", handler)
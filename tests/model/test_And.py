@@ -51,3 +51,15 @@ def test_and_state_changes_multiple_times():
     assert changed is True, "And.eval() should return True when state changes from (1,1) to (0,1)."
     assert and_gate.state["outValue"] == (0,1), "And.state['outValue'] should be (0,1) after one input is False."
 
+
+def test_and_is_compact():
+    """Gates keep their attributes in __slots__ and update their state in place"""
+    getBus().setManual()
+    and_gate = And()
+    assert not hasattr(and_gate, "__dict__")
+    state = and_gate.state
+    and_gate.addInput(DummyInput(True),"outValue","input1")
+    and_gate.addInput(DummyInput(True),"outValue","input2")
+    assert and_gate.eval() is True
+    assert and_gate.state is state
+    assert state["outValue"] == (1,1)
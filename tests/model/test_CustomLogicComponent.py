@@ -535,3 +535,86 @@ class TestCustomLogicComponentIntegration:
         assert comp1.state["out"][0] == 1
         assert comp2.state["out"][0] == 1
 
+
+
+class TestCustomLogicComponentMemo:
+    """Tests for the memoized evaluation of combinational custom components"""
+
+    def test_pure_component_detected(self, xor_component_data):
+        """Components without stateful children are pure"""
+        comp = CustomLogicComponent(xor_component_data)
+        assert comp.pure
+
+    def test_stateful_component_not_memoized(self):
+        """A component containing a DLatch is never memoized"""
+        data = CustomLogicComponentData(
+            name="Latch",
+            inputMap={"C": 1, "D": 1},
+            outputMap={"Q": 1},
+            components=["Input", "Input", "DLatch", "Output"],
+            connections=[
+                {"origin": 0, "originKey": "outValue", "destination": 2, "destinationKey": "inputC"},
+                {"origin": 1, "originKey": "outValue", "destination": 2, "destinationKey": "inputD"},
+                {"origin": 2, "originKey": "outQ", "destination": 3, "destinationKey": "input"}
+            ]
+        )
+        getBus().setManual()
+        comp = CustomLogicComponent(data)
+        assert not comp.pure
+        assert comp.lookupTable is None
+        comp.addInput(DummyInput(1), "outValue", "C")
+        comp.addInput(DummyInput(1), "outValue", "D")
+        comp.eval()
+        assert comp.memoHits == 0 and comp.memoMisses == 0
+        assert len(comp.memo) == 0
+
+    def test_lookup_table_for_small_inputs(self, xor_component_data):
+        """Components with few input bits get a full lookup table on their first miss"""
+        getBus().setManual()
+        comp = CustomLogicComponent(xor_component_data)
+        assert comp.lookupTable is None
+        assert comp.lookupTableWidths == [1, 1]
+
+        input1 = DummyInput(1)
+        input2 = DummyInput(1)
+        comp.addInput(input1, "outValue", "A")
+        comp.addInput(input2, "outValue", "B")
+        assert comp.eval()
+        assert comp.state["result"] == (0, 1)
+        assert len(comp.lookupTable) == 4
+        assert comp.lookupTable[((1, 1), (0, 1))] == ((1, 1),)
+        input2.setValue(0)
+        comp.eval()
+        assert comp.state["result"] == (1, 1)
+        assert comp.memoHits == 1
+        assert comp.memoMisses == 1
+        # a hit doesn't evaluate the children, they keep the states of the miss
+        assert comp.outputComponents[0].getState()["outValue"] == (0, 1)
+
+    def test_lru_cache(self, multi_output_component_data):
+        """Without a lookup table outputs are memoized in a bounded LRU cache"""
+        getBus().setManual()
+        comp = CustomLogicComponent(multi_output_component_data)
+        comp.lookupTableWidths = None
+        comp.cacheSize = 2
+        input1 = DummyInput(0)
+        input2 = DummyInput(1)
+        comp.addInput(input1, "outValue", "in1")
+        comp.addInput(input2, "outValue", "in2")
+
+        comp.eval()
+        comp.eval()
+        assert (comp.memoHits, comp.memoMisses) == (1, 1)
+        assert comp.state == {"and_out": (0, 1), "or_out": (1, 1)}
+
+        input1.setValue(1)
+        comp.eval()
+        assert comp.state == {"and_out": (1, 1), "or_out": (1, 1)}
+        input2.setValue(0)
+        comp.eval() # evicts the first combination
+        assert len(comp.memo) == 2
+        assert ((0, 1), (1, 1)) not in comp.memo
+
+        comp.clearMemo()
+        assert len(comp.memo) == 0
+        assert (comp.memoHits, comp.memoMisses) == (0, 0)
@@ -222,24 +222,25 @@ class TestDataMemoryWrite:
         assert changed  # Output should change on read
         assert dm.state["readData"] == (8888, 32)
         
-    def test_write_out_of_bounds_address(self):
-        """Test writing to an address that's out of bounds"""
+    def test_write_beyond_initial_words(self):
+        """The memory covers the whole 32-bit address space, only the written pages are allocated"""
         getBus().setManual()
         dm = DataMemory()
         
-        # Attempt to write to word 200 (byte address 800), which is out of bounds
-        dm.addInput(DummyInput(800, 32), "outValue", "address")
+        # Write to the last word (byte address 0xFFFFFFFC)
+        dm.addInput(DummyInput(0xFFFFFFFC, 32), "outValue", "address")
         dm.addInput(DummyInput(12345, 32), "outValue", "writeData")
         dm.addInput(DummyInput(1, 1), "outValue", "memWrite")  # Enable write
         changed = dm.eval()
-        assert not changed  # No output change on write attempt
+        assert not changed  # No output change on write
+        assert len(dm.dataList.pages) == 1
         
-        # Now read back from address 800
+        # Now read back from the same address
         dm.inputs["memWrite"] = None
         dm.addInput(DummyInput(1, 1), "outValue", "memRead")  # Enable read
         changed = dm.eval()
         assert changed  # Output should change on read
-        assert dm.state["readData"] == (0, 32)  # Should still be 0 since write was out of bounds
+        assert dm.state["readData"] == (12345, 32)
 
     def test_read_while_writing_raises_error(self):
         """Test that reading and writing at the same time raises an error"""
@@ -265,4 +266,17 @@ class TestDataMemoryWrite:
         # Verify that data was loaded correctly
         for addr in range(128):
             assert dm.dataList[addr] == test_data[addr]
+
+    def test_load_image(self, tmp_path):
+        """Test loading a hex image at a byte address"""
+        getBus().setManual()
+        dm = DataMemory()
+        image = tmp_path / "data.hex"
+        image.write_text("1 2 3\n")
+        dm.loadImage(image, 4096)
+
+        dm.addInput(DummyInput(4100, 32), "outValue", "address")
+        dm.addInput(DummyInput(1, 1), "outValue", "memRead")
+        dm.eval()
+        assert dm.state["readData"] == (2, 32)
     
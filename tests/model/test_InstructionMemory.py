@@ -35,4 +35,41 @@ def test_eval():
     dummy.setValue(12,32)
     im.eval()
     assert im.getState()["instruction"] == (12121212, 32)
-    
\ No newline at end of file
+    
+
+def test_program_is_packed_on_load():
+    getBus().setManual()
+    im = InstructionMemory()
+    # add $1, $2, $3 and lw $4, -4($5)
+    im.loadInstructions([0x00430820, 0x8CA4FFFC])
+    assert len(im.program) == 2
+    assert im.program.raw.typecode == "I"
+    assert im.program.fetch(0) == 0x00430820
+    assert im.program.fetch(1) == 0x8CA4FFFC
+    assert im.program.fetch(2) == 0 # out of range
+    assert im.program.fetch(-1) == 0
+
+
+def test_program_words_are_masked():
+    from src.model.DecodedProgram import DecodedProgram
+    program = DecodedProgram((0x1FFFFFFFF, -1))
+    assert list(program.raw) == [0xFFFFFFFF, 0xFFFFFFFF]
+    assert program.fetch(0) == 0xFFFFFFFF
+
+
+def test_load_binary_image(tmp_path):
+    import copy
+    from array import array
+    getBus().setManual()
+    image = tmp_path / "program.bin"
+    image.write_bytes(array("I", [0x00430820, 0x8CA4FFFC, 7]).tobytes())
+    im = InstructionMemory()
+    im.loadImage(image)
+    assert len(im.instructionList) == 3
+    assert im.program.fetch(1) == 0x8CA4FFFC
+    dummy = DummyInput(8, 32)
+    im.addInput(dummy, "outValue", "readAddress")
+    im.eval()
+    assert im.getState()["instruction"] == (7, 32)
+    # snapshots share the mapped program
+    assert copy.deepcopy(im).instructionList is im.instructionList
@@ -55,4 +55,16 @@ def test_remove_input_resets_bitwidth():
     output.addInput(dummy,"outValue","input")
     output.eval()
     output.removeInput(dummy,"outValue","input")
-    assert output.inputBitwidths["input"] == 0, "Output.inputBitwidths['input'] should be reset to 0 after removing input."
\ No newline at end of file
+    assert output.inputBitwidths["input"] == 0, "Output.inputBitwidths['input'] should be reset to 0 after removing input."
+
+
+def test_eval_updates_state_in_place():
+    getBus().setManual()
+    output = Output()
+    dummy = DummyInput(3, bitwidth=2)
+    output.addInput(dummy,"outValue","input")
+    state = output.state
+    assert output.eval() is True
+    assert output.eval() is False
+    assert output.state is state
+    assert state["outValue"] == (3, 2)
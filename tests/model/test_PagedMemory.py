@@ -0,0 +1,54 @@
+import copy
+import pytest
+from array import array
+from src.model.PagedMemory import PAGE_WORDS, PagedMemory
+
+
+def test_pages_are_allocated_on_first_write():
+    memory = PagedMemory(128)
+    assert len(memory) == 128
+    assert memory[5] == 0
+    assert memory.pages == {}
+    memory[5] = 7
+    memory.write(3 * PAGE_WORDS + 1, -1)
+    assert sorted(memory.pages) == [0, 3]
+    assert memory[5] == 7
+    assert memory.read(3 * PAGE_WORDS + 1) == 0xFFFFFFFF # truncated to 32 bits
+    assert len(memory) == 3 * PAGE_WORDS + 2
+    with pytest.raises(IndexError):
+        memory.write(1 << 30, 1)
+
+
+def test_load_words_across_pages():
+    memory = PagedMemory()
+    words = list(range(PAGE_WORDS + 10))
+    memory.loadWords(words, PAGE_WORDS - 5)
+    assert memory[PAGE_WORDS - 5:] == words
+    assert len(memory.pages) == 3
+
+
+def test_load_hex(tmp_path):
+    hexFile = tmp_path / "data.hex"
+    hexFile.write_text("// data\n0000000a 0000_000B\n@10 ff # continues at word 16\n")
+    memory = PagedMemory()
+    memory.loadHex(hexFile)
+    assert memory[:3] == [10, 11, 0]
+    assert memory[16] == 255
+
+
+def test_mapped_image_is_copied_on_write(tmp_path):
+    binFile = tmp_path / "data.bin"
+    binFile.write_bytes(array("I", range(2 * PAGE_WORDS)).tobytes() + b"\x01")
+    memory = PagedMemory()
+    memory.mapImage(binFile, 4)
+    assert len(memory) == 2 * PAGE_WORDS + 4
+    assert memory.pages == {}
+    assert memory[4] == 0 and memory[5] == 1
+    memory[6] = 99
+    # only the written page is copied, the rest is still read from the image
+    assert list(memory.pages) == [0]
+    assert memory[:8] == [0, 0, 0, 0, 0, 1, 99, 3]
+    assert memory[PAGE_WORDS + 4] == PAGE_WORDS
+    copied = copy.deepcopy(memory)
+    copied[7] = 1
+    assert memory[7] == 3 and copied[6] == 99
@@ -7,6 +7,20 @@ from src.infrastructure.eventBus import getBus
 class TestRegisterBlockRead:
     """Tests for reading from the RegisterBlock"""
     
+    def test_eval_reports_changed_read_ports(self):
+        """Test that only the read ports whose data changed are reported"""
+        getBus().setManual()
+        rb = RegisterBlock()
+        rb.registers[1] = 7
+        readReg1 = DummyInput(0, 5)
+        rb.addInput(readReg1, "outValue", "readReg1")
+        assert rb.eval() is False
+
+        readReg1.setValue(1)
+        assert rb.eval() is True
+        assert rb.changedPorts == ["readData1"]
+        assert rb.state["readData1"] == (7, 32)
+    
     def test_initial_state(self):
         """Test that RegisterBlock initializes with correct state"""
         getBus().setManual()
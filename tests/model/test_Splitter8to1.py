@@ -155,3 +155,13 @@ class TestSplitter8to1:
         # Try to add input with invalid key
         with pytest.raises(KeyError):
             self.splitter.addInput(dummy, "outValue", "invalid_input")
+
+    def test_splitter_records_changed_ports(self):
+        """Only the outputs whose value changed are recorded in changedPorts."""
+        dummy = DummyInput(0b101, 8)
+        self.splitter.addInput(dummy, "outValue", "input1")
+        assert self.splitter.eval() is True
+        assert self.splitter.changedPorts == ["outValue1", "outValue4"]
+        self.splitter.changedPorts.clear()
+        assert self.splitter.eval() is False
+        assert self.splitter.changedPorts == []
@@ -346,3 +346,286 @@ def test_eventDrivenEval_with_PC_and_instruction_memory_many_instructions():
     assert pc.getState()["outValue"] == (996, 32)
     assert im.getState()["instruction"] == (996, 32)
     
+
+
+def _connect(origin, originKey, target, targetKey):
+    origin.addOutput(target, targetKey)
+    target.addInput(origin, originKey, targetKey)
+
+
+def test_graphOrder_ticks():
+    """Test that GraphOrder groups the components like the Kahn frontiers"""
+    from src.Algorithms import GraphOrder
+    in1 = Input()
+    in2 = Input()
+    and1 = And()
+    not1 = Not()
+    out1 = Output()
+    _connect(in1, "outValue", and1, "input1")
+    _connect(in2, "outValue", and1, "input2")
+    _connect(and1, "outValue", not1, "input")
+    _connect(not1, "outValue", out1, "input")
+
+    order = GraphOrder([in1, in2, and1, not1, out1])
+    assert order.acyclic
+    assert order.getTicks() == [[in1, in2], [and1], [not1], [out1]]
+    assert order.fanout[and1] == [not1]
+    assert not order.isStale()
+
+    in2.addOutput(not1, "input")
+    assert order.isStale()
+
+
+def test_graphOrder_addEdge_relevels_targets():
+    """Test that adding a connection raises the level of everything behind the new connection"""
+    from src.Algorithms import GraphOrder
+    from src.model.LogicComponent import LogicComponent
+    in1 = Input()
+    not1 = Not()
+    not2 = Not()
+    out1 = Output()
+    _connect(in1, "outValue", not1, "input")
+    _connect(not2, "outValue", out1, "input")
+    order = GraphOrder([in1, not1, not2, out1])
+    assert order.getTicks() == [[in1, not2], [not1, out1]]
+
+    _connect(not1, "outValue", not2, "input")
+    order.addEdge(not1, not2)
+    assert order.acyclic
+    assert order.getTicks() == [[in1], [not1], [not2], [out1]]
+    # the order knows about the change now (this is what the LogicComponentController does)
+    order.version = LogicComponent.topologyVersion
+    in1.setState((1, 1))
+    assert Algorithms.khanFrontierEval([in1], [in1, not1, not2, out1], order=order) == True
+    assert out1.getState()["outValue"] == (1, 1)
+
+
+def test_graphOrder_addEdge_detects_cycle():
+    """Test that a connection closing a loop marks the order as cyclic"""
+    from src.Algorithms import GraphOrder
+    in1 = Input()
+    and1 = And()
+    not1 = Not()
+    _connect(in1, "outValue", and1, "input1")
+    _connect(and1, "outValue", not1, "input")
+    order = GraphOrder([in1, and1, not1])
+    assert order.acyclic
+
+    _connect(not1, "outValue", and1, "input2")
+    order.addEdge(not1, and1)
+    assert order.acyclic == False
+
+    # removing the connection again requires a full recomputation
+    not1.removeOutput(and1, "input2")
+    and1.removeInput(not1, "outValue", "input2")
+    order.removeEdge(not1, and1)
+    assert order.valid == False
+    assert order.isStale()
+
+
+def test_eventDrivenEval_only_schedules_changed_ports():
+    """Only the components connected to outputs that actually changed are evaluated in the next wave"""
+    from src.model.Splitter8to1 import Splitter8to1
+    in1 = Input()
+    in1.setState((0, 8))
+    splitter = Splitter8to1()
+    out1 = Output()
+    out2 = Output()
+    _connect(in1, "outValue", splitter, "input1")
+    _connect(splitter, "outValue1", out1, "input")
+    _connect(splitter, "outValue2", out2, "input")
+    assert Algorithms.eventDrivenEval([in1], [in1, splitter, out1, out2]) == True
+
+    in1.setState((1, 8))
+    waves = []
+    assert Algorithms.eventDrivenEval([in1], [in1, splitter, out1, out2],
+                                      updateFunction=lambda components: waves.append(list(components))) == True
+    assert splitter.changedPorts == ["outValue1"]
+    assert waves == [[in1], [splitter], [out1]]
+    assert out1.getState()["outValue"] == (1, 1)
+    assert out2.getState()["outValue"] == (0, 1)
+
+
+def test_eventDrivenEval_schedules_components_once_per_wave():
+    """A component whose inputs change in the same wave is evaluated only once in the next wave"""
+    in1 = Input()
+    in2 = Input()
+    and1 = And()
+    out1 = Output()
+    _connect(in1, "outValue", and1, "input1")
+    _connect(in2, "outValue", and1, "input2")
+    _connect(and1, "outValue", out1, "input")
+    in1.setState((1, 1))
+    in2.setState((1, 1))
+    waves = []
+    assert Algorithms.eventDrivenEval([in1, in2], [in1, in2, and1, out1],
+                                      updateFunction=lambda components: waves.append(list(components))) == True
+    assert waves == [[in1, in2], [and1], [out1]]
+    assert out1.getState()["outValue"] == (1, 1)
+
+
+def test_timingWheel_delays_and_steps():
+    """Components with a propagation delay are evaluated that many ticks after their inputs changed"""
+    from src.Algorithms import TimingWheel
+    in1 = Input()
+    not1 = Not()
+    out1 = Output()
+    _connect(in1, "outValue", not1, "input")
+    _connect(not1, "outValue", out1, "input")
+    in1.setState((1, 1))
+    wheel = TimingWheel(delays={Not: 3})
+    wheel.schedule(in1, 0)
+    assert wheel.step() == [in1]
+    assert wheel.nextTick() == 3
+    # run-N-ticks stops before the delayed Not
+    wheel.runTicks(2)
+    assert wheel.now == 3 and wheel.pending == 1
+    assert wheel.step() == [not1]
+    assert wheel.runUntilStable()
+    assert wheel.now == 5
+    assert out1.getState()["outValue"] == (0, 1)
+
+    with pytest.raises(ValueError):
+        TimingWheel(delays={Not: 0})
+
+
+def test_timingWheel_detects_oscillation():
+    """runUntilStable gives up after maxSteps if a loop never settles"""
+    from src.Algorithms import TimingWheel
+    not1 = Not()
+    _connect(not1, "outValue", not1, "input")
+    wheel = TimingWheel()
+    wheel.schedule(not1, 0)
+    assert wheel.runUntilStable(maxSteps=10) == False
+    assert wheel.pending == 1
+
+
+def test_eventDrivenEval_with_delays():
+    """The waves follow the propagation delays, empty ticks are skipped"""
+    in1 = Input()
+    not1 = Not()
+    and1 = And()
+    out1 = Output()
+    _connect(in1, "outValue", not1, "input")
+    _connect(in1, "outValue", and1, "input1")
+    _connect(not1, "outValue", and1, "input2")
+    _connect(and1, "outValue", out1, "input")
+    assert Algorithms.eventDrivenEval([in1], [in1, not1, and1, out1], delays={Not: 2}) == True
+    assert not1.getState()["outValue"] == (1, 1)
+
+    in1.setState((1, 1))
+    waves = []
+    assert Algorithms.eventDrivenEval([in1], [in1, not1, and1, out1], delays={Not: 2},
+                                      updateFunction=lambda components: waves.append(list(components))) == True
+    # the And sees the old output of the Not first, which glitches the Output for one tick
+    assert waves == [[in1], [and1], [not1, out1], [and1], [out1]]
+    assert out1.getState()["outValue"] == (0, 1)
+
+
+def _ring(length):
+    """A ring of Not gates, which never becomes stable"""
+    nots = [Not() for _ in range(length)]
+    for i, gate in enumerate(nots):
+        _connect(gate, "outValue", nots[(i + 1) % length], "input")
+    return nots
+
+
+def test_graphOrder_strongly_connected_components():
+    """SCCs are found in topological order, registers break loops"""
+    from src.Algorithms import GraphOrder
+    from src.model.Register import Register
+    in1 = Input()
+    in2 = Input()
+    nor1 = Nor()
+    nor2 = Nor()
+    out1 = Output()
+    register = Register()
+    not1 = Not()
+    # SR latch
+    _connect(in1, "outValue", nor1, "input1")
+    _connect(in2, "outValue", nor2, "input2")
+    _connect(nor1, "outValue", nor2, "input1")
+    _connect(nor2, "outValue", nor1, "input2")
+    _connect(nor1, "outValue", out1, "input")
+    # the loop through the register is no feedback loop
+    _connect(not1, "outValue", register, "input")
+    _connect(register, "outValue", not1, "input")
+    order = GraphOrder([out1, nor2, nor1, in1, in2, register, not1])
+    sccs = order.stronglyConnectedComponents()
+    assert sorted(len(scc) for scc in sccs) == [1, 1, 1, 1, 1, 2]
+    assert [nor2, nor1] in sccs
+    position = {comp: i for i, scc in enumerate(sccs) for comp in scc}
+    assert position[in1] < position[nor1] < position[out1]
+    assert position[not1] < position[register]
+    assert order.loops() == [[nor2, nor1]]
+
+
+def test_eventDrivenEval_detects_oscillation_early():
+    """An oscillating ring fails as soon as a state repeats, the ring is reported"""
+    nots = _ring(3)
+    waves = []
+    unstable = []
+    assert Algorithms.eventDrivenEval([], nots, startingComponents=nots, unstable=unstable,
+                                      updateFunction=lambda components: waves.append(components)) == False
+    assert len(waves) < 10
+    assert set(unstable) == set(nots)
+
+
+def test_eventDrivenEval_stable_latch_is_no_oscillation():
+    in1 = Input()
+    in2 = Input()
+    nor1 = Nor()
+    nor2 = Nor()
+    _connect(in1, "outValue", nor1, "input1")
+    _connect(in2, "outValue", nor2, "input2")
+    _connect(nor1, "outValue", nor2, "input1")
+    _connect(nor2, "outValue", nor1, "input2")
+    in1.setState((1, 1))
+    assert Algorithms.eventDrivenEval([in1, in2], [in1, in2, nor1, nor2]) == True
+    assert nor1.getState()["outValue"] == (0, 1)
+    assert nor2.getState()["outValue"] == (1, 1)
+
+
+def test_sccEval_settles_only_the_loops():
+    """Components outside of loops are evaluated once, the latch is iterated until it is stable"""
+    set1 = Input()
+    reset1 = Input()
+    nor1 = Nor()
+    nor2 = Nor()
+    chain = [Not() for _ in range(4)]
+    out1 = Output()
+    _connect(set1, "outValue", nor2, "input2")
+    _connect(reset1, "outValue", nor1, "input1")
+    _connect(nor1, "outValue", nor2, "input1")
+    _connect(nor2, "outValue", nor1, "input2")
+    _connect(nor1, "outValue", chain[0], "input")
+    for first, second in zip(chain, chain[1:]):
+        _connect(first, "outValue", second, "input")
+    _connect(chain[-1], "outValue", out1, "input")
+    components = [out1] + chain + [nor1, nor2, set1, reset1]
+    set1.setState((1, 1))
+
+    waves = []
+    assert Algorithms.sccEval(components, updateFunction=lambda components: waves.append(components)) == True
+    assert nor2.getState()["outValue"] == (0, 1)
+    assert nor1.getState()["outValue"] == (1, 1)
+    assert out1.getState()["outValue"] == (1, 1)
+    # inputs, latch, 4 Nots and the Output
+    assert len(waves) == 7
+    assert sorted(len(wave) for wave in waves) == [1, 1, 1, 1, 1, 2, 2]
+
+    # the latch keeps its state when set is released
+    set1.setState((0, 1))
+    assert Algorithms.sccEval(components) == True
+    assert nor1.getState()["outValue"] == (1, 1)
+    assert out1.getState()["outValue"] == (1, 1)
+
+
+def test_sccEval_reports_oscillating_loop():
+    nots = _ring(3)
+    in1 = Input()
+    and1 = And()
+    _connect(in1, "outValue", and1, "input1")
+    unstable = []
+    assert Algorithms.sccEval([in1, and1] + nots, unstable=unstable) == False
+    assert set(unstable) == set(nots)
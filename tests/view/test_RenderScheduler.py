@@ -0,0 +1,112 @@
+from src.control.LogicComponentController import LogicComponentController
+import pytest
+from src.infrastructure.eventBus import EventBus, getBus, setBus
+from src.view.GridWidget import GridWidget
+from src.view.RenderScheduler import RenderScheduler
+from src.model.And import And
+from src.model.Input import Input
+from src.model.Not import Not
+
+
+@pytest.fixture(autouse=True)
+def freshBus():
+    """Uses a separate bus, so grids of other tests don't receive the events"""
+    previous = getBus()
+    setBus(EventBus())
+    yield
+    setBus(previous)
+
+
+def makeGrid(qtbot):
+    controller = LogicComponentController()
+    grid = GridWidget(controller)
+    qtbot.addWidget(grid)
+    inp = controller.addLogicComponent(Input)
+    grid.addComponent((0, 0), inp)
+    not_gate = controller.addLogicComponent(Not)
+    grid.addComponent((1, 0), not_gate)
+    controller.addConnection(inp, "outValue", not_gate, "input")
+    grid._visuallyAddConnection(inp, "outValue", not_gate, "input")
+    return grid, inp, not_gate
+
+
+def test_updates_are_deferred_to_the_next_frame(qtbot):
+    """Emitting only marks components as dirty, the grid is updated when the frame timer fires"""
+    grid, inp, not_gate = makeGrid(qtbot)
+    try:
+        getBus().emit("view:components_updated", [inp])
+        assert not grid.connections[0].isActive
+        assert grid.renderScheduler.hasPendingUpdates()
+        qtbot.waitUntil(lambda: not grid.renderScheduler.hasPendingUpdates(), timeout=1000)
+        assert grid.connections[0].isActive
+    finally:
+        grid.unsubscribe()
+
+
+def test_waves_are_coalesced(qtbot, monkeypatch):
+    """Several waves within one frame result in a single update with all dirty components"""
+    grid, inp, not_gate = makeGrid(qtbot)
+    calls = []
+    monkeypatch.setattr(grid, "applyComponentUpdates", lambda dirty, active: calls.append((set(dirty), active)))
+    try:
+        getBus().emit("view:components_updated", [inp])
+        getBus().emit("view:components_updated", [not_gate])
+        grid.renderScheduler.flush()
+        assert calls == [({inp, not_gate}, [not_gate])]
+        # nothing is pending anymore
+        grid.renderScheduler.flush()
+        assert len(calls) == 1
+    finally:
+        grid.unsubscribe()
+
+
+def test_labels_of_dirty_items_are_updated(qtbot):
+    """Only the items of dirty components get new port labels"""
+    grid, inp, not_gate = makeGrid(qtbot)
+    try:
+        inp.state["outValue"] = (1, 1)
+        not_gate.eval()
+        getBus().emit("view:components_updated", [not_gate])
+        grid.renderScheduler.flush()
+        inputItem, notItem = grid.items
+        assert notItem.inputLabels["input"].text() == "1"
+        assert inputItem.outputLabels["outValue"].text() == "0"
+    finally:
+        grid.unsubscribe()
+
+
+def test_empty_update_deactivates_connections(qtbot):
+    """An update without components (e.g. when the simulation is stopped) deactivates all connections"""
+    grid, inp, not_gate = makeGrid(qtbot)
+    try:
+        grid.applyComponentUpdates([inp], [inp])
+        assert grid.connections[0].isActive
+        getBus().emit("view:components_updated", [])
+        grid.renderScheduler.flush()
+        assert not grid.connections[0].isActive
+    finally:
+        grid.unsubscribe()
+
+
+def test_frame_interval(qtbot):
+    """The scheduler uses a single shot timer with the given frame interval"""
+    grid, _, _ = makeGrid(qtbot)
+    try:
+        scheduler = RenderScheduler(grid, frameInterval=40)
+        assert scheduler.timer.isSingleShot()
+        assert scheduler.timer.interval() == 40
+    finally:
+        grid.unsubscribe()
+
+
+def test_batched_waves_keep_all_dirty_components(qtbot):
+    """A batch only delivers the last wave to the grid, but the items of earlier waves are still updated"""
+    grid, inp, not_gate = makeGrid(qtbot)
+    try:
+        with getBus().batch("view:components_updated"):
+            getBus().emit("view:components_updated", [inp])
+            getBus().emit("view:components_updated", [not_gate])
+        assert grid.renderScheduler.dirty == {inp, not_gate}
+        assert grid.renderScheduler.active == [not_gate]
+    finally:
+        grid.unsubscribe()
@@ -67,13 +67,44 @@ class TestSimulationControls:
         mock_function.assert_called_once()
 
     def test_default_start_button_connection(self, qtbot, logic_controller):
-        with patch.object(logic_controller, 'eval', Mock()) as mock_eval:
-            controls = SimulationControls(logic_controller)
-            qtbot.addWidget(controls)
+        controls = SimulationControls(logic_controller)
+        qtbot.addWidget(controls)
 
-            # The start button is connected to controller.eval by default
+        # The start button starts the evaluation worker by default
+        with patch.object(controls.evaluationWorker, 'start', Mock()) as mock_start:
             qtbot.mouseClick(controls.startStopButton, QtCore.Qt.LeftButton)
-            mock_eval.assert_called_once()
+            mock_start.assert_called_once()
+        assert controls.startStopButton.text() == "Stop"
+
+    def test_start_evaluates_circuit(self, qtbot, logic_controller):
+        from src.model.Input import Input
+        from src.model.Not import Not
+        inp = logic_controller.addLogicComponent(Input)
+        not_gate = logic_controller.addLogicComponent(Not)
+        logic_controller.addConnection(inp, "outValue", not_gate, "input")
+        controls = SimulationControls(logic_controller)
+        qtbot.addWidget(controls)
+
+        with qtbot.waitSignal(controls.evaluationWorker.evaluationFinished, timeout=5000):
+            qtbot.mouseClick(controls.startStopButton, QtCore.Qt.LeftButton)
+        assert not_gate.getState()["outValue"][0] == 1
+        assert controls.startStopButton.text() == "Start"
+
+    def test_step_and_stop(self, qtbot, logic_controller):
+        from src.model.Input import Input
+        from src.model.Not import Not
+        inp = logic_controller.addLogicComponent(Input)
+        not_gate = logic_controller.addLogicComponent(Not)
+        logic_controller.addConnection(inp, "outValue", not_gate, "input")
+        controls = SimulationControls(logic_controller)
+        qtbot.addWidget(controls)
+
+        qtbot.mouseClick(controls.stepButton, QtCore.Qt.LeftButton)
+        assert controls.evaluationWorker.isStepping()
+        # Reset stops the evaluation before the circuit is reset
+        qtbot.mouseClick(controls.resetButton, QtCore.Qt.LeftButton)
+        assert not controls.evaluationWorker.isRunning()
+        assert controls.startStopButton.text() == "Start"
 
     def test_layout_and_widgets(self, qtbot, logic_controller):
         controls = SimulationControls(logic_controller)
@@ -85,9 +116,49 @@ class TestSimulationControls:
         # Check widgets in layout
         widgets = [layout.itemAt(i).widget() for i in range(layout.count())]
         assert controls.startStopButton in widgets
+        assert controls.stepButton in widgets
         assert controls.resetButton in widgets
         assert controls.speedLabel in widgets
         assert controls.speedSlider in widgets
+        assert controls.tickLabel in widgets
+        assert controls.runUntilButton in widgets
+
+    def test_tick_label(self, qtbot, logic_controller):
+        controls = SimulationControls(logic_controller)
+        qtbot.addWidget(controls)
+
+        assert controls.tickLabel.text() == "Tick: 0"
+        controls.evaluationWorker.tickApplied.emit(3)
+        assert controls.tickLabel.text() == "Tick: 3"
+
+    def test_run_until_condition(self, qtbot, logic_controller):
+        from src.model.Output import Output
+        controls = SimulationControls(logic_controller)
+        qtbot.addWidget(controls)
+
+        assert controls.stopCondition() is None # counts cycles by default
+        assert controls.registerSpinBox.isHidden()
+        controls.runUntilCombo.setCurrentText("Output =")
+        with pytest.raises(ValueError):
+            controls.stopCondition()
+        out = logic_controller.addLogicComponent(Output)
+        controls.runUntilValue.setValue(7)
+        condition = controls.stopCondition()
+        assert condition.component is out and condition.value == 7
+        controls.runUntilCombo.setCurrentText("Register =")
+        assert not controls.registerSpinBox.isHidden()
+
+        with patch.object(controls.evaluationWorker, "runUntil") as runUntil, \
+                patch.object(QtWidgets.QMessageBox, "warning") as warning:
+            qtbot.mouseClick(controls.runUntilButton, QtCore.Qt.LeftButton)
+            warning.assert_called_once() # there is no register block
+            runUntil.assert_not_called()
+            controls.runUntilCombo.setCurrentText("Cycles")
+            qtbot.mouseClick(controls.runUntilButton, QtCore.Qt.LeftButton)
+            runUntil.assert_called_once_with(None, 7)
+        assert controls.startStopButton.text() == "Stop"
+        controls.evaluationWorker.cyclesCompleted.emit(7)
+        assert controls.tickLabel.text() == "Cycles: 7"
 
     def test_frame_properties(self, qtbot, logic_controller):
         controls = SimulationControls(logic_controller)
@@ -131,6 +202,7 @@ class TestSimulationControls:
         # Check that original widgets are still present
         widgets = [controls.layout.itemAt(i).widget() for i in range(controls.layout.count())]
         assert controls.startStopButton in widgets
+        assert controls.stepButton in widgets
         assert controls.resetButton in widgets
         assert controls.speedLabel in widgets
         assert controls.speedSlider in widgets